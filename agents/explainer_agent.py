@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from llm.rate_limiter import PRIORITY_EXPLAIN
 
 # Load environment variables
 load_dotenv()
@@ -11,15 +12,20 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 class ExplainerAgent:
     """Explain solutions in simple terms"""
     
-    def __init__(self, use_llm=True):
+    def __init__(self, use_llm=True, client_registry=None):
         self.use_llm = use_llm
         self.llm_client = None
+        self.clients = client_registry
         self.model = GROQ_MODEL
         
-        if use_llm and GROQ_API_KEY:
+        # Shared pooled client + response cache - har agent ka apna Groq() nahi
+        if use_llm and self.clients is None:
+            from llm.client_pool import get_client_registry
+            self.clients = get_client_registry()
+        
+        if use_llm and self.clients.available:
             try:
-                from groq import Groq
-                self.llm_client = Groq(api_key=GROQ_API_KEY)
+                self.llm_client = self.clients.client()  # replay mode mein None - sab cache se
                 print(f"✅ Explainer Agent initialized with model: {self.model}")
             except ImportError:
                 print("⚠️ groq package not installed")
@@ -36,20 +42,64 @@ class ExplainerAgent:
         """
         Create explanation for the solution
         """
-        if self.use_llm and self.llm_client:
+        if self.use_llm:
             return self._explain_with_llm(solution, verification)
         else:
             return self._explain_with_template(solution)
     
+    async def aexplain(self, solution, verification=None, on_token=None):
+        """
+        Async explain (AsyncGroq). Prompt sirf solution pe depend karta hai,
+        to pipeline isse verification ke saath-saath chala sakta hai.
+        on_token(delta): streaming mode
+        """
+        if not self.use_llm:
+            return self._explain_with_template(solution)
+        try:
+            kwargs = self._request_kwargs(solution)
+            content, ttft_ms = await self.clients.acomplete(
+                kwargs, on_token=on_token, priority=PRIORITY_EXPLAIN)
+            result = self._build_result(content)
+            if ttft_ms is not None:
+                result['ttft_ms'] = ttft_ms
+            return result
+        except Exception as e:
+            print(f"❌ Explanation error: {e}")
+            return self._explain_with_template(solution)
+    
+    def _request_kwargs(self, solution):
+        return {
+            'model': self.model,
+            'messages': [{"role": "user", "content": self._build_prompt(solution)}],
+            'temperature': 0.4,
+            'max_tokens': 800
+        }
+    
+    def _build_result(self, explanation):
+        return {
+            'explanation': explanation,
+            'method': f'Groq LLM ({self.model})',
+            'model_used': self.model
+        }
+    
     def _explain_with_llm(self, solution, verification):
         """
         Use LLM to create explanation
         """
         try:
-            answer = solution.get('final_answer', 'No answer provided')
-            confidence = solution.get('confidence', 0.5)
+            content = self.clients.complete(self._request_kwargs(solution), priority=PRIORITY_EXPLAIN)
+            return self._build_result(content)
             
-            prompt = f"""You are a friendly math tutor explaining solutions to JEE students.
+        except Exception as e:
+            print(f"❌ Explanation error: {e}")
+            return self._explain_with_template(solution)
+    
+    def _build_prompt(self, solution):
+        """Explainer prompt - solution text + confidence"""
+        answer = solution.get('final_answer', 'No answer provided')
+        confidence = solution.get('confidence', 0.5)
+        
+        prompt = f"""You are a friendly math tutor explaining solutions to JEE students.
 
 SOLUTION: {answer}
 
@@ -63,25 +113,8 @@ Create an explanation that:
 5. Gives tips for similar problems
 
 Make it engaging and easy to understand!"""
-
-            response = self.llm_client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.4,
-                max_tokens=800
-            )
-            
-            explanation = response.choices[0].message.content
-            
-            return {
-                'explanation': explanation,
-                'method': f'Groq LLM ({self.model})',
-                'model_used': self.model
-            }
-            
-        except Exception as e:
-            print(f"❌ Explanation error: {e}")
-            return self._explain_with_template(solution)
+        
+        return prompt
     
     def _explain_with_template(self, solution):
         """
@@ -0,0 +1,175 @@
+"""
+Bhai, ye solve pipeline ka asyncio orchestrator hai.
+Pehle app.py parse -> retrieve -> solve -> verify -> explain sab ek ke baad
+ek chalata tha, script thread do synchronous Groq calls pe block. Ab stages
+ka dependency graph chalta hai:
+
+    parse ──┬── retrieve ────────┐
+            └── answer cache ─── (hit? -> done, retrieval ka result ignore)
+                                 └── solve (AsyncGroq) ──┬── verify  (thread)
+                                                         └── explain (AsyncGroq)
+
+  - retrieval aur answer-cache lookup saath (dono embedding + I/O)
+  - explanation solution aate hi shuru - verification ka wait nahi (explainer
+    prompt sirf solution use karta hai), verify thread mein saath chalta hai
+  - CPU/sync stages apne thread pool mein - loop free rehta hai. Default
+    executor nahi: asyncio.run band hote waqt usse join karta hai, to cache hit
+    pe cancel hui retrieval bhi response rok leti
+
+Har stage ka start/end (pipeline start se ms) timings mein - critical path
+dikh jaata hai. on_token(stage, delta) diya ho to solve/explain Groq se stream
+hote hain (UI pehla token aate hi dikhaye) - TTFT timings[stage]['ttft_ms'] mein. PIPELINE_CONCURRENT=0 = purana sequential order (comparison ke liye).
+"""
+
+import os
+import time
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+PIPELINE_CONCURRENT = os.getenv("PIPELINE_CONCURRENT", "1") == "1"
+PIPELINE_THREADS = int(os.getenv("PIPELINE_THREADS", "8"))
+
+# Sync stages (parse, retrieve, verify, cache) - process-wide, runs ke beech reuse
+_executor = ThreadPoolExecutor(max_workers=PIPELINE_THREADS, thread_name_prefix="pipeline")
+
+
+async def _in_thread(fn, *args):
+    """Coroutine - await/schedule hone pe hi thread mein jaata hai"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(fn, *args))
+
+
+STAGES = ("parse", "cache_lookup", "retrieve", "solve", "verify", "explain", "cache_store")
+
+
+class SolvePipeline:
+    """
+    Agents inject kar sakte ho (tests / custom config), warna defaults.
+    on_stage(stage, status, timing) callback - status 'start' / 'done' / 'cancelled'
+    """
+
+    def __init__(self, parser=None, solver=None, verifier=None, explainer=None,
+                 retrieve_fn=None, answer_cache=None, concurrent=None):
+        if parser is None:
+            from agents.parser_agent import ParserAgent
+            parser = ParserAgent()
+        if solver is None:
+            from agents.solver_agent import SolverAgent
+            solver = SolverAgent(use_llm=True)
+        if verifier is None:
+            from agents.verifier_agent import VerifierAgent
+            verifier = VerifierAgent()
+        if explainer is None:
+            from agents.explainer_agent import ExplainerAgent
+            explainer = ExplainerAgent(use_llm=True)
+        if retrieve_fn is None:
+            from rag.retriever import retrieve_context
+            retrieve_fn = retrieve_context
+        self.parser = parser
+        self.solver = solver
+        self.verifier = verifier
+        self.explainer = explainer
+        self.retrieve_fn = retrieve_fn
+        self.answer_cache = answer_cache
+        self.concurrent = PIPELINE_CONCURRENT if concurrent is None else concurrent
+
+    async def _stage(self, name, awaitable, timings, started, on_stage):
+        """Ek stage await karo, start/end record karo"""
+        begin = (time.perf_counter() - started) * 1000
+        if on_stage:
+            on_stage(name, 'start', None)
+        status = 'done'
+        try:
+            return await awaitable
+        except asyncio.CancelledError:
+            status = 'cancelled'
+            raise
+        finally:
+            end = (time.perf_counter() - started) * 1000
+            timings[name] = {'start_ms': begin, 'end_ms': end, 'ms': end - begin, 'status': status}
+            if on_stage:
+                on_stage(name, status, timings[name])
+
+    async def arun(self, question_text, parsed_problem=None, on_stage=None, on_token=None):
+        """
+        on_token(stage, delta): 'solve' / 'explain' ke streamed text deltas
+        Returns: {'parsed_problem', 'context', 'solution', 'verification',
+                  'explanation', 'cached' (hit dict ya None), 'cache_entry_id',
+                  'needs_clarification', 'timings', 'total_ms'}
+        """
+        started = time.perf_counter()
+        timings = {}
+
+        def stage(name, awaitable):
+            return self._stage(name, awaitable, timings, started, on_stage)
+
+        result = {'parsed_problem': parsed_problem, 'context': [], 'solution': None,
+                  'verification': None, 'explanation': None, 'cached': None,
+                  'cache_entry_id': None, 'needs_clarification': False, 'timings': timings}
+
+        if parsed_problem is None:
+            parsed_problem = await stage('parse', _in_thread(self.parser.parse, question_text))
+            result['parsed_problem'] = parsed_problem
+        if parsed_problem.get('needs_clarification', False):
+            result['needs_clarification'] = True
+            return self._finish(result, started)
+
+        # Retrieval + cache lookup saath; hit ho to retrieval ka intezaar nahi
+        def retrieve_stage():
+            return stage('retrieve', _in_thread(self.retrieve_fn, parsed_problem))
+
+        retrieve = asyncio.ensure_future(retrieve_stage()) if self.concurrent else None
+        if self.answer_cache is not None:
+            cached = await stage('cache_lookup',
+                                 _in_thread(self.answer_cache.lookup, parsed_problem))
+            if cached:
+                if retrieve is not None:
+                    retrieve.cancel()  # thread mein chal chuka kaam poora hoga, result ignore
+                    await asyncio.gather(retrieve, return_exceptions=True)
+                result.update(cached=cached, cache_entry_id=cached['entry_id'],
+                              solution=cached['solution'], verification=cached['verification'],
+                              explanation=cached['explanation'])
+                return self._finish(result, started)
+        context = await (retrieve if retrieve is not None else retrieve_stage())
+        result['context'] = context
+
+        def token_callback(name):
+            return functools.partial(on_token, name) if on_token is not None else None
+
+        solution = await stage('solve', self.solver.asolve(
+            parsed_problem, context, on_token=token_callback('solve')))
+        result['solution'] = solution
+
+        # Explanation solution aate hi - verify ke saath saath
+        verify = stage('verify', _in_thread(self.verifier.verify, solution, parsed_problem))
+        explain = stage('explain', self.explainer.aexplain(
+            solution, on_token=token_callback('explain')))
+        if self.concurrent:
+            verification, explanation = await asyncio.gather(verify, explain)
+        else:
+            verification = await verify
+            explanation = await explain
+        result.update(verification=verification, explanation=explanation)
+        for name, output in (('solve', solution), ('explain', explanation)):
+            if isinstance(output, dict) and output.get('ttft_ms') is not None:
+                timings[name]['ttft_ms'] = output['ttft_ms']
+
+        if self.answer_cache is not None:
+            result['cache_entry_id'] = await stage('cache_store', _in_thread(
+                self.answer_cache.store, question_text, parsed_problem,
+                solution, verification, explanation
+            ))
+        return self._finish(result, started)
+
+    @staticmethod
+    def _finish(result, started):
+        result['total_ms'] = (time.perf_counter() - started) * 1000
+        stage_sum = sum(timing['ms'] for timing in result['timings'].values()
+                        if timing['status'] == 'done')
+        # > 1 matlab stages overlap hue (sequential mein ~1.0)
+        result['overlap_factor'] = stage_sum / result['total_ms'] if result['total_ms'] else 1.0
+        return result
+
+    def run(self, question_text, parsed_problem=None, on_stage=None, on_token=None):
+        """Sync entry point (Streamlit script thread) - apna event loop chalata hai"""
+        return asyncio.run(self.arun(question_text, parsed_problem, on_stage, on_token))
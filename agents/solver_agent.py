@@ -2,6 +2,7 @@ import os
 import json
 import re
 from dotenv import load_dotenv
+from llm.rate_limiter import PRIORITY_SOLVE
 
 # Load environment variables
 load_dotenv()
@@ -13,15 +14,20 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 class SolverAgent:
     """Main solver agent - uses Groq LLM for math problems"""
     
-    def __init__(self, use_llm=True):
+    def __init__(self, use_llm=True, client_registry=None):
         self.use_llm = use_llm
         self.llm_client = None
+        self.clients = client_registry
         self.model = GROQ_MODEL
         
-        if use_llm and GROQ_API_KEY:
+        # Shared pooled client + response cache - har agent ka apna Groq() nahi
+        if use_llm and self.clients is None:
+            from llm.client_pool import get_client_registry
+            self.clients = get_client_registry()
+        
+        if use_llm and self.clients.available:
             try:
-                from groq import Groq
-                self.llm_client = Groq(api_key=GROQ_API_KEY)
+                self.llm_client = self.clients.client()  # replay mode mein None - sab cache se
                 print(f"✅ Solver Agent initialized with model: {self.model}")
             except ImportError:
                 print("⚠️ groq package not installed. Install with: pip install groq")
@@ -38,22 +44,75 @@ class SolverAgent:
         """
         Solve math problem using LLM or fallback to rules
         """
-        if self.use_llm and self.llm_client:
+        if self.use_llm:
             return self._solve_with_llm(parsed_problem, context)
         else:
             return self._solve_with_rules(parsed_problem)
     
+    async def asolve(self, parsed_problem, context=None, on_token=None):
+        """
+        Async solve (AsyncGroq) - event loop block nahi hota, to pipeline
+        baaki stages saath chala sakta hai.
+        on_token(delta): diya ho to stream=True (LLM_STREAMING on ho), har token pe call
+        """
+        if not self.use_llm:
+            return self._solve_with_rules(parsed_problem)
+        try:
+            kwargs = self._request_kwargs(parsed_problem, context)
+            content, ttft_ms = await self.clients.acomplete(
+                kwargs, on_token=on_token, priority=PRIORITY_SOLVE)
+            result = self._build_result(content)
+            if ttft_ms is not None:
+                result['ttft_ms'] = ttft_ms
+            return result
+        except Exception as e:
+            print(f"❌ LLM solving error: {e}")
+            return self._solve_with_rules(parsed_problem)
+    
+    def _request_kwargs(self, parsed_problem, context):
+        """Groq chat.completions.create ke arguments (sync + async same)"""
+        return {
+            'model': self.model,
+            'messages': [{"role": "user", "content": self._build_prompt(parsed_problem, context)}],
+            'temperature': 0.3,
+            'max_tokens': 1200
+        }
+    
+    def _build_result(self, content):
+        """LLM response text -> solution dict"""
+        final_answer = self._extract_answer(content)
+        
+        return {
+            'final_answer': content,
+            'parsed_answer': final_answer,
+            'solution_steps': self._extract_steps(content),
+            'confidence': 0.85,
+            'method': f'Groq LLM ({self.model})',
+            'model_used': self.model,
+            'response_raw': content[:500] + "..." if len(content) > 500 else content
+        }
+    
     def _solve_with_llm(self, parsed_problem, context):
         """
         Use Groq LLM to solve the problem
         """
         try:
-            # Build prompt
-            problem_text = parsed_problem.get('problem_text', '')
-            topics = parsed_problem.get('topics', [])
-            difficulty = parsed_problem.get('difficulty', 'medium')
+            content = self.clients.complete(self._request_kwargs(parsed_problem, context),
+                                            priority=PRIORITY_SOLVE)
+            return self._build_result(content)
             
-            prompt = f"""You are an expert JEE-level math tutor. Solve this problem step by step.
+        except Exception as e:
+            print(f"❌ LLM solving error: {e}")
+            return self._solve_with_rules(parsed_problem)
+    
+    def _build_prompt(self, parsed_problem, context):
+        """Solver prompt - problem + topics + top-2 RAG context"""
+        # Build prompt
+        problem_text = parsed_problem.get('problem_text', '')
+        topics = parsed_problem.get('topics', [])
+        difficulty = parsed_problem.get('difficulty', 'medium')
+        
+        prompt = f"""You are an expert JEE-level math tutor. Solve this problem step by step.
 
 PROBLEM: {problem_text}
 
@@ -74,38 +133,13 @@ IMPORTANT: Format your response with clear headings:
   2. [Step 2]
 • **Explanation:** [Detailed explanation]
 • **Key Concepts:** [List concepts]"""
-            
-            # Add context if available
-            if context and len(context) > 0:
-                relevant_info = "\n".join([f"- {doc['content'][:200]}..." for doc in context[:2]])
-                prompt += f"\n\nRELEVANT CONTEXT:\n{relevant_info}"
-            
-            # Call Groq API
-            response = self.llm_client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=1200
-            )
-            
-            content = response.choices[0].message.content
-            
-            # Parse response
-            final_answer = self._extract_answer(content)
-            
-            return {
-                'final_answer': content,
-                'parsed_answer': final_answer,
-                'solution_steps': self._extract_steps(content),
-                'confidence': 0.85,
-                'method': f'Groq LLM ({self.model})',
-                'model_used': self.model,
-                'response_raw': content[:500] + "..." if len(content) > 500 else content
-            }
-            
-        except Exception as e:
-            print(f"❌ LLM solving error: {e}")
-            return self._solve_with_rules(parsed_problem)
+        
+        # Add context if available
+        if context and len(context) > 0:
+            relevant_info = "\n".join([f"- {doc['content'][:200]}..." for doc in context[:2]])
+            prompt += f"\n\nRELEVANT CONTEXT:\n{relevant_info}"
+        
+        return prompt
     
     def _solve_with_rules(self, parsed_problem):
         """
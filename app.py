@@ -6,6 +6,7 @@ JEE Level Math Assistant with Multi-Agent System
 import streamlit as st
 import tempfile
 import os
+import time
 from PIL import Image
 import numpy as np
 import pytesseract
@@ -23,12 +24,10 @@ except:
 # Import hamare custom modules
 from utils.ocr_handler import extract_text_from_image
 from utils.audio_handler import transcribe_audio, transcribe_recording
-from agents.parser_agent import ParserAgent
-from rag.retriever import retrieve_context
-from agents.solver_agent import SolverAgent
-from agents.verifier_agent import VerifierAgent
-from agents.explainer_agent import ExplainerAgent
+from agents.pipeline import SolvePipeline
 from memory.simple_memory_handler import MemoryHandler
+from memory.answer_cache import get_answer_cache
+from llm.client_pool import get_client_registry
 
 # Page config
 st.set_page_config(
@@ -50,6 +49,9 @@ if 'input_method' not in st.session_state:
 if 'show_memory' not in st.session_state:
     st.session_state.show_memory = False
 
+if 'answer_cache_entry' not in st.session_state:
+    st.session_state.answer_cache_entry = None
+
 if 'confidence_threshold' not in st.session_state:
     st.session_state.confidence_threshold = 0.70
 
@@ -172,6 +174,29 @@ with st.sidebar:
     else:
         st.metric("Accuracy", "0%")
     
+    # Answer cache hit rate
+    answer_cache = get_answer_cache()
+    if answer_cache is not None:
+        cache_stats = answer_cache.stats()
+        if cache_stats['lookups']:
+            st.metric("Answer Cache Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+            st.caption(f"{cache_stats['exact_hits']} exact + {cache_stats['similar_hits']} similar "
+                       f"/ {cache_stats['lookups']} lookups")
+    
+    # LLM connection pool reuse
+    llm_stats = get_client_registry().get_stats()
+    if llm_stats['requests']:
+        st.caption(f"🔌 LLM connections reused: {llm_stats['reuse_rate']:.0%} "
+                   f"({llm_stats['new_connections']} opened / {llm_stats['requests']} requests)")
+    llm_cache = llm_stats['response_cache']
+    if llm_cache['lookups']:
+        st.caption(f"🗄️ LLM response cache: {llm_cache['hit_rate']:.0%} hits "
+                   f"({llm_cache['entries']} stored, {llm_cache['mode']})")
+    limiter = llm_stats['rate_limiter']
+    if limiter['requests']:
+        st.caption(f"⏳ LLM queue: {limiter['wait_ms_mean']:.0f} ms avg wait, "
+                   f"{limiter['queue_length']} waiting, {limiter['rate_limited']} rate-limited")
+    
     # AI Status
     st.markdown("---")
     st.markdown("### 🤖 AI Status")
@@ -522,20 +547,55 @@ if st.button("🚀 Solve Math Problem", type="primary", width='stretch', key="so
     with progress_container:
         progress_bar = st.progress(0)
         status_text = st.empty()
+        # Streaming: solver/explainer tokens aate hi yahan dikhte hain
+        live_output = {'solve': st.empty(), 'explain': st.empty()}
+    
+    # Stage start pe status, done pe progress (stages concurrently chalte hain)
+    stage_labels = {
+        'parse': "🔍 Parsing question...",
+        'cache_lookup': "⚡ Checking answer cache...",
+        'retrieve': "📚 Retrieving relevant knowledge...",
+        'solve': "🔄 Solving problem...",
+        'verify': "✅ Verifying solution...",
+        'explain': "📖 Creating explanation...",
+        'cache_store': "💾 Saving answer...",
+    }
+    stage_progress = {'parse': 10, 'cache_lookup': 20, 'retrieve': 40, 'solve': 60,
+                      'verify': 80, 'explain': 90, 'cache_store': 100}
+    
+    def update_progress(stage, status, timing):
+        if status == 'start':
+            status_text.text(stage_labels.get(stage, stage))
+        elif status == 'done':
+            progress_bar.progress(stage_progress.get(stage, 0))
+    
+    # Har token pe re-render mehenga - ~50ms pe ek baar
+    live_text = {'solve': "", 'explain': ""}
+    live_rendered = {'solve': 0.0, 'explain': 0.0}
+    live_headings = {'solve': "#### 🔄 Solving...", 'explain': "#### 📖 Explaining..."}
+    
+    def on_token(stage, delta):
+        live_text[stage] += delta
+        now = time.perf_counter()
+        if now - live_rendered[stage] >= 0.05:
+            live_rendered[stage] = now
+            live_output[stage].markdown(f"{live_headings[stage]}\n\n{live_text[stage]}▌")
     
     try:
-        # Step 1: Parse
-        status_text.text("🔍 Step 1: Parsing question...")
-        parser = ParserAgent()
-        parsed_problem = parser.parse(question_text)
-        progress_bar.progress(20)
+        # Parse -> (retrieve || cache) -> solve -> (verify || explain), asyncio pe
+        answer_cache = get_answer_cache()
+        pipeline = SolvePipeline(answer_cache=answer_cache)
+        result = pipeline.run(question_text, on_stage=update_progress, on_token=on_token)
+        for placeholder in live_output.values():
+            placeholder.empty()  # final formatted render neeche
+        parsed_problem = result['parsed_problem']
         
         # Show parsed output
         with st.expander("📋 Parsed Problem Structure", expanded=False):
             st.json(parsed_problem)
         
-        # Step 2: Check if needs clarification
-        if parsed_problem.get('needs_clarification', False):
+        # Check if needs clarification
+        if result['needs_clarification']:
             st.warning("⚠️ Parser ko clarification chahiye!")
             clarification = st.text_input(
                 "Kya ye question clear nahi hai? Please clarify:",
@@ -549,27 +609,41 @@ if st.button("🚀 Solve Math Problem", type="primary", width='stretch', key="so
                     st.rerun()
             st.stop()
         
-        # Step 3: Retrieve context from RAG
-        status_text.text("📚 Step 2: Retrieving relevant knowledge...")
-        context = retrieve_context(parsed_problem['problem_text'])
-        progress_bar.progress(40)
-        
-        # Show retrieved context
-        with st.expander("🧠 Retrieved Knowledge", expanded=False):
-            if context:
-                for i, doc in enumerate(context[:3]):  # Show top 3
-                    with st.container():
-                        st.write(f"**Source {i+1}** (Relevance: {doc.get('score', 0):.3f})")
-                        st.write(doc['content'][:250] + "..." if len(doc['content']) > 250 else doc['content'])
-                        st.divider()
-            else:
-                st.write("No relevant knowledge found in database")
+        solution = result['solution']
+        verification = result['verification']
+        explanation = result['explanation']
+        st.session_state.answer_cache_entry = result['cache_entry_id']
+        progress_bar.progress(100)
         
-        # Step 4: Solve using Groq
-        status_text.text("🔄 Step 3: Solving problem...")
-        solver = SolverAgent(use_llm=True)  # Always use LLM now
-        solution = solver.solve(parsed_problem, context)
-        progress_bar.progress(60)
+        cached = result['cached']
+        if cached:
+            status_text.text("⚡ Served from answer cache!")
+            match_note = "same problem" if cached['match'] == 'exact' else \
+                f"near-duplicate (similarity {cached['score']:.2f})"
+            st.info(f"⚡ Verified answer reused from memory - {match_note}: "
+                    f"*{cached['problem_text']}*")
+        else:
+            status_text.text(f"🎉 Complete! ({result['total_ms'] / 1000:.1f}s)")
+            
+            # Show retrieved context
+            context = result['context']
+            with st.expander("🧠 Retrieved Knowledge", expanded=False):
+                if context:
+                    for i, doc in enumerate(context[:3]):  # Show top 3
+                        with st.container():
+                            st.write(f"**Source {i+1}** (Relevance: {doc.get('score', 0):.3f})")
+                            st.write(doc['content'][:250] + "..." if len(doc['content']) > 250 else doc['content'])
+                            st.divider()
+                else:
+                    st.write("No relevant knowledge found in database")
+        
+        # Per-stage timing (start/end pipeline start se)
+        with st.expander("⏱️ Pipeline Timing", expanded=False):
+            for stage, timing in sorted(result['timings'].items(), key=lambda item: item[1]['start_ms']):
+                ttft = f", first token {timing['ttft_ms']:.0f} ms" if 'ttft_ms' in timing else ""
+                st.write(f"**{stage}**: {timing['start_ms']:.0f} → {timing['end_ms']:.0f} ms "
+                         f"({timing['ms']:.0f} ms, {timing['status']}{ttft})")
+            st.caption(f"Total {result['total_ms']:.0f} ms · overlap {result['overlap_factor']:.2f}x")
         
         # Show solution steps
         with st.expander("🔧 Solution Steps", expanded=False):
@@ -583,19 +657,6 @@ if st.button("🚀 Solve Math Problem", type="primary", width='stretch', key="so
             else:
                 st.write("No detailed steps available")
         
-        # Step 5: Verify
-        status_text.text("✅ Step 4: Verifying solution...")
-        verifier = VerifierAgent()
-        verification = verifier.verify(solution, parsed_problem)
-        progress_bar.progress(80)
-        
-        # Step 6: Explain
-        status_text.text("📖 Step 5: Creating explanation...")
-        explainer = ExplainerAgent(use_llm=True)  # Always use LLM now
-        explanation = explainer.explain(solution, verification)
-        progress_bar.progress(100)
-        status_text.text("🎉 Complete!")
-        
         # Results Section
         st.success("✅ Problem solved successfully!")
         
@@ -676,6 +737,8 @@ if st.button("🚀 Solve Math Problem", type="primary", width='stretch', key="so
                         is_correct=True,
                         feedback="User marked as correct"
                     )
+                    if answer_cache is not None:
+                        answer_cache.record_feedback(st.session_state.answer_cache_entry, True)
                     st.success("Thanks for feedback!")
                     st.rerun()
         
@@ -688,6 +751,8 @@ if st.button("🚀 Solve Math Problem", type="primary", width='stretch', key="so
                         is_correct=False,
                         feedback=feedback
                     )
+                    if answer_cache is not None:
+                        answer_cache.record_feedback(st.session_state.answer_cache_entry, False)
                     st.success("Thanks for correction!")
                     st.rerun()
     
@@ -0,0 +1,265 @@
+"""
+Bhai, ye process-wide Groq client registry hai.
+Pehle SolverAgent, ExplainerAgent aur GroqHandler har ek apna Groq(api_key=...)
+banate the, aur app har solve click pe naye agents - to har request pe client
+construction + naya TCP/TLS handshake. Ab:
+
+  - ek sync Groq client poore process mein (thread-safe, sab agents share)
+  - httpx keep-alive pool: LLM_POOL_SIZE connections, idle LLM_KEEPALIVE_SECONDS
+    tak zinda - agli request wahi connection reuse karti hai
+  - AsyncGroq ek background "LLM loop" thread pe rehta hai (httpx async
+    connections loop-bound hain, aur pipeline har solve pe asyncio.run = naya
+    loop). acall() coroutine wahan chalata hai - pool solves ke beech zinda
+  - timeouts configurable (connect alag, read alag - streaming lambi hoti hai)
+  - metrics: requests, naye connections, reuse rate
+  - complete / acomplete (streaming: on_token): agents inhi se call karte hain - pehle
+    response cache (llm/response_cache.py), miss pe rate limiter
+    (llm/rate_limiter.py - priority queue + retries) ke through pooled client
+"""
+
+import os
+import time
+import asyncio
+import weakref
+import threading
+
+from llm.response_cache import get_response_cache
+from llm.rate_limiter import get_rate_limiter, PRIORITY_DEFAULT
+
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))                       # max connections
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "120"))    # idle connection kitni der rakhein
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "60"))
+LLM_STREAMING = os.getenv("LLM_STREAMING", "1") == "1"  # 0 = on_token ignore, poora response ek saath
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "0"))  # SDK retries - default off, rate limiter retry karta hai
+
+
+class ConnectionStats:
+    """
+    httpx response hook se - har response ka network_stream us connection ka
+    object hai, pehle dekha hua = reused connection
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = weakref.WeakSet()
+        self.requests = 0
+        self.new_connections = 0
+        self.clients_created = 0
+        self.client_build_ms = 0.0
+
+    def record(self, response):
+        stream = response.extensions.get("network_stream")
+        with self._lock:
+            self.requests += 1
+            if stream is None:
+                return
+            try:
+                if stream in self._seen:
+                    return
+                self._seen.add(stream)
+            except TypeError:  # weakref support nahi - count nahi kar sakte
+                return
+            self.new_connections += 1
+
+    def snapshot(self):
+        with self._lock:
+            reused = self.requests - self.new_connections
+            return {
+                'requests': self.requests,
+                'new_connections': self.new_connections,
+                'reused_connections': reused,
+                'reuse_rate': reused / self.requests if self.requests else 0.0,
+                'clients_created': self.clients_created,
+                'client_build_ms': self.client_build_ms,
+            }
+
+
+class GroqClientRegistry:
+    """Sab agents isse client lete hain - khud Groq() nahi banate"""
+
+    def __init__(self, api_key=None, pool_size=None, keepalive=None,
+                 connect_timeout=None, read_timeout=None, max_retries=None, response_cache=None,
+                 rate_limiter=None):
+        self.api_key = api_key or os.getenv("GROQ_API_KEY")
+        self.pool_size = pool_size or LLM_POOL_SIZE
+        self.keepalive = LLM_KEEPALIVE_SECONDS if keepalive is None else keepalive
+        self.connect_timeout = connect_timeout or LLM_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or LLM_READ_TIMEOUT
+        self.max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.stats = ConnectionStats()
+        self.cache = response_cache or get_response_cache()
+        self.limiter = rate_limiter or get_rate_limiter()
+        self._lock = threading.Lock()
+        self._client = None
+        self._async_client = None
+        self._loop = None  # background LLM loop (daemon thread)
+
+    @property
+    def available(self):
+        """Key ho, ya replay mode (sab cache se - network nahi)"""
+        return bool(self.api_key) or self.cache.replay
+
+    def _http_options(self):
+        import httpx
+        limits = httpx.Limits(max_connections=self.pool_size,
+                              max_keepalive_connections=self.pool_size,
+                              keepalive_expiry=self.keepalive)
+        timeout = httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+        return httpx, limits, timeout
+
+    def client(self):
+        """Process-wide sync Groq client (pehli call pe banta hai; bina key None)"""
+        if not self.api_key:
+            return None
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from groq import Groq
+                    started = time.perf_counter()
+                    httpx, limits, timeout = self._http_options()
+                    http_client = httpx.Client(limits=limits, timeout=timeout,
+                                               event_hooks={'response': [self.stats.record]})
+                    self._client = Groq(api_key=self.api_key, http_client=http_client,
+                                        timeout=timeout, max_retries=self.max_retries)
+                    self.stats.clients_created += 1
+                    self.stats.client_build_ms += (time.perf_counter() - started) * 1000
+        return self._client
+
+    def _llm_loop(self):
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="llm-loop", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    async def _with_async_client(self, fn):
+        """LLM loop pe chalta hai - AsyncGroq pehli call pe yahin banta hai"""
+        if self._async_client is None:
+            from groq import AsyncGroq
+            started = time.perf_counter()
+            httpx, limits, timeout = self._http_options()
+
+            async def record(response):
+                self.stats.record(response)
+
+            http_client = httpx.AsyncClient(limits=limits, timeout=timeout,
+                                            event_hooks={'response': [record]})
+            self._async_client = AsyncGroq(api_key=self.api_key, http_client=http_client,
+                                           timeout=timeout, max_retries=self.max_retries)
+            self.stats.clients_created += 1
+            self.stats.client_build_ms += (time.perf_counter() - started) * 1000
+        return await fn(self._async_client)
+
+    async def acall(self, fn):
+        """
+        await registry.acall(lambda client: client.chat.completions.create(...))
+        fn(AsyncGroq) LLM loop pe chalta hai, result caller ke loop mein milta hai.
+        Caller cancel kare to LLM loop wala task bhi cancel.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._with_async_client(fn), self._llm_loop())
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def threadsafe(callback):
+        """Callback ko caller ke loop pe bhejo (Streamlit UI updates script thread mein hi)"""
+        if callback is None:
+            return None
+        loop = asyncio.get_running_loop()
+        return lambda *args: loop.call_soon_threadsafe(callback, *args)
+
+    # ------------------------------------------------------------ completions
+    def complete(self, kwargs, priority=PRIORITY_DEFAULT):
+        """Sync completion -> response text (cache pehle)"""
+        text = self.cache.get(kwargs)
+        if text is None:
+            client = self.client()
+            response, tokens = self.limiter.call(
+                lambda: client.chat.completions.create(**kwargs), kwargs, priority)
+            self.limiter.release(tokens, _used_tokens(response))
+            text = response.choices[0].message.content
+            self.cache.put(kwargs, text)
+        return text
+
+    async def acomplete(self, kwargs, on_token=None, priority=PRIORITY_DEFAULT):
+        """
+        Async completion -> (text, ttft_ms). on_token(delta) diya ho to stream=True
+        aur har delta caller ke loop pe; warna ttft_ms None.
+        """
+        if not LLM_STREAMING:
+            on_token = None
+        started = time.perf_counter()
+        text = self.cache.get(kwargs)
+        if text is not None:
+            if on_token is not None:
+                on_token(text)
+            return text, (time.perf_counter() - started) * 1000
+        on_token = self.threadsafe(on_token)
+        text, ttft_ms = await self.acall(
+            lambda client: self._arequest(client, kwargs, on_token, priority, started))
+        self.cache.put(kwargs, text)
+        return text, ttft_ms
+
+    async def _arequest(self, client, kwargs, on_token, priority, started):
+        """LLM loop pe: limiter slot -> request (TTFT mein queue wait bhi)"""
+        if on_token is None:
+            response, tokens = await self.limiter.acall(
+                lambda: client.chat.completions.create(**kwargs), kwargs, priority)
+            self.limiter.release(tokens, _used_tokens(response))
+            return response.choices[0].message.content, None
+        stream, tokens = await self.limiter.acall(
+            lambda: client.chat.completions.create(**kwargs, stream=True), kwargs, priority)
+        try:
+            return await _acollect(stream, on_token, started)
+        finally:
+            self.limiter.release(tokens)
+
+    def get_stats(self):
+        stats = self.stats.snapshot()
+        stats.update(pool_size=self.pool_size, keepalive_seconds=self.keepalive,
+                     response_cache=self.cache.stats(), rate_limiter=self.limiter.stats())
+        return stats
+
+
+def _delta(chunk):
+    """Stream chunk ka naya text (role / finish chunks mein None)"""
+    if not chunk.choices:
+        return None
+    return chunk.choices[0].delta.content
+
+
+def _used_tokens(response):
+    """Response ka actual token usage (limiter estimate settle karta hai)"""
+    return getattr(getattr(response, 'usage', None), 'total_tokens', None)
+
+
+async def _acollect(stream, on_token, started):
+    """AsyncGroq stream -> (full text, ttft_ms since started), har delta pe on_token"""
+    ttft_ms = None
+    parts = []
+    async for chunk in stream:
+        delta = _delta(chunk)
+        if not delta:
+            continue
+        if ttft_ms is None:
+            ttft_ms = (time.perf_counter() - started) * 1000
+        parts.append(delta)
+        on_token(delta)
+    return "".join(parts), ttft_ms
+
+
+# Global registry
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry():
+    """Process-wide registry (lazy)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = GroqClientRegistry()
+    return _registry
@@ -3,23 +3,28 @@ Bhai, ye LLM handler hai. Groq API use karega free mein.
 """
 
 import os
-from groq import Groq
 import json
+from llm.client_pool import GroqClientRegistry, get_client_registry
+from llm.rate_limiter import PRIORITY_SOLVE, PRIORITY_EXPLAIN
 
 class GroqHandler:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, client_registry=None):
         """
-        Groq LLM initialize karo
+        Groq LLM initialize karo (shared pooled client, registry se)
         """
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
+        self.clients = client_registry or get_client_registry()
+        if self.api_key and self.api_key != self.clients.api_key:
+            # Alag key = alag registry (apna pool, cache shared)
+            self.clients = GroqClientRegistry(api_key=self.api_key, response_cache=self.clients.cache)
         
-        if not self.api_key:
+        if not self.clients.available:
             print("⚠️ GROQ_API_KEY not found. Using fallback responses.")
             self.client = None
             self.available = False
         else:
             try:
-                self.client = Groq(api_key=self.api_key)
+                self.client = self.clients.client()  # replay mode mein None - sab cache se
                 self.available = True
                 print("✅ Groq LLM initialized")
             except Exception as e:
@@ -31,7 +36,7 @@ class GroqHandler:
         """
         Math problem solve karo LLM se
         """
-        if not self.available or not self.client:
+        if not self.available:
             return self.fallback_response(problem, context)
         
         try:
@@ -56,7 +61,7 @@ class GroqHandler:
             """
             
             # Call Groq API
-            response = self.client.chat.completions.create(
+            return self.clients.complete(dict(
                 model="llama-3.1-8b-instant",  # Free model
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -64,9 +69,7 @@ class GroqHandler:
                 ],
                 temperature=0.3,
                 max_tokens=1000
-            )
-            
-            return response.choices[0].message.content
+            ), priority=PRIORITY_SOLVE)
             
         except Exception as e:
             print(f"❌ Groq API error: {e}")
@@ -76,7 +79,7 @@ class GroqHandler:
         """
         Student-friendly explanation generate karo
         """
-        if not self.available or not self.client:
+        if not self.available:
             return self.fallback_explanation(solution, verification)
         
         try:
@@ -93,7 +96,7 @@ class GroqHandler:
             Please create a student-friendly explanation of this solution.
             """
             
-            response = self.client.chat.completions.create(
+            return self.clients.complete(dict(
                 model="llama-3.1-70b-versatile",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -101,9 +104,7 @@ class GroqHandler:
                 ],
                 temperature=0.7,
                 max_tokens=800
-            )
-            
-            return response.choices[0].message.content
+            ), priority=PRIORITY_EXPLAIN)
             
         except Exception as e:
             print(f"❌ Groq explanation error: {e}")
@@ -0,0 +1,344 @@
+"""
+Bhai, ye Groq calls ka client-side rate limiter hai (free tier: ~30 requests/min,
+~6000 tokens/min). Classroom load pe 429 aata tha, agents exception pakad ke
+rule-based fallback de dete the. Ab har network call (cache miss) pehle yahan:
+
+  - do token buckets: requests/min (GROQ_RPM) aur tokens/min (GROQ_TPM) -
+    tokens ka estimate = prompt chars / 4 + max_tokens, response ke usage se settle
+  - LLM_MAX_CONCURRENCY se zyada requests ek saath nahi
+  - queue priority se: solve pehle, explain baad mein (student answer ka wait
+    kar raha hai, explanation ruk sakti hai)
+  - 429 / 5xx / connection error pe retry - jittered exponential backoff,
+    Retry-After header ho to utna wait, aur 429 pe poora limiter cool down
+    (limit account-wide hai, baaki requests bhi fail hoti)
+
+Sync (threads) aur async (registry ka LLM loop) dono waiters ek hi queue mein.
+Process-wide - registry ke through saare agents share karte hain.
+"""
+
+import os
+import json
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import threading
+
+GROQ_RPM = float(os.getenv("GROQ_RPM", "30"))
+GROQ_TPM = float(os.getenv("GROQ_TPM", "6000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "120"))  # isse zyada queue mein = TimeoutError
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "3"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+CHARS_PER_TOKEN = 4
+
+# Chhota number = pehle
+PRIORITY_SOLVE = 0
+PRIORITY_EXPLAIN = 1
+PRIORITY_DEFAULT = PRIORITY_EXPLAIN
+
+RETRYABLE_ERRORS = ('APIConnectionError', 'APITimeoutError')
+
+
+def estimate_tokens(kwargs):
+    """Request ka token estimate (prompt + poora max_tokens budget)"""
+    prompt_chars = len(json.dumps(kwargs.get('messages', []), ensure_ascii=False))
+    return prompt_chars // CHARS_PER_TOKEN + int(kwargs.get('max_tokens') or 0)
+
+
+def retry_after_seconds(error):
+    """Retry-After header (seconds) agar error response mein ho"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_retryable(error):
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+def backoff_seconds(attempt, retry_after=None):
+    """Full jitter: uniform(0, base * 2^attempt), Retry-After se kam kabhi nahi"""
+    delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after * random.uniform(1.0, 1.2))
+    return delay
+
+
+class TokenBucket:
+    """rate per minute, capacity = ek minute ka budget (lock caller ke paas)"""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Kitni der baad `amount` available hoga (0 = abhi)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class _Waiter:
+    __slots__ = ('tokens', 'granted', 'abandoned', 'loop', 'event')
+
+    def __init__(self, tokens, loop=None, event=None):
+        self.tokens = tokens
+        self.granted = False
+        self.abandoned = False
+        self.loop = loop
+        self.event = event
+
+
+class RateLimiter:
+    """
+    acquire / aacquire -> slot; release() request khatam hone pe.
+    call / acall = acquire + retries + release ek saath.
+    """
+
+    def __init__(self, rpm=None, tpm=None, max_concurrency=None, queue_timeout=None, retries=None):
+        self.requests = TokenBucket(rpm or GROQ_RPM)
+        self.tokens = TokenBucket(tpm or GROQ_TPM)
+        self.max_concurrency = max_concurrency or LLM_MAX_CONCURRENCY
+        self.queue_timeout = LLM_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self.retries = LLM_RETRIES if retries is None else retries
+        self._cond = threading.Condition()
+        self._queue = []                   # heap: (priority, seq, waiter)
+        self._seq = itertools.count()
+        self._active = 0
+        self._paused_until = 0.0           # 429 ke baad cool down
+        self._timer = None
+        self._timer_at = None
+        self.counters = {'requests': 0, 'queued': 0, 'wait_ms_total': 0.0, 'max_queue': 0,
+                         'retries': 0, 'rate_limited': 0, 'timeouts': 0}
+
+    # ------------------------------------------------------------ scheduling
+    def _dispatch(self):
+        """Queue head ko slot do jab tak ho sake (lock ke andar call karo)"""
+        while self._queue:
+            _, _, waiter = self._queue[0]
+            if waiter.abandoned:
+                heapq.heappop(self._queue)
+                continue
+            if self._active >= self.max_concurrency:
+                return  # release() pe phir dispatch
+            now = time.monotonic()
+            delay = max(self._paused_until - now,
+                        self.requests.wait_time(1, now),
+                        self.tokens.wait_time(waiter.tokens, now))
+            if delay > 0:
+                self._wake_at(now + delay)
+                return
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.tokens.take(waiter.tokens)
+            self._active += 1
+            waiter.granted = True
+            if waiter.event is not None:
+                waiter.loop.call_soon_threadsafe(waiter.event.set)
+            else:
+                self._cond.notify_all()
+
+    def _wake_at(self, deadline):
+        """Bucket refill hone pe dispatch (ek hi pending timer)"""
+        if self._timer is not None and self._timer_at <= deadline:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(deadline - time.monotonic(), self._on_timer)
+        self._timer.daemon = True
+        self._timer_at = deadline
+        self._timer.start()
+
+    def _on_timer(self):
+        with self._cond:
+            self._timer = None
+            self._dispatch()
+
+    def _enqueue(self, waiter, priority):
+        heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+        self.counters['queued'] += 1
+        self.counters['max_queue'] = max(self.counters['max_queue'], len(self._queue))
+        self._dispatch()
+
+    def _abandon(self, waiter):
+        """Timeout / cancel - mila hua slot wapas, warna queue se hatao"""
+        if waiter.granted:
+            self._active -= 1
+            self.tokens.give_back(waiter.tokens)
+            self._dispatch()
+        else:
+            waiter.abandoned = True
+
+    # ------------------------------------------------------------ slots
+    def acquire(self, tokens, priority=PRIORITY_DEFAULT):
+        """Blocking (threads). Returns: queue mein wait ms"""
+        started = time.monotonic()
+        waiter = _Waiter(tokens)
+        with self._cond:
+            self._enqueue(waiter, priority)
+            while not waiter.granted:
+                remaining = started + self.queue_timeout - time.monotonic()
+                if remaining <= 0:
+                    self._abandon(waiter)
+                    self.counters['timeouts'] += 1
+                    raise TimeoutError(f"LLM queue wait > {self.queue_timeout:g}s")
+                self._cond.wait(remaining)
+            return self._record_wait(started)
+
+    async def aacquire(self, tokens, priority=PRIORITY_DEFAULT):
+        """Async (LLM loop) - loop block nahi hota. Cancel = queue se bahar"""
+        started = time.monotonic()
+        waiter = _Waiter(tokens, asyncio.get_running_loop(), asyncio.Event())
+        with self._cond:
+            self._enqueue(waiter, priority)
+        try:
+            await asyncio.wait_for(waiter.event.wait(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._cond:
+                self._abandon(waiter)
+                self.counters['timeouts'] += 1
+            raise TimeoutError(f"LLM queue wait > {self.queue_timeout:g}s")
+        except asyncio.CancelledError:
+            with self._cond:
+                self._abandon(waiter)
+            raise
+        with self._cond:
+            return self._record_wait(started)
+
+    def _record_wait(self, started):
+        wait_ms = (time.monotonic() - started) * 1000
+        self.counters['requests'] += 1
+        self.counters['wait_ms_total'] += wait_ms
+        return wait_ms
+
+    def release(self, estimated_tokens=0, used_tokens=None):
+        """Request khatam. used_tokens pata ho (response.usage) to estimate settle karo"""
+        with self._cond:
+            self._release(estimated_tokens, used_tokens)
+
+    def _release(self, estimated_tokens=0, used_tokens=None):
+        self._active -= 1
+        if used_tokens is not None and used_tokens < estimated_tokens:
+            self.tokens.give_back(estimated_tokens - used_tokens)
+        self._dispatch()
+
+    def _release_failed(self, error, attempt, tokens):
+        """
+        Failed request ka slot wapas. 429 pe pause slot chhodne se PEHLE (same
+        lock) set hota hai - warna _dispatch agle waiter ko turant bhej deta.
+        Returns: retry delay, ya None (retry nahi)
+        """
+        retry = attempt < self.retries and is_retryable(error)
+        retry_after = retry_after_seconds(error)
+        delay = backoff_seconds(attempt, retry_after)
+        with self._cond:
+            if getattr(error, 'status_code', None) == 429:
+                self.counters['rate_limited'] += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            if retry:
+                self.counters['retries'] += 1
+            self._release(tokens)
+        if not retry:
+            return None
+        print(f"⚠️ Groq call failed ({error}), retry {attempt + 1}/{self.retries} in {delay:.1f}s")
+        return delay
+
+    # ------------------------------------------------------------ wrappers
+    def call(self, fn, kwargs, priority=PRIORITY_DEFAULT):
+        """
+        fn() = ek network request (sync). Slot le ke chalao, retry on 429/5xx.
+        Returns: (fn ka result, estimated tokens) - caller release() karta hai
+        (streaming mein slot stream khatam hone tak rehta hai)
+        """
+        tokens = estimate_tokens(kwargs)
+        attempt = 0
+        while True:
+            self.acquire(tokens, priority)
+            try:
+                return fn(), tokens
+            except Exception as e:
+                delay = self._release_failed(e, attempt, tokens)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    async def acall(self, fn, kwargs, priority=PRIORITY_DEFAULT):
+        """call() ka async version - fn() coroutine return kare"""
+        tokens = estimate_tokens(kwargs)
+        attempt = 0
+        while True:
+            await self.aacquire(tokens, priority)
+            try:
+                return await fn(), tokens
+            except asyncio.CancelledError:
+                self.release(tokens)
+                raise
+            except Exception as e:
+                delay = self._release_failed(e, attempt, tokens)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def stats(self):
+        with self._cond:
+            counters = dict(self.counters)
+            now = time.monotonic()
+            self.requests.wait_time(0, now)  # refill, taaki levels abhi ke hon
+            self.tokens.wait_time(0, now)
+            snapshot = {
+                'active': self._active,
+                'queue_length': sum(1 for _, _, waiter in self._queue if not waiter.abandoned),
+                'rpm_available': self.requests.level,
+                'tpm_available': self.tokens.level,
+                'paused_seconds': max(0.0, self._paused_until - now),
+            }
+        requests = counters['requests']
+        return {
+            **snapshot,
+            **counters,
+            'wait_ms_mean': counters['wait_ms_total'] / requests if requests else 0.0,
+            'rpm_limit': self.requests.capacity,
+            'tpm_limit': self.tokens.capacity,
+            'max_concurrency': self.max_concurrency,
+        }
+
+
+# Global instance - saare agents / registries ek hi Groq account share karte hain
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Process-wide limiter (lazy)"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter()
+    return _rate_limiter
@@ -0,0 +1,171 @@
+"""
+Bhai, ye Groq responses ka persistent cache hai (LLM layer mein - solver,
+explainer, GroqHandler sab registry ke through isse guzarte hain).
+Same model + same messages (problem + retrieved context) + same temperature /
+max_tokens = same request, pehle har baar Groq pe dobara jaata tha. Ab key =
+sha256(model, messages, temperature, max_tokens), response text SQLite mein.
+
+LLM_CACHE_MODE:
+  - readwrite (default): hit = cached text, miss = Groq call + store
+  - record: hamesha Groq call, response store/overwrite (fixtures banane ke liye)
+  - replay: sirf cache - miss pe LookupError, network kabhi nahi. API key bhi
+    nahi chahiye - tests / benchmarks poori pipeline offline chala sakte hain
+  - off: cache bypass
+
+TTL (LLM_CACHE_TTL_SECONDS) ke baad entry expire (replay mein TTL ignore -
+fixtures expire nahi hote). LLM_CACHE_MAX_ENTRIES se zyada = least recently
+used entries evict.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "readwrite")  # readwrite / record / replay / off
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "llm_cache.db")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+EVICT_FRACTION = 0.1  # cap cross hone pe itna extra evict - har put pe DELETE nahi
+
+MODES = ("readwrite", "record", "replay", "off")
+KEY_FIELDS = ("model", "messages", "temperature", "max_tokens")
+
+
+def request_key(kwargs):
+    """chat.completions.create kwargs -> cache key (stream flag key mein nahi)"""
+    payload = {field: kwargs.get(field) for field in KEY_FIELDS}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite: key -> response text (+ created / last_used for TTL and LRU)"""
+
+    def __init__(self, db_path=None, mode=None, ttl_seconds=None, max_entries=None):
+        self.db_path = db_path or LLM_CACHE_DB
+        self.mode = mode or LLM_CACHE_MODE
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown LLM cache mode: {self.mode}")
+        self.ttl_seconds = LLM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = max_entries or LLM_CACHE_MAX_ENTRIES
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT,
+                created_at REAL,
+                last_used REAL,
+                hits INTEGER DEFAULT 0
+            )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self.conn.commit()
+        self._count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        self.counters = {'lookups': 0, 'hits': 0, 'misses': 0, 'expired': 0,
+                         'stores': 0, 'evicted': 0}
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    @property
+    def replay(self):
+        return self.mode == "replay"
+
+    def get(self, kwargs):
+        """Cached response text ya None. replay mode mein miss = LookupError"""
+        if self.mode in ("off", "record"):
+            return None
+        key = request_key(kwargs)
+        now = time.time()
+        with self._lock:
+            self.counters['lookups'] += 1
+            row = self.conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and not self.replay and now - row[1] > self.ttl_seconds:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                self._count -= 1
+                self.counters['expired'] += 1
+                row = None
+            if row is None:
+                self.counters['misses'] += 1
+                if self.replay:
+                    raise LookupError(f"LLM cache replay miss ({kwargs.get('model')}, key {key[:12]})")
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                              (now, key))
+            self.conn.commit()
+            self.counters['hits'] += 1
+        return row[0]
+
+    def put(self, kwargs, response):
+        """Naya response store (replay / off mein kuch nahi)"""
+        if self.mode in ("off", "replay") or not response:
+            return
+        key = request_key(kwargs)
+        now = time.time()
+        with self._lock:
+            existed = self.conn.execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+            self.conn.execute('''
+                INSERT OR REPLACE INTO responses (key, model, response, created_at, last_used, hits)
+                VALUES (?, ?, ?, ?, ?, 0)
+            ''', (key, kwargs.get('model'), response, now, now))
+            if not existed:
+                self._count += 1
+            self.counters['stores'] += 1
+            if self._count > self.max_entries:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """LRU - cap se neeche + EVICT_FRACTION extra, taaki agla put phir evict na kare"""
+        target = int(self.max_entries * (1 - EVICT_FRACTION))
+        excess = self._count - target
+        self.conn.execute('''
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY last_used ASC LIMIT ?
+            )
+        ''', (excess,))
+        self._count -= excess
+        self.counters['evicted'] += excess
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+            self._count = 0
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters['lookups']
+        return {
+            'mode': self.mode,
+            'entries': self._count,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            **counters,
+            'hit_rate': counters['hits'] / lookups if lookups else 0.0,
+        }
+
+
+# Global instance
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide cache (LLM_CACHE_MODE=off ho to bhi object - get/put no-op)"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = LLMResponseCache()
+    return _response_cache
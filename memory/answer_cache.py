@@ -0,0 +1,318 @@
+"""
+Bhai, ye solver ke aage answer cache hai.
+Har "Solve" click parse -> retrieve -> solve (Groq) -> verify -> explain (Groq)
+poora chalata tha, chahe same sawaal kal solve hoke correct mark ho chuka ho.
+Ab pehle yahan dekhte hain:
+
+  1. exact: canonical problem text (math_normalizer) ka hash - "x²" aur
+     "x^2", extra spaces, case sab same key
+  2. near-duplicate: embedding similarity >= ANSWER_CACHE_SIMILARITY, aur
+     skeleton (numbers, variables, operators, content words - sirf phrasing
+     words hate) bilkul same - "2x+5=13" vs "2x+7=13" ya "red ball" vs
+     "blue ball" embedding mein paas hain par answer alag, to skeleton guard
+     unhe kabhi match nahi hone deta
+
+Sirf positive answers serve hote hain: verifier ne correct bola (confidence
+>= ANSWER_CACHE_MIN_CONFIDENCE) ya user ne "Correct" feedback diya. User ka
+"Incorrect" feedback entry ko hamesha ke liye reject kar deta hai.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from memory.problem_index import ProblemIndex, encode_vector, decode_vector, embedding_signature
+from rag.math_normalizer import canonicalize, expand_concepts, _has_word
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE", "1") == "1"
+ANSWER_CACHE_DB = os.getenv("ANSWER_CACHE_DB", "answer_cache.db")
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.92"))  # cosine, near-dup threshold
+ANSWER_CACHE_MIN_CONFIDENCE = float(os.getenv("ANSWER_CACHE_MIN_CONFIDENCE", "0.8"))
+
+# Entry status - sirf SERVABLE wale hits bante hain
+STATUS_UNVERIFIED = "unverified"  # verifier unsure - feedback se promote ho sakta hai
+STATUS_VERIFIED = "verified"      # verifier ne correct bola
+STATUS_CONFIRMED = "confirmed"    # user ne correct bola
+STATUS_REJECTED = "rejected"      # user ne galat bola - kabhi serve nahi
+SERVABLE = (STATUS_VERIFIED, STATUS_CONFIRMED)
+
+# Sirf ye words skeleton se hatte hain - instruction / filler phrasing. Baaki har word
+# (red / blue, least / most) problem ka content hai, answer badal sakta hai
+PHRASING_WORDS = {'solve', 'find', 'calculate', 'compute', 'determine', 'evaluate', 'obtain',
+                  'get', 'what', 'is', 'are', 'the', 'an', 'of', 'for', 'if', 'then', 'value',
+                  'values', 'please', 'given', 'that', 'using', 'show', 'answer'}
+# Sirf ye concepts skeleton mein ("solve" -> algebra jaisa phrasing-dependent nahi)
+SKELETON_CONCEPTS = ('derivative', 'integral', 'limit')
+_SKELETON_TOKEN = re.compile(r"[a-z]+|\d+(?:\.\d+)?|[=+\-*/^()|<>!]")
+_TRAILING_PUNCT = re.compile(r'[\s.?!:;]+$')
+_OPERATOR_SPACES = re.compile(r'\s*([=+\-*/^()|<>])\s*')
+
+
+def canonical_problem(text):
+    """Cache key ka text: canonical math form, bina trailing punctuation ke"""
+    text = _TRAILING_PUNCT.sub('', canonicalize(text or ""))
+    return _OPERATOR_SPACES.sub(r'\1', text)
+
+
+def problem_key(text):
+    return hashlib.sha256(canonical_problem(text).encode('utf-8')).hexdigest()
+
+
+def math_skeleton(text):
+    """
+    Phrasing hata ke jo bachta hai: numbers, variables, operators, content words
+    + concept terms (derivative / integral / ...).
+    "Solve for x: 2x+5=13" aur "Find x if 2x + 5 = 13" -> same skeleton,
+    "... drawing a red ball" aur "... drawing a blue ball" -> alag.
+    """
+    canonical = canonical_problem(text)
+    tokens = [token for token in _SKELETON_TOKEN.findall(canonical) if token not in PHRASING_WORDS]
+    expanded = expand_concepts(canonical)
+    concepts = [term for term in SKELETON_CONCEPTS if _has_word(expanded, term)]
+    return " ".join(tokens) + " | " + ",".join(concepts)
+
+
+class AnswerCache:
+    """SQLite-backed verified answers + ProblemIndex (sirf servable entries)"""
+
+    def __init__(self, db_path=None, embed_fn=None, similarity=None, min_confidence=None):
+        self.db_path = db_path or ANSWER_CACHE_DB
+        self.embed_fn = embed_fn
+        self.similarity = ANSWER_CACHE_SIMILARITY if similarity is None else similarity
+        self.min_confidence = ANSWER_CACHE_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                problem_key TEXT UNIQUE,
+                skeleton TEXT,
+                problem_text TEXT,
+                topic TEXT,
+                solution TEXT,
+                verification TEXT,
+                explanation TEXT,
+                status TEXT,
+                model TEXT,
+                embedding BLOB,
+                hits INTEGER DEFAULT 0,
+                created_at REAL,
+                last_hit_at REAL
+            )
+        ''')
+        self.conn.commit()
+        self.index = None             # lazy - pehle near-dup lookup pe
+        self.semantic_enabled = True
+        self.counters = {'lookups': 0, 'exact_hits': 0, 'similar_hits': 0, 'misses': 0,
+                         'stored': 0, 'rejected': 0, 'lookup_ms_total': 0.0}
+
+    # ------------------------------------------------------------------ index
+    def _get_index(self):
+        """Servable entries ka embedding index - model na mile to exact-only mode"""
+        if self.index is not None or not self.semantic_enabled:
+            return self.index
+        try:
+            index = ProblemIndex(embed_fn=self.embed_fn)
+            signature = embedding_signature()
+            rows = self.conn.execute(
+                f"SELECT id, problem_text, topic, model, embedding FROM answers "
+                f"WHERE status IN ({','.join('?' * len(SERVABLE))})", SERVABLE
+            ).fetchall()
+            fresh = [row for row in rows if row[3] == signature and row[4] is not None]
+            stale = [row for row in rows if row[3] != signature or row[4] is None]
+            if fresh:
+                index.add([row[0] for row in fresh], [decode_vector(row[4]) for row in fresh],
+                          [row[2] for row in fresh])
+            if stale:
+                vectors = index.embed([row[1] for row in stale])
+                self.conn.executemany(
+                    "UPDATE answers SET model = ?, embedding = ? WHERE id = ?",
+                    [(signature, encode_vector(vector), row[0]) for row, vector in zip(stale, vectors)]
+                )
+                self.conn.commit()
+                index.add([row[0] for row in stale], vectors, [row[2] for row in stale])
+            self.index = index
+            print(f"✅ Answer cache index ready: {len(index)} answers")
+        except Exception as e:
+            print(f"⚠️ Answer cache: near-duplicate matching off, exact only: {e}")
+            self.semantic_enabled = False
+        return self.index
+
+    # ------------------------------------------------------------------ reads
+    def _row_to_hit(self, row, match, score):
+        return {
+            'entry_id': row[0],
+            'match': match,
+            'score': score,
+            'problem_text': row[1],
+            'solution': json.loads(row[2]),
+            'verification': json.loads(row[3]),
+            'explanation': json.loads(row[4]),
+            'status': row[5]
+        }
+
+    def _fetch(self, where, params):
+        return self.conn.execute(
+            f"SELECT id, problem_text, solution, verification, explanation, status, skeleton "
+            f"FROM answers WHERE {where}", params
+        ).fetchone()
+
+    def lookup(self, parsed_problem):
+        """
+        parsed_problem (ParserAgent output) ya plain text.
+        Returns: hit dict {'solution', 'verification', 'explanation', 'match', 'score', ...} ya None
+        """
+        if isinstance(parsed_problem, dict):
+            text, topic = parsed_problem.get('problem_text', ''), parsed_problem.get('topic')
+        else:
+            text, topic = parsed_problem, None
+        if not text or not text.strip():
+            return None
+
+        start = time.perf_counter()
+        with self._lock:
+            self.counters['lookups'] += 1
+            hit = None
+            row = self._fetch("problem_key = ?", (problem_key(text),))
+            if row is not None and row[5] in SERVABLE:
+                hit = self._row_to_hit(row, 'exact', 1.0)
+            elif row is None:
+                hit = self._similar(text, topic)
+
+            if hit is None:
+                self.counters['misses'] += 1
+            else:
+                self.counters[f"{hit['match']}_hits"] += 1
+                self.conn.execute("UPDATE answers SET hits = hits + 1, last_hit_at = ? WHERE id = ?",
+                                  (time.time(), hit['entry_id']))
+                self.conn.commit()
+            self.counters['lookup_ms_total'] += (time.perf_counter() - start) * 1000
+        return hit
+
+    def _similar(self, text, topic):
+        """Nearest servable answer - threshold + same math skeleton dono chahiye"""
+        index = self._get_index()
+        if index is None or not len(index):
+            return None
+        try:
+            vector = index.embed([text])[0]
+        except Exception as e:
+            print(f"⚠️ Answer cache embed failed: {e}")
+            return None
+        skeleton = math_skeleton(text)
+        # Topic filter nahi - parser ka topic galat bhi ho sakta hai, skeleton kaafi strict hai
+        for entry_id, score in index.search(vector, limit=5):
+            if score < self.similarity:
+                break
+            row = self._fetch("id = ?", (entry_id,))
+            # Stored skeleton purane (loose) rules ka ho sakta hai - problem text se dobara
+            if row is not None and row[5] in SERVABLE and math_skeleton(row[1]) == skeleton:
+                return self._row_to_hit(row, 'similar', score)
+        return None
+
+    # ------------------------------------------------------------------ writes
+    def store(self, original_input, parsed_problem, solution, verification, explanation):
+        """
+        Fresh solve ke baad. Verifier positive + confident ho to turant servable,
+        warna unverified (feedback promote kar sakta hai). Returns: entry_id
+        """
+        text = parsed_problem.get('problem_text') or original_input
+        is_positive = bool(verification.get('is_correct')) and \
+            float(verification.get('confidence', 0) or 0) >= self.min_confidence
+        status = STATUS_VERIFIED if is_positive else STATUS_UNVERIFIED
+        key = problem_key(text)
+
+        with self._lock:
+            existing = self._fetch("problem_key = ?", (key,))
+            if existing is not None and existing[5] in (STATUS_REJECTED, STATUS_CONFIRMED):
+                return existing[0]  # user ka verdict fresh verifier se upar
+            # Upsert - sirf content + status; hits / model / embedding wahi rehte hain
+            self.conn.execute('''
+                INSERT INTO answers
+                (problem_key, skeleton, problem_text, topic, solution, verification,
+                 explanation, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(problem_key) DO UPDATE SET
+                    skeleton = excluded.skeleton, problem_text = excluded.problem_text,
+                    topic = excluded.topic, solution = excluded.solution,
+                    verification = excluded.verification, explanation = excluded.explanation,
+                    status = excluded.status
+            ''', (
+                key, math_skeleton(text), text,
+                parsed_problem.get('topic', 'unknown'),
+                json.dumps(solution, default=str), json.dumps(verification, default=str),
+                json.dumps(explanation, default=str), status, time.time()
+            ))
+            self.conn.commit()
+            entry_id = self._fetch("problem_key = ?", (key,))[0]
+            self.counters['stored'] += 1
+            if status in SERVABLE:
+                self._index_entry(entry_id)
+            elif self.index is not None and entry_id in self.index:
+                self.index.remove([entry_id])
+        return entry_id
+
+    def _index_entry(self, entry_id):
+        index = self._get_index()
+        if index is None or entry_id in index:
+            return
+        text, topic = self.conn.execute("SELECT problem_text, topic FROM answers WHERE id = ?",
+                                        (entry_id,)).fetchone()
+        try:
+            vector = index.embed([text])[0]
+        except Exception as e:
+            print(f"⚠️ Answer cache embed failed: {e}")
+            return
+        self.conn.execute("UPDATE answers SET model = ?, embedding = ? WHERE id = ?",
+                          (embedding_signature(), encode_vector(vector), entry_id))
+        self.conn.commit()
+        index.add([entry_id], [vector], [topic])
+
+    def record_feedback(self, entry_id, is_correct):
+        """User feedback: correct -> confirmed (servable), galat -> rejected"""
+        if entry_id is None:
+            return
+        status = STATUS_CONFIRMED if is_correct else STATUS_REJECTED
+        with self._lock:
+            self.conn.execute("UPDATE answers SET status = ? WHERE id = ?", (status, entry_id))
+            self.conn.commit()
+            if is_correct:
+                self._index_entry(entry_id)
+            else:
+                self.counters['rejected'] += 1
+                if self.index is not None and entry_id in self.index:
+                    self.index.remove([entry_id])
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            by_status = dict(self.conn.execute(
+                "SELECT status, COUNT(*) FROM answers GROUP BY status").fetchall())
+        hits = counters['exact_hits'] + counters['similar_hits']
+        lookups = counters.pop('lookups')
+        lookup_ms_total = counters.pop('lookup_ms_total')
+        return {
+            'enabled': True,
+            'lookups': lookups,
+            **counters,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'lookup_ms_mean': lookup_ms_total / lookups if lookups else 0.0,
+            'entries': by_status,
+            'indexed': len(self.index) if self.index is not None else 0,
+            'similarity_threshold': self.similarity
+        }
+
+
+# Global instance - saare Streamlit sessions ek hi cache share karte hain
+answer_cache = None
+
+def get_answer_cache():
+    """ANSWER_CACHE=0 ho to None"""
+    global answer_cache
+    if answer_cache is None and ANSWER_CACHE_ENABLED:
+        answer_cache = AnswerCache()
+    return answer_cache
@@ -5,17 +5,28 @@ Memory store ke liye use karenge.
 
 import sqlite3
 import json
+import time
 import datetime
+import numpy as np
 from typing import List, Dict, Any, Optional
 
+from memory.problem_index import (
+    ProblemIndex, PROBLEM_INDEX_ENABLED, PROBLEM_INDEX_MIN_SCORE, BACKFILL_BATCH_SIZE,
+    encode_vector, decode_vector, embedding_signature
+)
+
 class MemoryDatabase:
-    def __init__(self, db_path: str = "math_mentor_memory.db"):
+    def __init__(self, db_path: str = "math_mentor_memory.db", embed_fn=None):
         """
         SQLite database initialize karo
+        embed_fn: texts -> vectors (default: RAG wala MiniLM model)
         """
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        self.embed_fn = embed_fn
+        self.problem_index = None      # lazy - pehli similarity search pe
+        self.semantic_enabled = PROBLEM_INDEX_ENABLED
         self.init_database()
         
     def get_connection(self):
@@ -73,6 +84,16 @@ class MemoryDatabase:
             )
         ''')
         
+        # Problem embeddings - semantic similar-problem index ka source of truth
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS problem_embeddings (
+                problem_id INTEGER PRIMARY KEY,
+                model TEXT,
+                embedding BLOB,
+                FOREIGN KEY (problem_id) REFERENCES problems (id)
+            )
+        ''')
+        
         # Feedback table
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS feedback (
@@ -119,6 +140,19 @@ class MemoryDatabase:
         self.conn.commit()
         problem_id = self.cursor.lastrowid
         print(f"✅ Stored problem with ID: {problem_id}")
+        
+        # Similar-problem index mein incremental add - sirf agar index ban chuka hai.
+        # Nahi bana to yahan model load / backfill nahi (solve path pe seconds lagte);
+        # pehli similarity query ka backfill is problem ko bhi utha lega.
+        index = self.problem_index
+        if index is not None and problem_id not in index:
+            try:
+                self._index_problems([(
+                    problem_id, parsed_problem.get('problem_text', ''),
+                    parsed_problem.get('topic', 'unknown')
+                )])
+            except Exception as e:
+                print(f"⚠️ Problem embedding failed (ID {problem_id}): {e}")
         return problem_id
     
     def store_solution(self, problem_id: int, solution: Dict) -> int:
@@ -262,10 +296,101 @@ class MemoryDatabase:
         print(f"✅ Stored feedback with ID: {feedback_id}")
         return feedback_id
     
+    def get_problem_index(self) -> Optional[ProblemIndex]:
+        """
+        Semantic index lazily banao: SQLite se saved embeddings load, missing
+        (ya purane model wale) problems ka backfill. Model load na ho to None.
+        """
+        if self.problem_index is not None or not self.semantic_enabled:
+            return self.problem_index
+        try:
+            start = time.perf_counter()
+            index = ProblemIndex(embed_fn=self.embed_fn)
+            signature = embedding_signature()
+            
+            cursor = self.conn.execute('''
+                SELECT e.problem_id, p.topic, e.embedding
+                FROM problem_embeddings e JOIN problems p ON p.id = e.problem_id
+                WHERE e.model = ?
+            ''', (signature,))
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                index.add([row[0] for row in rows],
+                          np.stack([decode_vector(row[2]) for row in rows]),
+                          [row[1] for row in rows])
+            loaded = len(index)
+            self.problem_index = index
+            
+            # Backfill: naye table se pehle ke problems, ya model badla
+            missing = self.conn.execute('''
+                SELECT id, problem_text, topic FROM problems
+                WHERE id NOT IN (SELECT problem_id FROM problem_embeddings WHERE model = ?)
+            ''', (signature,)).fetchall()
+            for begin in range(0, len(missing), BACKFILL_BATCH_SIZE):
+                self._index_problems(missing[begin:begin + BACKFILL_BATCH_SIZE])
+            
+            print(f"✅ Problem index ready: {loaded} loaded, {len(missing)} embedded "
+                  f"({time.perf_counter() - start:.2f}s)")
+        except Exception as e:
+            print(f"⚠️ Semantic problem index unavailable, LIKE search fallback: {e}")
+            self.problem_index = None
+            self.semantic_enabled = False
+        return self.problem_index
+    
+    def _index_problems(self, rows):
+        """rows: [(problem_id, problem_text, topic)] -> embed, SQLite + index mein"""
+        vectors = self.problem_index.embed([row[1] for row in rows])
+        signature = embedding_signature()
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO problem_embeddings (problem_id, model, embedding)
+            VALUES (?, ?, ?)
+        ''', [(row[0], signature, encode_vector(vector)) for row, vector in zip(rows, vectors)])
+        self.conn.commit()
+        self.problem_index.add([row[0] for row in rows], vectors, [row[2] for row in rows])
+    
+    def find_similar(self, problem_text: str, limit: int = 5, topic: Optional[str] = None,
+                     min_score: Optional[float] = None,
+                     exclude_id: Optional[int] = None) -> List[Dict]:
+        """
+        Embedding similarity se nearest stored problems.
+        Returns: [{'id', 'problem_text', 'topic', 'created_at', 'score'}] best pehle
+        """
+        index = self.get_problem_index()
+        if index is None or not len(index):
+            return []
+        min_score = PROBLEM_INDEX_MIN_SCORE if min_score is None else min_score
+        
+        vector = index.embed([problem_text])[0]
+        neighbors = index.search(vector, limit + (1 if exclude_id is not None else 0), topic)
+        neighbors = [(problem_id, score) for problem_id, score in neighbors
+                     if problem_id != exclude_id and score >= min_score][:limit]
+        if not neighbors:
+            return []
+        
+        placeholders = ",".join("?" * len(neighbors))
+        rows = self.conn.execute(f'''
+            SELECT id, problem_text, topic, created_at
+            FROM problems WHERE id IN ({placeholders})
+        ''', [problem_id for problem_id, _ in neighbors]).fetchall()
+        by_id = {row[0]: row for row in rows}
+        
+        return [{
+            'id': problem_id,
+            'problem_text': by_id[problem_id][1],
+            'topic': by_id[problem_id][2],
+            'created_at': by_id[problem_id][3],
+            'score': float(score)
+        } for problem_id, score in neighbors if problem_id in by_id]
+    
     def find_similar_problems(self, problem_text: str, limit: int = 5) -> List[Dict]:
         """
-        Similar problems find karo using text similarity
+        Similar problems find karo - semantic index, na mile to text LIKE fallback
         """
+        if self.get_problem_index() is not None:
+            return self.find_similar(problem_text, limit)
+        
         # Simple text-based similarity
         search_term = f"%{problem_text[:20]}%"
         
@@ -328,6 +453,9 @@ class MemoryDatabase:
         self.cursor.execute("SELECT COUNT(*) FROM feedback WHERE is_correct = 0")
         stats['negative_feedback'] = self.cursor.fetchone()[0]
         
+        if self.problem_index is not None:
+            stats['problem_index'] = self.problem_index.stats()
+        
         return stats
     
     def close(self):
@@ -0,0 +1,277 @@
+"""
+Bhai, ye stored problems ka semantic similarity index hai.
+Purana find_similar_problems `LIKE '%pehle 20 chars%'` karta tha - full table
+scan, aur sirf exact prefix match. Ab har problem ka embedding (wahi MiniLM
+jo RAG use karta hai, canonical math text pe) SQLite mein BLOB ban ke rehta
+hai, aur RAM mein is index mein:
+
+  - chhota table (< PROBLEM_INDEX_IVF_MIN): exact brute-force, ek mat-vec
+  - bada table: IVF (k-means coarse lists) - query sirf nprobe nearest lists
+    scan karti hai. 1M problems pe bhi ~ms, brute-force ~300ms tha.
+  - store_problem pe incremental add: naye rows "tail" mein, har query pe
+    exact scan; tail bada ho to lists rebuild, size double ho to centroids retrain
+  - lists rebuild pe rows list-order mein permute hote hain, to har list ek
+    contiguous slice hai - probe = mat-vec on a view, gather copy nahi
+  - topic filter numpy mask se (Python loop nahi)
+"""
+
+import os
+import threading
+import numpy as np
+
+PROBLEM_INDEX_ENABLED = os.getenv("PROBLEM_INDEX", "1") == "1"
+PROBLEM_INDEX_MIN_SCORE = float(os.getenv("PROBLEM_INDEX_MIN_SCORE", "0.5"))  # cosine, isse kam = similar nahi
+PROBLEM_INDEX_IVF_MIN = int(os.getenv("PROBLEM_INDEX_IVF_MIN", "50000"))   # isse chhota = exact search
+PROBLEM_INDEX_NPROBE = int(os.getenv("PROBLEM_INDEX_NPROBE", "8"))         # zyada = better recall, slower
+BACKFILL_BATCH_SIZE = 256
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE_PER_LIST = 64
+ASSIGN_BLOCK_ROWS = 65536
+TAIL_REBUILD_FRACTION = 0.1  # tail > 10% of indexed rows -> lists rebuild
+
+
+def encode_vector(vector):
+    """float32 vector -> SQLite BLOB"""
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode_vector(blob):
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+def embedding_signature():
+    """Embeddings kis model + normalizer se bane - badle to re-embed"""
+    from rag.embedders import embedder_id, EMBEDDING_BACKEND
+    from rag.math_normalizer import normalizer_signature
+    from rag.vector_store import EMBEDDING_MODEL
+    return f"{embedder_id(EMBEDDING_MODEL, EMBEDDING_BACKEND)}|{normalizer_signature()}"
+
+
+def _default_embed(texts):
+    """RAG vector store ka model (+ embedding cache / RAG server) reuse karo"""
+    from rag.vector_store import get_vector_store
+    return get_vector_store().embed_texts(texts)
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _assign(vectors, centroids):
+    """Har row ka nearest centroid (blocks mein - (N, nlist) matrix ek saath nahi)"""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for begin in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+        block = vectors[begin:begin + ASSIGN_BLOCK_ROWS]
+        assignments[begin:begin + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(vectors, nlist, seed=0):
+    """Spherical k-means on a sample - centroids bhi unit length"""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=nlist)
+        nonempty = counts > 0
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[nonempty]
+        centroids[nonempty] = np.add.reduceat(sample[order], starts, axis=0)
+        centroids = _normalize(centroids)
+    return centroids
+
+
+class ProblemIndex:
+    """
+    problem_id -> normalized embedding (+ topic code, filter ke liye).
+    Thread-safe; vectors ek growing float32 matrix mein (capacity doubling).
+    """
+
+    def __init__(self, embed_fn=None, ivf_min=None, nprobe=None):
+        self.embed_fn = embed_fn or _default_embed
+        self.ivf_min = PROBLEM_INDEX_IVF_MIN if ivf_min is None else ivf_min
+        self.nprobe = nprobe or PROBLEM_INDEX_NPROBE
+        self._lock = threading.RLock()
+        self._vectors = None                          # (capacity, d)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._topics = np.zeros(0, dtype=np.int16)
+        self._alive = np.zeros(0, dtype=bool)        # remove() = tombstone, list layout same
+        self._removed = 0
+        self._size = 0
+        self._row_of = {}
+        self._topic_codes = {}
+        # IVF state: rows [0, _listed) list-order mein, baaki tail (exact scan)
+        self._centroids = None
+        self._list_offsets = None  # list i = rows offsets[i]:offsets[i+1]
+        self._listed = 0
+        self._trained_size = 0
+
+    def __len__(self):
+        return self._size - self._removed
+
+    def __contains__(self, problem_id):
+        return int(problem_id) in self._row_of
+
+    def embed(self, texts):
+        """Problem texts -> (N, d) float32, canonical math form mein"""
+        from rag.math_normalizer import embedding_text
+        vectors = self.embed_fn([embedding_text(text or "") for text in texts])
+        return np.asarray(vectors, dtype=np.float32)
+
+    # ------------------------------------------------------------------ writes
+    def _topic_code(self, topic):
+        topic = topic or 'unknown'
+        if topic not in self._topic_codes:
+            self._topic_codes[topic] = len(self._topic_codes)
+        return self._topic_codes[topic]
+
+    def _grow(self, needed, dim):
+        capacity = 0 if self._vectors is None else len(self._vectors)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        vectors = np.zeros((capacity, dim), dtype=np.float32)
+        ids = np.zeros(capacity, dtype=np.int64)
+        topics = np.zeros(capacity, dtype=np.int16)
+        alive = np.zeros(capacity, dtype=bool)
+        if self._size:
+            vectors[:self._size] = self._vectors[:self._size]
+            ids[:self._size] = self._ids[:self._size]
+            topics[:self._size] = self._topics[:self._size]
+            alive[:self._size] = self._alive[:self._size]
+        self._vectors, self._ids, self._topics, self._alive = vectors, ids, topics, alive
+
+    def add(self, problem_ids, vectors, topics=None):
+        """Incremental add / replace (same problem_id dobara = vector overwrite)"""
+        if not len(problem_ids):
+            return
+        vectors = _normalize(vectors)
+        topics = topics or [None] * len(problem_ids)
+        with self._lock:
+            self._grow(self._size + len(problem_ids), vectors.shape[1])
+            rows = []
+            for problem_id in problem_ids:
+                problem_id = int(problem_id)
+                row = self._row_of.get(problem_id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._row_of[problem_id] = row
+                    self._ids[row] = problem_id
+                elif row < self._listed:
+                    self._listed = 0  # listed row badla - lists rebuild
+                rows.append(row)
+            self._vectors[rows] = vectors
+            self._topics[rows] = [self._topic_code(topic) for topic in topics]
+            self._alive[rows] = True
+
+    def remove(self, problem_ids):
+        """Tombstone - row search mein skip hota hai, agle lists rebuild pe bhi rehta hai"""
+        with self._lock:
+            for problem_id in problem_ids:
+                row = self._row_of.pop(int(problem_id), None)
+                if row is not None:
+                    self._alive[row] = False
+                    self._removed += 1
+
+    # ------------------------------------------------------------------ IVF
+    def _maintain(self):
+        """Size ke hisaab se IVF train/rebuild - query pe lazily"""
+        if self._size < self.ivf_min:
+            return
+        vectors = self._vectors[:self._size]
+        if self._centroids is None or self._size >= 2 * self._trained_size:
+            nlist = max(16, int(np.sqrt(self._size) / 4))
+            self._centroids = train_centroids(vectors, nlist)
+            self._trained_size = self._size
+            self._listed = 0
+        tail = self._size - self._listed
+        if self._listed == 0 or tail > TAIL_REBUILD_FRACTION * self._listed:
+            # Already listed rows ka list = position se (offsets), sirf tail assign karo
+            assignments = np.empty(self._size, dtype=np.int32)
+            if self._listed:
+                assignments[:self._listed] = np.repeat(
+                    np.arange(len(self._centroids), dtype=np.int32), np.diff(self._list_offsets))
+            assignments[self._listed:] = _assign(vectors[self._listed:], self._centroids)
+
+            # Rows ko list-order mein permute - har list contiguous
+            order = np.argsort(assignments, kind='stable')
+            self._vectors[:self._size] = vectors[order]
+            self._ids[:self._size] = self._ids[:self._size][order]
+            self._topics[:self._size] = self._topics[:self._size][order]
+            self._alive[:self._size] = self._alive[:self._size][order]
+            self._row_of = {int(problem_id): row
+                            for row, (problem_id, alive) in enumerate(zip(
+                                self._ids[:self._size].tolist(), self._alive[:self._size].tolist()))
+                            if alive}
+            counts = np.bincount(assignments, minlength=len(self._centroids))
+            self._list_offsets = np.concatenate([[0], np.cumsum(counts)])
+            self._listed = self._size
+
+    def _candidate_ranges(self, query):
+        """IVF: nprobe nearest lists + unlisted tail, as (start, end) row ranges"""
+        self._maintain()
+        if self._centroids is None or self._size < self.ivf_min:
+            return [(0, self._size)]
+        nprobe = min(self.nprobe, len(self._centroids))
+        probes = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+        ranges = [(int(self._list_offsets[i]), int(self._list_offsets[i + 1])) for i in probes]
+        ranges.append((self._listed, self._size))
+        return [(start, end) for start, end in ranges if end > start]
+
+    # ------------------------------------------------------------------ reads
+    def search(self, vector, limit=5, topic=None):
+        """Returns: [(problem_id, cosine score)] best pehle"""
+        query = _normalize(vector)[0]
+        with self._lock:
+            if not self._size or limit <= 0:
+                return []
+            code = None
+            if topic is not None:
+                code = self._topic_codes.get(topic)
+                if code is None:
+                    return []
+
+            # Har range (contiguous view) ka apna top-k, phir merge
+            candidate_rows, candidate_scores = [], []
+            for start, end in self._candidate_ranges(query):
+                scores = self._vectors[start:end] @ query
+                rows = np.arange(start, end)
+                mask = None
+                if code is not None:
+                    mask = self._topics[start:end] == code
+                if self._removed:
+                    alive = self._alive[start:end]
+                    mask = alive if mask is None else mask & alive
+                if mask is not None:
+                    scores, rows = scores[mask], rows[mask]
+                if len(scores) > limit:
+                    top = np.argpartition(-scores, limit - 1)[:limit]
+                    scores, rows = scores[top], rows[top]
+                candidate_rows.append(rows)
+                candidate_scores.append(scores)
+
+            rows = np.concatenate(candidate_rows) if candidate_rows else np.zeros(0, dtype=np.int64)
+            scores = np.concatenate(candidate_scores) if candidate_scores else np.zeros(0)
+            order = np.argsort(-scores)[:limit]
+            return [(int(self._ids[row]), float(score)) for row, score in zip(rows[order], scores[order])]
+
+    def stats(self):
+        with self._lock:
+            dim = self._vectors.shape[1] if self._vectors is not None else 0
+            return {
+                'problems': len(self),
+                'removed': self._removed,
+                'mode': 'ivf' if self._centroids is not None and self._size >= self.ivf_min else 'exact',
+                'lists': len(self._centroids) if self._centroids is not None else 0,
+                'nprobe': self.nprobe,
+                'unlisted_tail': self._size - self._listed if self._centroids is not None else 0,
+                'vector_bytes': self._size * dim * 4,
+            }
@@ -0,0 +1,746 @@
+"""
+Bhai, ye RAG retrieval ka benchmark hai.
+Labeled queries pe recall@k aur latency naapte hain - dense vs hybrid.
+Har subcommand --json path ke saath report JSON mein bhi likhta hai (runs compare karne ke liye).
+
+Run: python -m rag.benchmark            (dense vs hybrid)
+     python -m rag.benchmark suite [--json report.json]
+                                        (full harness: KB dataset, recall@k, MRR, p50/p95/p99,
+                                         concurrency throughput, cold vs warm - offline)
+     python -m rag.benchmark backends   (Chroma vs NumPy index, synthetic vectors)
+     python -m rag.benchmark quantization  (float32 vs float16 / int8 memory + recall)
+     python -m rag.benchmark embedders  (PyTorch vs ONNX embedder: cold start + latency)
+     python -m rag.benchmark normalization  (legacy enhance_query vs math canonicalization)
+     python -m rag.benchmark rerank     (cross-encoder reranking: precision@2 vs added latency)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Labeled query set: query -> relevant chunk mein ye text hona chahiye.
+# Chunk IDs chunking ke saath badalte hain, isliye content marker se match karte hain.
+LABELED_QUERIES = [
+    {"query": "How to solve a quadratic equation?", "relevant": ["quadratic formula"]},
+    {"query": "nature of roots when discriminant is negative", "relevant": ["d < 0"]},
+    {"query": "sum of n terms of an AP", "relevant": ["s_n = n/2"]},
+    {"query": "infinite GP sum", "relevant": ["s_∞"]},
+    {"query": "C(n,k) binomial coefficient", "relevant": ["c(n,k) = n!"]},
+    {"query": "derivative of x^n", "relevant": ["d/dx(x^n)"]},
+    {"query": "chain rule differentiation", "relevant": ["chain rule:"]},
+    {"query": "lim x→0 sin x / x", "relevant": ["sin x / x = 1"]},
+    {"query": "integrate 1/x", "relevant": ["ln|x| + c"]},
+    {"query": "P(A ∪ B) addition rule", "relevant": ["p(a ∪ b)"]},
+    {"query": "conditional probability of A given B", "relevant": ["p(a|b) = p(a ∩ b)"]},
+    {"query": "Bayes theorem", "relevant": ["bayes theorem"]},
+    {"query": "variance of random variable", "relevant": ["var(x)"]},
+    {"query": "determinant of 2x2 matrix", "relevant": ["|a| = ad - bc"]},
+    {"query": "dot product of vectors", "relevant": ["a·b"]},
+    {"query": "sin²θ + cos²θ", "relevant": ["sin²θ + cos²θ = 1"]},
+    {"query": "cos 2θ double angle formula", "relevant": ["cos 2θ"]},
+    {"query": "sin 3θ triple angle", "relevant": ["sin 3θ"]},
+    {"query": "value of sin 30°", "relevant": ["sin 30°"]},
+    {"query": "tan(A + B) formula", "relevant": ["tan(a ± b)"]},
+    {"query": "distance between two points", "relevant": ["distance between"]},
+    {"query": "section formula internal division", "relevant": ["internal division"]},
+    {"query": "equation of circle with center (h,k)", "relevant": ["(x-h)²"]},
+    {"query": "ellipse x²/a² + y²/b² = 1", "relevant": ["ellipse"]},
+    {"query": "slope of line through two points", "relevant": ["slope m"]},
+    {"query": "common mistakes in probability", "relevant": ["confusing p(a|b)"]},
+    {"query": "steps to evaluate a limit 0/0", "relevant": ["l'hopital"]},
+]
+
+
+# Same sawaal alag notation mein (LaTeX, ASCII, spoken) - canonicalization ke liye
+NOTATION_QUERIES = [
+    {"query": r"\sin^2\theta + \cos^2\theta", "relevant": ["sin²θ + cos²θ = 1"]},
+    {"query": "sin^2 theta + cos^2 theta", "relevant": ["sin²θ + cos²θ = 1"]},
+    {"query": r"x = \frac{-b \pm \sqrt{b^2 - 4ac}}{2a}", "relevant": ["quadratic formula"]},
+    {"query": "b**2 - 4*a*c discriminant", "relevant": ["d = b² - 4ac"]},
+    {"query": r"\binom{n}{k}", "relevant": ["c(n,k) = n!"]},
+    {"query": r"\int \frac{1}{x} dx", "relevant": ["ln|x| + c"]},
+    {"query": r"\frac{d}{dx} x^{n}", "relevant": ["d/dx(x^n)"]},
+    {"query": r"\lim_{x \to 0} \frac{\sin x}{x}", "relevant": ["sin x / x = 1"]},
+    {"query": "x squared over a squared plus y squared over b squared", "relevant": ["ellipse"]},
+    {"query": r"P(A \cup B)", "relevant": ["p(a ∪ b)"]},
+    {"query": "S_{\\infty} = a/(1-r)", "relevant": ["s_∞"]},
+    {"query": r"\cos 2\theta", "relevant": ["cos 2θ"]},
+]
+
+
+def _legacy_enhance_query(query):
+    """Purana Retriever.enhance_query - before/after comparison ke liye"""
+    enhanced = query.lower()
+    patterns = {
+        'derivative': ['differentiate', 'derivative', 'rate of change'],
+        'integral': ['integral', 'integration', 'antiderivative'],
+        'probability': ['probability', 'chance', 'likelihood'],
+        'algebra': ['solve', 'equation', 'polynomial'],
+        'matrix': ['matrix', 'determinant', 'eigenvalue']
+    }
+    for term, synonyms in patterns.items():
+        if any(syn in enhanced for syn in synonyms) and term not in enhanced:
+            enhanced = f"{enhanced} {term}"
+    enhanced = re.sub(r'[^\w\s\.\?]', ' ', enhanced)
+    return re.sub(r'\s+', ' ', enhanced).strip()
+
+
+def is_relevant(result, labeled):
+    """Result ka content kisi relevant marker ko contain karta hai?"""
+    content = result['content'].lower()
+    return any(marker in content for marker in labeled['relevant'])
+
+
+def percentile(values, pct):
+    """Simple nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def evaluate(retrieve_fn, queries=None, k=5):
+    """
+    retrieve_fn(query, top_k) -> results list.
+    Returns: recall@k, precision@k, MRR aur latency stats (ms)
+    """
+    queries = queries or LABELED_QUERIES
+    hits = 0
+    relevant_found = 0
+    reciprocal_ranks = []
+    latencies = []
+
+    for labeled in queries:
+        start = time.perf_counter()
+        results = retrieve_fn(labeled['query'], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        flags = [is_relevant(result, labeled) for result in results[:k]]
+        relevant_found += sum(flags)
+        if any(flags):
+            hits += 1
+        reciprocal_ranks.append(1 / (flags.index(True) + 1) if any(flags) else 0.0)
+
+    return {
+        'queries': len(queries),
+        'k': k,
+        'recall_at_k': hits / len(queries) if queries else 0.0,
+        'precision_at_k': relevant_found / (k * len(queries)) if queries else 0.0,
+        'mrr': statistics.mean(reciprocal_ranks) if reciprocal_ranks else 0.0,
+        'latency_ms_mean': statistics.mean(latencies) if latencies else 0.0,
+        'latency_ms_p50': percentile(latencies, 50),
+        'latency_ms_p95': percentile(latencies, 95),
+        'latency_ms_p99': percentile(latencies, 99),
+    }
+
+
+def compare_retrieval_modes(k_values=(1, 3, 5)):
+    """Dense-only vs hybrid (BM25 + dense) compare karo"""
+    from .retriever import Retriever
+
+    retriever = Retriever(lazy=False)
+    # Warm-up: model load + BM25 build benchmark mein count na ho
+    retriever.retrieve("warm up", top_k=1, mode="dense")
+    retriever.retrieve("warm up", top_k=1, mode="hybrid")
+
+    report = {}
+    for mode in ("dense", "hybrid"):
+        report[mode] = {}
+        for k in k_values:
+            report[mode][f"@{k}"] = evaluate(
+                lambda query, top_k: retriever.retrieve(query, top_k=top_k, mode=mode),
+                k=k
+            )
+    return report
+
+
+def compare_reranking(k=2, budgets_ms=(0, 150, 50)):
+    """
+    Reranker off vs on (alag budgets, 0 = unlimited): precision@k, hit@1
+    aur added latency. Query cache band - har query asli kaam kare.
+    """
+    from .retriever import Retriever
+    from .reranker import CrossEncoderReranker
+
+    def run(retriever, label):
+        retriever.query_cache.max_entries = 0
+        stats = evaluate(lambda q, top_k: retriever.retrieve(q, top_k=top_k), k=k)
+        stats['hit_at_1'] = evaluate(lambda q, top_k: retriever.retrieve(q, top_k=top_k),
+                                     k=1)['recall_at_k']
+        report[label] = stats
+
+    report = {}
+    baseline = Retriever(lazy=False, rerank=False)
+    baseline.retrieve("warm up", top_k=1)
+    run(baseline, "no rerank")
+
+    for budget in budgets_ms:
+        label = "rerank unlimited" if budget == 0 else f"rerank {budget:g} ms"
+        retriever = Retriever(lazy=False, rerank=False)
+        retriever.reranker = CrossEncoderReranker(budget_ms=budget, cache_size=0)
+        retriever.retrieve("warm up", top_k=2)  # model load benchmark mein nahi
+        run(retriever, label)
+        report[label]['reranker'] = retriever.reranker.stats()
+
+    base_ms = report["no rerank"]['latency_ms_mean']
+    for stats in report.values():
+        stats['added_ms'] = stats['latency_ms_mean'] - base_ms
+    return report
+
+
+def _kb_chunks():
+    """Knowledge base ke chunks (ids, texts) - vector store ke bina"""
+    from .chunker import chunk_markdown
+    from .kb_sync import KNOWLEDGE_BASE_DIR, make_chunk_ids
+
+    ids, texts = [], []
+    for file_name in sorted(os.listdir(KNOWLEDGE_BASE_DIR)):
+        if file_name.endswith('.md'):
+            with open(os.path.join(KNOWLEDGE_BASE_DIR, file_name), 'r', encoding='utf-8') as f:
+                chunks = chunk_markdown(f.read())
+            chunk_ids, _ = make_chunk_ids(file_name, chunks)
+            ids.extend(chunk_ids)
+            texts.extend(chunk['text'] for chunk in chunks)
+    return ids, texts
+
+
+def compare_normalization(k=3, dense=True):
+    """
+    Recall@k before/after: legacy enhance_query (symbols strip) vs math
+    canonicalization. BM25 hamesha; dense sirf jab embedding model available ho
+    (legacy: raw chunks embed, canonical: canonical chunks embed).
+    """
+    from .bm25_index import BM25Index
+    from .math_normalizer import normalize_query, canonicalize
+
+    ids, texts = _kb_chunks()
+    query_sets = {'labeled': LABELED_QUERIES, 'notation': NOTATION_QUERIES}
+    bm25 = BM25Index().build(ids, texts)
+    report = {}
+
+    for name, queries in query_sets.items():
+        report[f"bm25/{name}"] = {
+            'legacy': evaluate(lambda q, top_k: bm25.search(_legacy_enhance_query(q), top_k),
+                               queries, k)['recall_at_k'],
+            'canonical': evaluate(lambda q, top_k: bm25.search(normalize_query(q), top_k),
+                                  queries, k)['recall_at_k']
+        }
+
+    if dense:
+        try:
+            from .embedders import load_embedder
+            from .vector_store import EMBEDDING_MODEL
+            embedder = load_embedder(EMBEDDING_MODEL)
+        except Exception as e:
+            print(f"⚠️ Dense comparison skipped: {e}")
+            return report
+
+        raw_matrix = embedder.encode(texts, batch_size=64)
+        canonical_matrix = embedder.encode([canonicalize(text) for text in texts], batch_size=64)
+
+        def dense_search(matrix, query_text, top_k):
+            scores = matrix @ embedder.encode(query_text)
+            return [{'content': texts[i], 'score': float(scores[i])}
+                    for i in np.argsort(-scores)[:top_k]]
+
+        for name, queries in query_sets.items():
+            report[f"dense/{name}"] = {
+                'legacy': evaluate(lambda q, top_k: dense_search(
+                    raw_matrix, _legacy_enhance_query(q), top_k), queries, k)['recall_at_k'],
+                'canonical': evaluate(lambda q, top_k: dense_search(
+                    canonical_matrix, normalize_query(q), top_k), queries, k)['recall_at_k']
+            }
+    return report
+
+
+def _time_queries(query_fn, query_vectors):
+    """Har query ki latency (ms)"""
+    latencies = []
+    for vector in query_vectors:
+        start = time.perf_counter()
+        query_fn(vector)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def benchmark_backends(sizes=(1000, 10000, 100000), dim=384, n_queries=100, top_k=5, seed=0):
+    """
+    Chroma (HNSW, in-memory client) vs NumPy brute-force index.
+    Synthetic normalized vectors - sirf index/query cost naapte hain, model nahi.
+    """
+    import chromadb
+    from .numpy_index import NumpyIndex, _normalize
+
+    rng = np.random.default_rng(seed)
+    report = {}
+
+    for size in sizes:
+        vectors = _normalize(rng.standard_normal((size, dim)))
+        queries = _normalize(rng.standard_normal((n_queries, dim)))
+        ids = [f"chunk_{i}" for i in range(size)]
+        docs = [f"chunk {i}" for i in range(size)]
+        metas = [{"source": "synthetic"} for _ in range(size)]
+        row = {}
+
+        # NumPy backend
+        index = NumpyIndex(tempfile.mkdtemp(), mmap=False)
+        start = time.perf_counter()
+        index.upsert(ids, vectors, docs, metas)
+        index.query(queries[:1], n_results=top_k)  # pending batches consolidate
+        row['numpy_build_s'] = time.perf_counter() - start
+        latencies = _time_queries(lambda v: index.query([v], n_results=top_k), queries)
+        start = time.perf_counter()
+        index.query(queries, n_results=top_k)
+        batched = (time.perf_counter() - start) * 1000
+        row.update(numpy_p50_ms=percentile(latencies, 50), numpy_p95_ms=percentile(latencies, 95),
+                   numpy_batched_ms_per_query=batched / n_queries)
+
+        # Chroma backend
+        client = chromadb.EphemeralClient()
+        name = f"bench_{size}"
+        try:
+            client.delete_collection(name)
+        except Exception:
+            pass
+        collection = client.create_collection(name, metadata={"hnsw:space": "cosine"})
+        try:
+            batch = client.get_max_batch_size()
+        except Exception:
+            batch = 5000
+        start = time.perf_counter()
+        for begin in range(0, size, batch):
+            end = begin + batch
+            collection.add(ids=ids[begin:end], embeddings=vectors[begin:end].tolist(),
+                           documents=docs[begin:end], metadatas=metas[begin:end])
+        row['chroma_build_s'] = time.perf_counter() - start
+        latencies = _time_queries(
+            lambda v: collection.query(query_embeddings=[v.tolist()], n_results=top_k), queries
+        )
+        start = time.perf_counter()
+        collection.query(query_embeddings=queries.tolist(), n_results=top_k)
+        batched = (time.perf_counter() - start) * 1000
+        row.update(chroma_p50_ms=percentile(latencies, 50), chroma_p95_ms=percentile(latencies, 95),
+                   chroma_batched_ms_per_query=batched / n_queries)
+        client.delete_collection(name)
+
+        report[size] = row
+    return report
+
+
+def benchmark_quantization(size=100000, dim=384, n_queries=200, top_k=10,
+                           rescore_factors=(1, 4), seed=0):
+    """
+    Quantized NumPy index ka memory footprint aur recall@k loss, exact
+    float32 search ke against. Queries = stored vectors + noise (realistic
+    near-neighbour setup, random queries pe recall meaningless hota hai).
+    """
+    from .numpy_index import NumpyIndex, _normalize
+
+    rng = np.random.default_rng(seed)
+    vectors = _normalize(rng.standard_normal((size, dim)))
+    picks = rng.choice(size, n_queries, replace=False)
+    noise = rng.standard_normal((n_queries, dim)) * (2.0 / np.sqrt(dim))
+    queries = _normalize(vectors[picks] + noise)
+    ids = [f"chunk_{i}" for i in range(size)]
+
+    exact = NumpyIndex(tempfile.mkdtemp(), mmap=False, quantization="none")
+    exact.upsert(ids, vectors)
+    truth = exact.query(queries, n_results=top_k)['ids']
+
+    report = {'none': {**exact.memory_footprint(), 'recall_at_k': 1.0,
+                       'latency_ms_per_query': _mean_query_ms(exact, queries, top_k)}}
+    for mode in ("float16", "int8"):
+        for factor in rescore_factors:
+            index = NumpyIndex(tempfile.mkdtemp(), mmap=False, quantization=mode,
+                               rescore_factor=factor)
+            index.upsert(ids, vectors)
+            found = index.query(queries, n_results=top_k)['ids']
+            recall = statistics.mean(len(set(a) & set(b)) / top_k for a, b in zip(found, truth))
+            report[f"{mode}/rescore x{factor}"] = {
+                **index.memory_footprint(),
+                'recall_at_k': recall,
+                'latency_ms_per_query': _mean_query_ms(index, queries, top_k)
+            }
+    return report
+
+
+def _mean_query_ms(index, queries, top_k):
+    start = time.perf_counter()
+    index.query(queries, n_results=top_k)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+# Fresh process mein: import + model load + pehla encode (asli cold start)
+_COLD_START_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from rag.embedders import load_embedder
+embedder = load_embedder(%r, %r)
+loaded = time.perf_counter()
+embedder.encode("warm up")
+print(json.dumps({'load_s': loaded - start, 'first_encode_s': time.perf_counter() - start}))
+"""
+
+
+def _run_fresh(script, env=None):
+    """Naye Python process mein script (repo root se), last line JSON parse karo"""
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _cold_start(model_name, backend, env):
+    return _run_fresh(_COLD_START_SCRIPT % (model_name, backend), env)
+
+
+def benchmark_embedders(configs=(("torch", False), ("onnx", False), ("onnx", True)),
+                        threads=None, batch_size=32):
+    """
+    PyTorch vs ONNX (float32 / dynamic int8) embedder: cold start, single-query
+    latency, batch throughput, aur torch vectors se cosine agreement.
+    ONNX model pehle export hona chahiye: python -m rag.embedders export --quantize
+    """
+    from .embedders import TorchEmbedder, OnnxEmbedder, EMBEDDING_THREADS
+    from .vector_store import EMBEDDING_MODEL, DEFAULT_DOCS
+
+    threads = EMBEDDING_THREADS if threads is None else threads
+    queries = [labeled['query'] for labeled in LABELED_QUERIES]
+    reference = None
+    report = {}
+
+    for backend, quantized in configs:
+        label = f"{backend}{'-int8' if quantized else ''}"
+        env = dict(os.environ, ONNX_QUANTIZED="1" if quantized else "0",
+                   EMBEDDING_THREADS=str(threads))
+        try:
+            row = _cold_start(EMBEDDING_MODEL, backend, env)
+            if backend == "onnx":
+                embedder = OnnxEmbedder(EMBEDDING_MODEL, quantized=quantized, threads=threads)
+            else:
+                embedder = TorchEmbedder(EMBEDDING_MODEL, threads=threads)
+        except (subprocess.CalledProcessError, FileNotFoundError, ImportError) as e:
+            print(f"⚠️ Skipping {label}: {e}")
+            continue
+
+        embedder.encode("warm up")
+        latencies = []
+        vectors = []
+        for query in queries:
+            start = time.perf_counter()
+            vectors.append(embedder.encode(query))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        embedder.encode(DEFAULT_DOCS * 8, batch_size=batch_size)
+        batch_seconds = time.perf_counter() - start
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if reference is None:
+            reference = vectors
+        agreement = float(np.mean(np.sum(vectors * reference, axis=1)))
+
+        row.update(p50_ms=percentile(latencies, 50), p95_ms=percentile(latencies, 95),
+                   docs_per_sec=len(DEFAULT_DOCS) * 8 / batch_seconds,
+                   cosine_vs_first=agreement)
+        report[label] = row
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Full harness: KB se labeled dataset, quality + latency + concurrency + cold/warm
+# ---------------------------------------------------------------------------
+
+# KB ki "- Label: formula" wali bullet lines
+BULLET_LABEL = re.compile(r'^[-*•]\s+([^:=]{3,60}?):\s*(\S.*)$')
+
+
+def build_dataset(knowledge_dir=None):
+    """
+    rag/knowledge_base se labeled queries banao: har "- Label: formula" bullet
+    ek query ("Label (Heading)"), relevant marker = wahi bullet line.
+    Content marker se match - chunking config badle to bhi dataset valid rehta hai.
+    """
+    from .chunker import chunk_markdown
+    from .kb_sync import KNOWLEDGE_BASE_DIR
+
+    knowledge_dir = knowledge_dir or KNOWLEDGE_BASE_DIR
+    dataset = []
+    seen = set()
+    for file_name in sorted(os.listdir(knowledge_dir)):
+        if not file_name.endswith('.md'):
+            continue
+        with open(os.path.join(knowledge_dir, file_name), 'r', encoding='utf-8') as f:
+            chunks = chunk_markdown(f.read())
+        for chunk in chunks:
+            heading = chunk['heading']
+            for line in chunk['text'].splitlines():
+                match = BULLET_LABEL.match(line.strip())
+                if not match:
+                    continue
+                marker = line.strip()[1:].strip().lower()
+                if marker in seen:
+                    continue
+                seen.add(marker)
+                label = match.group(1).strip()
+                query = label if not heading or heading.lower() in label.lower() \
+                    else f"{label} ({heading})"
+                dataset.append({"query": query, "relevant": [marker], "source": file_name})
+    return dataset
+
+
+def measure_throughput(retrieve_fn, queries=None, concurrency_levels=(1, 4, 8), rounds=2, k=5):
+    """
+    Har concurrency level pe saari queries `rounds` baar, thread pool se.
+    Returns: {concurrency: {'requests', 'qps', 'latency_ms_p50/p95/p99'}}
+    """
+    queries = queries or LABELED_QUERIES
+    texts = [labeled['query'] for labeled in queries] * rounds
+
+    def timed(query):
+        start = time.perf_counter()
+        retrieve_fn(query, k)
+        return (time.perf_counter() - start) * 1000
+
+    report = {}
+    for concurrency in concurrency_levels:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, texts))
+        elapsed = time.perf_counter() - start
+        report[concurrency] = {
+            'requests': len(texts),
+            'qps': len(texts) / elapsed if elapsed > 0 else 0.0,
+            'latency_ms_p50': percentile(latencies, 50),
+            'latency_ms_p95': percentile(latencies, 95),
+            'latency_ms_p99': percentile(latencies, 99),
+        }
+    return report
+
+
+# Fresh process mein: import -> pehli query (KB sync + model load) -> doosri query
+_COLD_RETRIEVE_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from rag.retriever import Retriever
+imported = time.perf_counter()
+retriever = Retriever(lazy=True, mode=%r)
+retriever.query_cache.max_entries = 0
+retriever.retrieve(%r, top_k=5)
+first = time.perf_counter()
+retriever.retrieve(%r, top_k=5)
+print(json.dumps({'import_s': imported - start, 'first_query_s': first - imported,
+                  'second_query_ms': (time.perf_counter() - first) * 1000}))
+"""
+
+LATENCY_KEYS = ('latency_ms_mean', 'latency_ms_p50', 'latency_ms_p95', 'latency_ms_p99')
+
+
+def measure_cold_warm(mode=None, queries=None, k=5):
+    """
+    cold: naya process (import + KB sync + model load + pehli query)
+    warm: model loaded, query cache band
+    cached: wahi queries dobara, query cache hit
+    """
+    from .retriever import Retriever, RETRIEVAL_MODE
+
+    mode = mode or RETRIEVAL_MODE
+    queries = queries or LABELED_QUERIES
+    report = {}
+    try:
+        report['cold'] = _run_fresh(_COLD_RETRIEVE_SCRIPT % (
+            mode, queries[0]['query'], queries[-1]['query']))
+    except (subprocess.CalledProcessError, ValueError) as e:
+        print(f"⚠️ Cold start measurement failed: {e}")
+        report['cold'] = None
+
+    retriever = Retriever(lazy=False, mode=mode)
+    retrieve_fn = lambda query, top_k: retriever.retrieve(query, top_k=top_k)
+    retriever.retrieve("warm up", top_k=k)
+    cache_size = retriever.query_cache.max_entries
+    retriever.query_cache.max_entries = 0
+    warm = evaluate(retrieve_fn, queries, k)
+
+    retriever.query_cache.max_entries = cache_size or 1024
+    evaluate(retrieve_fn, queries, k)  # cache bharo
+    cached = evaluate(retrieve_fn, queries, k)
+
+    report['warm'] = {key: warm[key] for key in LATENCY_KEYS}
+    report['cached'] = {key: cached[key] for key in LATENCY_KEYS}
+    return report
+
+
+def run_suite(k_values=(1, 3, 5), concurrency_levels=(1, 4, 8), mode=None, cold=True):
+    """
+    Poora harness. Returns JSON-serializable report:
+    meta (config), quality (KB dataset + hand-labeled, har k pe),
+    throughput (concurrency levels), cold_warm
+    """
+    from .retriever import Retriever, RETRIEVAL_MODE
+    from .vector_store import VECTOR_BACKEND, EMBEDDING_MODEL
+    from .embedders import EMBEDDING_BACKEND
+
+    mode = mode or RETRIEVAL_MODE
+    datasets = {'kb': build_dataset(), 'labeled': LABELED_QUERIES}
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'mode': mode,
+            'vector_backend': VECTOR_BACKEND,
+            'embedding_model': EMBEDDING_MODEL,
+            'embedding_backend': EMBEDDING_BACKEND,
+            'dataset_sizes': {name: len(queries) for name, queries in datasets.items()},
+        },
+    }
+
+    # Cold pehle - is process ka model load hone se pehle (OS page cache phir bhi warm ho sakta hai)
+    if cold:
+        report['cold_warm'] = measure_cold_warm(mode)
+
+    retriever = Retriever(lazy=False, mode=mode)
+    retriever.retrieve("warm up", top_k=1)
+    retriever.query_cache.max_entries = 0  # asli search naapo, cache hits nahi
+    retrieve_fn = lambda query, top_k: retriever.retrieve(query, top_k=top_k)
+
+    report['quality'] = {
+        name: {f"@{k}": evaluate(retrieve_fn, queries, k) for k in k_values}
+        for name, queries in datasets.items()
+    }
+    report['throughput'] = measure_throughput(
+        retrieve_fn, datasets['kb'], concurrency_levels, k=max(k_values)
+    )
+    return report
+
+
+def write_json(report, path):
+    """numpy scalars bhi serialize ho jaate hain"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False,
+                  default=lambda value: value.item() if hasattr(value, 'item') else str(value))
+    print(f"📝 Report written to {path}")
+
+
+def _print_suite(report):
+    meta = report['meta']
+    print(f"\n{meta['mode']} | {meta['vector_backend']} | {meta['embedding_model']} "
+          f"({meta['embedding_backend']}) | queries {meta['dataset_sizes']}")
+    print(f"\n{'dataset':<8} {'k':>3} {'recall':>8} {'MRR':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, by_k in report['quality'].items():
+        for stats in by_k.values():
+            print(f"{name:<8} {stats['k']:>3} {stats['recall_at_k']:>8.2%} {stats['mrr']:>6.3f} "
+                  f"{stats['latency_ms_p50']:>8.2f} {stats['latency_ms_p95']:>8.2f} "
+                  f"{stats['latency_ms_p99']:>8.2f}")
+
+    print(f"\n{'threads':>7} {'qps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for concurrency, row in report['throughput'].items():
+        print(f"{concurrency:>7} {row['qps']:>8.1f} {row['latency_ms_p50']:>8.2f} "
+              f"{row['latency_ms_p95']:>8.2f} {row['latency_ms_p99']:>8.2f}")
+
+    cold_warm = report.get('cold_warm')
+    if cold_warm:
+        cold = cold_warm['cold']
+        if cold:
+            print(f"\ncold: import {cold['import_s']:.2f}s, first query {cold['first_query_s']:.2f}s, "
+                  f"second query {cold['second_query_ms']:.1f} ms")
+        print(f"warm p50 {cold_warm['warm']['latency_ms_p50']:.2f} ms, "
+              f"cached p50 {cold_warm['cached']['latency_ms_p50']:.3f} ms")
+
+
+def _print_modes(report):
+    print(f"\n{'mode':<8} {'k':>3} {'recall':>8} {'MRR':>6} {'mean ms':>9} {'p95 ms':>8}")
+    for mode, by_k in report.items():
+        for stats in by_k.values():
+            print(f"{mode:<8} {stats['k']:>3} {stats['recall_at_k']:>8.2%} {stats['mrr']:>6.3f} "
+                  f"{stats['latency_ms_mean']:>9.2f} {stats['latency_ms_p95']:>8.2f}")
+
+
+def _print_rerank(report):
+    print(f"\n{'config':<18} {'P@2':>6} {'hit@1':>6} {'mean ms':>8} {'p95 ms':>8} {'added ms':>9}")
+    for label, stats in report.items():
+        print(f"{label:<18} {stats['precision_at_k']:>6.2%} {stats['hit_at_1']:>6.2%} "
+              f"{stats['latency_ms_mean']:>8.2f} {stats['latency_ms_p95']:>8.2f} "
+              f"{stats['added_ms']:>9.2f}")
+
+
+def _print_normalization(report):
+    print(f"\n{'retriever/queries':<20} {'legacy':>8} {'canonical':>10}   (recall@3)")
+    for name, row in report.items():
+        print(f"{name:<20} {row['legacy']:>8.2%} {row['canonical']:>10.2%}")
+
+
+def _print_embedders(report):
+    print(f"\n{'backend':<11} {'load s':>7} {'cold s':>7} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'docs/s':>8} {'cosine':>7}")
+    for label, row in report.items():
+        print(f"{label:<11} {row['load_s']:>7.2f} {row['first_encode_s']:>7.2f} "
+              f"{row['p50_ms']:>7.2f} {row['p95_ms']:>7.2f} {row['docs_per_sec']:>8.1f} "
+              f"{row['cosine_vs_first']:>7.4f}")
+
+
+def _print_quantization(report):
+    print(f"\n{'mode':<20} {'scan MB':>8} {'x smaller':>9} {'recall@10':>10} {'ms/query':>9}")
+    for mode, row in report.items():
+        print(f"{mode:<20} {row['scan_bytes'] / 1e6:>8.1f} {row['compression']:>9.2f} "
+              f"{row['recall_at_k']:>10.2%} {row['latency_ms_per_query']:>9.3f}")
+
+
+def _print_backends(report):
+    print(f"\n{'chunks':>8} {'backend':<8} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'batched ms/q':>13}")
+    for size, row in report.items():
+        for backend in ("chroma", "numpy"):
+            print(f"{size:>8} {backend:<8} {row[backend + '_build_s']:>8.2f} "
+                  f"{row[backend + '_p50_ms']:>8.3f} {row[backend + '_p95_ms']:>8.3f} "
+                  f"{row[backend + '_batched_ms_per_query']:>13.3f}")
+
+
+BENCHMARKS = {
+    'modes': (compare_retrieval_modes, _print_modes),
+    'backends': (benchmark_backends, _print_backends),
+    'quantization': (benchmark_quantization, _print_quantization),
+    'embedders': (benchmark_embedders, _print_embedders),
+    'normalization': (compare_normalization, _print_normalization),
+    'rerank': (compare_reranking, _print_rerank),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RAG retrieval benchmarks")
+    parser.add_argument("command", nargs="?", default="modes", choices=["suite", *BENCHMARKS])
+    parser.add_argument("--json", default=None, help="Report is file mein bhi likho")
+    parser.add_argument("--mode", default=None, help="suite: dense / hybrid (default RETRIEVAL_MODE)")
+    parser.add_argument("--concurrency", default="1,4,8", help="suite: thread counts, comma separated")
+    parser.add_argument("--no-cold", action="store_true", help="suite: fresh-process cold start skip")
+    args = parser.parse_args(argv)
+
+    if args.command == "suite":
+        # Network ke bina - models local HF cache se (subprocess ko bhi env milta hai)
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+        concurrency = tuple(int(level) for level in args.concurrency.split(",") if level)
+        report = run_suite(concurrency_levels=concurrency, mode=args.mode, cold=not args.no_cold)
+        _print_suite(report)
+    else:
+        run, show = BENCHMARKS[args.command]
+        report = run()
+        show(report)
+
+    if args.json:
+        write_json(report, args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
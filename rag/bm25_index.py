@@ -0,0 +1,147 @@
+"""
+Bhai, ye BM25 keyword index hai - in-process inverted index.
+Dense MiniLM embeddings "C(n,k)" ya "sin²θ" jaise formulas pe kamzor hain,
+isliye math-aware tokenization ke saath lexical search bhi chalate hain.
+"""
+
+import re
+import math
+from collections import Counter, defaultdict
+
+from .math_normalizer import canonicalize
+from .numpy_index import _matches
+
+# "sin^2", "x^n", "c(" (function application), words, numbers, operators
+TOKEN_PATTERN = re.compile(r"[a-z]+\^-?[a-z0-9]+|[a-z]\(|[a-z]+|\d+(?:\.\d+)?|[=!|/^]")
+
+STOPWORDS = {'the', 'of', 'a', 'an', 'is', 'and', 'to', 'in', 'for', 'how',
+             'what', 'find', 'with', 'on', 'by', 'be', 'it', 'this', 'that'}
+
+
+def tokenize_math(text):
+    """
+    Math-aware tokenizer: 'sin²θ' -> ['sin^2', 'sin', 'theta'],
+    'C(n,k)' -> ['c(', 'c', 'n', 'k']
+    """
+    # Unicode/LaTeX -> canonical notation (queries aur chunks same tokens dein)
+    text = canonicalize(text)
+
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        # Composite token ke saath base token bhi - 'sin^2' query 'sin' se bhi match kare
+        if '^' in token and token[0] != '^':
+            tokens.append(token.split('^', 1)[0])
+        elif token.endswith('('):
+            tokens.append(token[:-1])
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over chunks, postings list in memory"""
+
+    def __init__(self, k1=1.5, b=0.75, tokenizer=tokenize_math):
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer
+        self.postings = defaultdict(list)  # token -> [(doc_idx, tf)]
+        self.idf = {}
+        self.doc_lengths = []
+        self.avg_doc_length = 0.0
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def build(self, ids, documents, metadatas=None):
+        """Poora index banao"""
+        metadatas = metadatas or [{} for _ in documents]
+        self.postings = defaultdict(list)
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = [m or {} for m in metadatas]
+        self.doc_lengths = []
+
+        for doc_idx, doc in enumerate(self.documents):
+            tokens = self.tokenizer(doc)
+            self.doc_lengths.append(len(tokens))
+            for token, tf in Counter(tokens).items():
+                self.postings[token].append((doc_idx, tf))
+
+        n_docs = len(self.documents)
+        self.avg_doc_length = sum(self.doc_lengths) / n_docs if n_docs else 0.0
+        self.idf = {
+            token: math.log(1 + (n_docs - len(posts) + 0.5) / (len(posts) + 0.5))
+            for token, posts in self.postings.items()
+        }
+        return self
+
+    def search(self, query, top_k=5, where=None):
+        """
+        BM25 scores. Returns: VectorStore.search jaisa format
+        [{'content', 'metadata', 'score', 'id'}]
+        where: Chroma-style metadata filter
+        """
+        if not self.ids:
+            return []
+
+        scores = defaultdict(float)
+        for token in set(self.tokenizer(query)):
+            posts = self.postings.get(token)
+            if not posts:
+                continue
+            idf = self.idf[token]
+            for doc_idx, tf in posts:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_idx] / self.avg_doc_length
+                scores[doc_idx] += idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+
+        if where:
+            scores = {doc_idx: score for doc_idx, score in scores.items()
+                      if _matches(self.metadatas[doc_idx], where)}
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [
+            {
+                'content': self.documents[doc_idx],
+                'metadata': self.metadatas[doc_idx],
+                'score': score,
+                'id': self.ids[doc_idx]
+            }
+            for doc_idx, score in ranked
+        ]
+
+
+def reciprocal_rank_fusion(result_lists, weights=None, k=60, top_k=5):
+    """
+    Weighted RRF: score(d) = Σ w_i / (k + rank_i(d)).
+    result_lists: har retriever ki ranked list (dicts with 'id').
+    Score 0-1 mein normalize hota hai (max possible = Σ w_i / (k + 1)).
+    """
+    weights = weights or [1.0] * len(result_lists)
+    fused = {}
+    per_source_scores = {}
+
+    for list_idx, (results, weight) in enumerate(zip(result_lists, weights)):
+        for rank, result in enumerate(results, start=1):
+            doc_id = result['id']
+            if doc_id not in fused:
+                fused[doc_id] = 0.0
+                per_source_scores[doc_id] = {'result': result, 'scores': [None] * len(result_lists)}
+            fused[doc_id] += weight / (k + rank)
+            per_source_scores[doc_id]['scores'][list_idx] = result['score']
+
+    max_score = sum(weights) / (k + 1) if weights else 1.0
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    merged = []
+    for doc_id, score in ranked:
+        entry = per_source_scores[doc_id]
+        merged.append({
+            **entry['result'],
+            'score': score / max_score if max_score else score,
+            'source_scores': entry['scores']
+        })
+    return merged
@@ -0,0 +1,135 @@
+"""
+Bhai, ye knowledge base ka chunker hai - heading hierarchy samajhta hai.
+Pehle sirf '\\n## ' pe split hota tha, to trigonometry.md (sirf ### headings)
+ek hi bada chunk ban jaata tha. Ab:
+  - har heading (#, ##, ###, ...) apna section hai, heading path metadata mein
+  - bada section bullet boundaries pe max_tokens windows mein tootta hai (overlap ke saath)
+  - "formula" granularity mein har bullet (formula) apna chunk hai
+"""
+
+import os
+import re
+
+CHUNK_GRANULARITY = os.getenv("KB_CHUNK_GRANULARITY", "section")  # "section" ya "formula"
+CHUNK_MAX_TOKENS = int(os.getenv("KB_CHUNK_MAX_TOKENS", "120"))
+CHUNK_OVERLAP = int(os.getenv("KB_CHUNK_OVERLAP", "1"))  # windows ke beech kitne bullets repeat
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*\S)\s*$')
+BULLET_PATTERN = re.compile(r'^(\s*)([-*•]|\d+\.)\s+')
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+
+def count_tokens(text):
+    """Approx token count (words + symbols) - model tokenizer load nahi karte"""
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def _parse_sections(content):
+    """
+    Markdown ko sections mein todo.
+    Returns: [(heading_path list, level, body lines)]
+    """
+    sections = []
+    path = []
+    level = 0
+    body = []
+
+    for line in content.splitlines():
+        match = HEADING_PATTERN.match(line)
+        if match:
+            if body and any(l.strip() for l in body):
+                sections.append((list(path), level, body))
+            level = len(match.group(1))
+            title = match.group(2).strip()
+            # Path ko is level tak kaato, phir naya heading add karo
+            path = [(lvl, t) for lvl, t in path if lvl < level] + [(level, title)]
+            body = []
+        else:
+            body.append(line)
+
+    if body and any(l.strip() for l in body):
+        sections.append((list(path), level, body))
+
+    return [([title for _, title in p], lvl, lines) for p, lvl, lines in sections]
+
+
+def _group_items(lines):
+    """
+    Body lines ko items mein group karo: top-level bullet + uske nested lines
+    ek item. Plain paragraphs blank line tak ek item.
+    """
+    items = []
+    current = []
+    for line in lines:
+        if not line.strip():
+            if current and not BULLET_PATTERN.match(current[0]):
+                items.append(current)
+                current = []
+            continue
+        bullet = BULLET_PATTERN.match(line)
+        is_top_level = bullet and len(bullet.group(1)) == 0
+        if is_top_level and current:
+            items.append(current)
+            current = []
+        current.append(line.rstrip())
+    if current:
+        items.append(current)
+    return ["\n".join(item) for item in items]
+
+
+def _windows(items, max_tokens, overlap):
+    """Items ko max_tokens tak pack karo, `overlap` items repeat karke"""
+    windows = []
+    start = 0
+    while start < len(items):
+        end = start
+        tokens = 0
+        while end < len(items):
+            item_tokens = count_tokens(items[end])
+            if end > start and tokens + item_tokens > max_tokens:
+                break
+            tokens += item_tokens
+            end += 1
+        windows.append(items[start:end])
+        if end >= len(items):
+            break
+        start = max(end - overlap, start + 1)
+    return windows
+
+
+def chunk_markdown(content, granularity=None, max_tokens=None, overlap=None):
+    """
+    Structure-aware chunking.
+    Returns: [{'text', 'heading_path', 'heading', 'level'}]
+    'text' mein heading path prefix hota hai taaki chhota chunk bhi apna context rakhe.
+    """
+    granularity = granularity or CHUNK_GRANULARITY
+    max_tokens = max_tokens or CHUNK_MAX_TOKENS
+    overlap = CHUNK_OVERLAP if overlap is None else overlap
+
+    chunks = []
+    for path, level, lines in _parse_sections(content):
+        heading_path = " > ".join(path)
+        prefix = f"{heading_path}\n" if heading_path else ""
+        items = _group_items(lines)
+        if not items:
+            continue
+
+        if granularity == "formula":
+            groups = [[item] for item in items]
+        else:
+            groups = _windows(items, max(1, max_tokens - count_tokens(prefix)), overlap)
+
+        for group in groups:
+            chunks.append({
+                'text': prefix + "\n".join(group),
+                'heading_path': heading_path,
+                'heading': path[-1] if path else "",
+                'level': level
+            })
+    return chunks
+
+
+def chunker_signature():
+    """Config ka fingerprint - badle to KB poora re-chunk hona chahiye"""
+    return f"v1:{CHUNK_GRANULARITY}:{CHUNK_MAX_TOKENS}:{CHUNK_OVERLAP}"
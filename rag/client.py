@@ -0,0 +1,134 @@
+"""
+Bhai, ye RAG server (rag/server.py) ka thin client hai.
+RAG_SERVER_URL set ho to Streamlit workers apna model/index load nahi karte -
+embed/search/retrieve sab server pe jaata hai. Sirf stdlib (urllib + json).
+/stats ka response RAG_STATS_TTL_SECONDS tak cache - kb_version / model_loaded
+har query pe padhe jaate hain, har read pe HTTP round trip nahi.
+"""
+
+import os
+import json
+import time
+import threading
+import urllib.request
+import urllib.error
+
+RAG_SERVER_URL = os.getenv("RAG_SERVER_URL", "")  # e.g. http://127.0.0.1:8765, khaali = local mode
+RAG_SERVER_TIMEOUT = float(os.getenv("RAG_SERVER_TIMEOUT", "30"))
+RAG_STATS_TTL_SECONDS = float(os.getenv("RAG_STATS_TTL_SECONDS", "2"))  # 0 = har read pe /stats
+
+
+class RagClient:
+    """JSON-over-HTTP calls to the RAG server"""
+
+    def __init__(self, url=None, timeout=None):
+        self.url = (url or RAG_SERVER_URL).rstrip('/')
+        self.timeout = RAG_SERVER_TIMEOUT if timeout is None else timeout
+
+    def _request(self, path, payload=None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            f"{self.url}{path}",
+            data=data,
+            headers={'Content-Type': 'application/json'},
+            method='POST' if data is not None else 'GET'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode('utf-8', errors='replace')
+            raise RuntimeError(f"RAG server error {e.code} on {path}: {detail}") from e
+
+    def health(self):
+        return self._request("/health")
+
+    def stats(self):
+        return self._request("/stats")
+
+    def embed(self, texts):
+        return self._request("/embed", {'texts': list(texts)})['embeddings']
+
+    def search(self, query, top_k=5, where=None):
+        return self._request("/search", {'query': query, 'top_k': top_k, 'where': where})['results']
+
+    def search_many(self, queries, top_k=5, where=None):
+        return self._request("/search_many", {'queries': list(queries), 'top_k': top_k,
+                                              'where': where})['results']
+
+    def retrieve(self, query, top_k=5, mode=None, topic=None):
+        return self._request("/retrieve", {'query': query, 'top_k': top_k, 'mode': mode,
+                                           'topic': topic})['results']
+
+    def retrieve_many(self, queries, top_k=5, mode=None):
+        return self._request("/retrieve_many",
+                             {'queries': list(queries), 'top_k': top_k, 'mode': mode})['results']
+
+    def refresh(self):
+        return self._request("/refresh", {})
+
+
+class RemoteVectorStore:
+    """
+    VectorStore jaisa interface (embed/search/count) jo server ko forward karta hai.
+    Writes (add/delete) server process ka kaam hai - yahan nahi.
+    """
+
+    backend = "remote"
+
+    def __init__(self, url=None, stats_ttl=None):
+        self.client = RagClient(url)
+        self.persist_directory = None
+        self.timings = {}
+        self.stats_ttl = RAG_STATS_TTL_SECONDS if stats_ttl is None else stats_ttl
+        self._stats_lock = threading.Lock()
+        self._stats = None
+        self._stats_at = 0.0
+
+    def stats(self):
+        """Server /stats - stats_ttl tak cached (KB update max itni der baad dikhta hai)"""
+        with self._stats_lock:
+            now = time.monotonic()
+            if self._stats is None or now - self._stats_at >= self.stats_ttl:
+                self._stats = self.client.stats()
+                self._stats_at = now
+            return self._stats
+
+    @property
+    def kb_version(self):
+        return self.stats().get('kb_version')
+
+    @property
+    def model_loaded(self):
+        return self.stats().get('model_loaded', False)
+
+    def embed_text(self, text):
+        return self.client.embed([text])[0]
+
+    def embed_texts(self, texts, batch_size=None, pool=None):
+        return self.client.embed(texts) if texts else []
+
+    def search(self, query, top_k=5, where=None):
+        try:
+            return self.client.search(query, top_k, where)
+        except Exception as e:
+            print(f"⚠️ Remote search error: {e}")
+            return []
+
+    def search_many(self, queries, top_k=5, batch_size=None, where=None):
+        if not queries:
+            return []
+        try:
+            return self.client.search_many(queries, top_k, where)
+        except Exception as e:
+            print(f"⚠️ Remote batch search error: {e}")
+            return [[] for _ in queries]
+
+    def count(self):
+        try:
+            return self.stats().get('document_count', 0)
+        except Exception:
+            return 0
+
+    def cache_stats(self):
+        return self.stats().get('embedding_cache', {'enabled': False})
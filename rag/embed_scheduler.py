@@ -0,0 +1,198 @@
+"""
+Bhai, ye embedding requests ka dynamic micro-batching scheduler hai.
+Concurrent users har ek single string embed karte the - CPU ka batch
+parallelism waste. Ab requests queue mein aati hain, worker thread
+EMBED_BATCH_WAIT_MS tak ya EMBED_MAX_BATCH items tak collect karke ek hi
+encode call karta hai, aur har request ka Future resolve karta hai.
+
+Interactive (query) requests bulk (ingestion) se pehle uthaye jaate hain,
+aur bada bulk request max_batch ke pieces mein tootta hai - to ingestion
+chalte hue bhi query latency budget mein rehti hai.
+"""
+
+import os
+import time
+import queue
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+EMBED_SCHEDULER = os.getenv("EMBED_SCHEDULER", "0") == "1"  # local mode mein default off
+EMBED_BATCH_WAIT_MS = float(os.getenv("EMBED_BATCH_WAIT_MS", "5"))
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "64"))
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+# Batch size histogram buckets (<= value)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def _gather(parts, parent):
+    """Pieces ke futures ko ek parent future mein jodo (order same)"""
+    results = [None] * len(parts)
+    remaining = [len(parts)]
+    lock = threading.Lock()
+
+    def on_done(index, part):
+        error = part.exception()
+        with lock:
+            if parent.done():
+                return
+            if error is not None:
+                parent.set_exception(error)
+                return
+            results[index] = part.result()
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+        if finished:
+            parent.set_result([vector for piece in results for vector in piece])
+
+    for index, part in enumerate(parts):
+        part.add_done_callback(lambda f, index=index: on_done(index, f))
+
+
+class EmbeddingScheduler:
+    """
+    embed_fn(texts) -> vectors (same order). Thread-safe submit(),
+    ek background worker thread.
+    """
+
+    def __init__(self, embed_fn, max_wait_ms=None, max_batch=None, name="embed-scheduler"):
+        self.embed_fn = embed_fn
+        self.max_wait = (EMBED_BATCH_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        self.max_batch = max(1, max_batch or EMBED_MAX_BATCH)
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.batch_size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.batch_size_histogram['more'] = 0
+        self._queue_waits = deque(maxlen=1000)    # ms, request enqueue -> batch start
+        self._encode_times = deque(maxlen=1000)   # ms per batch
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, texts, priority=PRIORITY_INTERACTIVE):
+        """Future return karo jo texts ke vectors (list, same order) pe resolve hoga"""
+        texts = list(texts)
+        future = Future()
+        if not texts:
+            future.set_result([])
+            return future
+
+        pieces = [texts[i:i + self.max_batch] for i in range(0, len(texts), self.max_batch)]
+        if len(pieces) == 1:
+            self._enqueue(pieces[0], priority, future)
+            return future
+
+        parts = [Future() for _ in pieces]
+        _gather(parts, future)
+        for piece, part in zip(pieces, parts):
+            self._enqueue(piece, priority, part)
+        return future
+
+    def embed(self, texts, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """Blocking helper"""
+        return self.submit(texts, priority).result(timeout)
+
+    def embed_one(self, text, timeout=None):
+        return self.submit([text]).result(timeout)[0]
+
+    def _enqueue(self, texts, priority, future):
+        request = (texts, future, time.perf_counter())
+        self._queue.put((priority, next(self._sequence), request))
+
+    def _collect(self):
+        """Pehla request aane tak ruko, phir latency budget tak aur jodo"""
+        _, _, first = self._queue.get()
+        if first is None:
+            return None
+        requests = [first]
+        size = len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            request = item[2]
+            if request is None or size + len(request[0]) > self.max_batch:
+                # Shutdown sentinel ya batch overflow - wapas queue mein, agle batch ke liye
+                self._queue.put(item)
+                break
+            requests.append(request)
+            size += len(request[0])
+        return requests
+
+    def _run(self):
+        while True:
+            requests = self._collect()
+            if requests is None:
+                return
+            # Cancelled futures ka kaam mat karo
+            requests = [r for r in requests if r[1].set_running_or_notify_cancel()]
+            if not requests:
+                continue
+
+            started = time.perf_counter()
+            texts = [text for request in requests for text in request[0]]
+            try:
+                vectors = self.embed_fn(texts)
+            except Exception as e:
+                with self._stats_lock:
+                    self.errors += 1
+                for _, future, _ in requests:
+                    future.set_exception(e)
+                continue
+
+            self._record(requests, len(texts), started)
+            offset = 0
+            for request_texts, future, _ in requests:
+                future.set_result(list(vectors[offset:offset + len(request_texts)]))
+                offset += len(request_texts)
+
+    def _record(self, requests, size, started):
+        with self._stats_lock:
+            self.batches += 1
+            self.items += size
+            bucket = next((b for b in BATCH_SIZE_BUCKETS if size <= b), 'more')
+            self.batch_size_histogram[bucket] += 1
+            self._encode_times.append((time.perf_counter() - started) * 1000)
+            for _, _, enqueued_at in requests:
+                self._queue_waits.append((started - enqueued_at) * 1000)
+
+    def shutdown(self):
+        """Worker thread band karo (pending requests pehle process hote hain)"""
+        self._queue.put((PRIORITY_BULK + 1, next(self._sequence), None))
+        self._worker.join()
+
+    def stats(self):
+        with self._stats_lock:
+            waits = sorted(self._queue_waits)
+            encode_times = list(self._encode_times)
+            histogram = dict(self.batch_size_histogram)
+
+        def pct(values, p):
+            return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0.0
+
+        return {
+            'enabled': True,
+            'max_wait_ms': self.max_wait * 1000,
+            'max_batch': self.max_batch,
+            'batches': self.batches,
+            'items': self.items,
+            'errors': self.errors,
+            'pending': self._queue.qsize(),
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+            'batch_size_histogram': histogram,
+            'queue_wait_ms_p50': pct(waits, 50),
+            'queue_wait_ms_p95': pct(waits, 95),
+            'encode_ms_mean': sum(encode_times) / len(encode_times) if encode_times else 0.0
+        }
@@ -0,0 +1,197 @@
+"""
+Bhai, ye embedding backends hain.
+  - "torch": SentenceTransformer (PyTorch) - default, purana path
+  - "onnx":  same MiniLM, exported ONNX graph + onnxruntime + HF tokenizers.
+             torch import nahi hota - cold start aur RAM dono kam.
+             Optional dynamic int8 quantization.
+
+Export (ek baar, torch/optimum wali machine pe):
+    python -m rag.embedders export [--quantize]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")  # torch / onnx
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))  # 0 = library default
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "./models/all-MiniLM-L6-v2-onnx")
+ONNX_QUANTIZED = os.getenv("ONNX_QUANTIZED", "0") == "1"
+MAX_SEQ_LENGTH = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", "256"))
+
+ONNX_FILE = "model.onnx"
+ONNX_QUANTIZED_FILE = "model_quantized.onnx"
+
+
+def embedder_id(model_name, backend=None, quantized=None):
+    """
+    Embedding cache ke liye identity - int8 ONNX ke vectors thode alag hote hain,
+    to unka cache torch wale se mix nahi hona chahiye
+    """
+    backend = backend or EMBEDDING_BACKEND
+    quantized = ONNX_QUANTIZED if quantized is None else quantized
+    if backend == "onnx":
+        return f"{model_name}:onnx{'-int8' if quantized else ''}"
+    return model_name
+
+
+class TorchEmbedder:
+    """SentenceTransformer wrapper - thread count control ke saath"""
+
+    def __init__(self, model_name, threads=None):
+        threads = EMBEDDING_THREADS if threads is None else threads
+        import torch
+        from sentence_transformers import SentenceTransformer
+        if threads > 0:
+            torch.set_num_threads(threads)
+        self.model = SentenceTransformer(model_name)
+        self.name = embedder_id(model_name, "torch")
+
+    def encode(self, texts, **kwargs):
+        return self.model.encode(texts, **kwargs)
+
+    def start_multi_process_pool(self, **kwargs):
+        return self.model.start_multi_process_pool(**kwargs)
+
+    def stop_multi_process_pool(self, pool):
+        return self.model.stop_multi_process_pool(pool)
+
+    def encode_multi_process(self, texts, pool, **kwargs):
+        return self.model.encode_multi_process(texts, pool, **kwargs)
+
+
+class OnnxEmbedder:
+    """
+    MiniLM via onnxruntime: tokenize -> transformer -> mean pooling -> L2 normalize
+    (SentenceTransformer ke Pooling + Normalize modules jaisa hi)
+    """
+
+    def __init__(self, model_name, model_dir=None, quantized=None, threads=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = model_dir or ONNX_MODEL_DIR
+        quantized = ONNX_QUANTIZED if quantized is None else quantized
+        threads = EMBEDDING_THREADS if threads is None else threads
+        model_path = os.path.join(model_dir, ONNX_QUANTIZED_FILE if quantized else ONNX_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"{model_path} nahi mila. Pehle export karo: python -m rag.embedders export"
+                + (" --quantize" if quantized else "")
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {inp.name for inp in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+        self.name = embedder_id(model_name, "onnx", quantized)
+
+    def _encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {'input_ids': input_ids, 'attention_mask': attention_mask}
+        if 'token_type_ids' in self.input_names:
+            feeds['token_type_ids'] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]  # (batch, seq, hidden)
+
+        # Mean pooling (padding tokens ignore)
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        embeddings = summed / counts
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (embeddings / norms).astype(np.float32)
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, convert_to_numpy=True, **kwargs):
+        """SentenceTransformer.encode jaisa: str -> 1D vector, list -> 2D matrix"""
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # Length ke hisaab se sort - kam padding, phir original order
+        order = np.argsort([len(text) for text in texts])
+        outputs = [None] * len(texts)
+        for begin in range(0, len(texts), batch_size):
+            batch_idx = order[begin:begin + batch_size]
+            vectors = self._encode_batch([texts[i] for i in batch_idx])
+            for i, vector in zip(batch_idx, vectors):
+                outputs[i] = vector
+
+        matrix = np.stack(outputs)
+        return matrix[0] if single else matrix
+
+    # Process pool ki zaroorat nahi - onnxruntime khud intra-op threads use karta hai
+    def start_multi_process_pool(self, **kwargs):
+        return None
+
+    def stop_multi_process_pool(self, pool):
+        return None
+
+
+def load_embedder(model_name, backend=None):
+    """Config ke hisaab se embedder banao"""
+    backend = backend or EMBEDDING_BACKEND
+    if backend == "onnx":
+        return OnnxEmbedder(model_name)
+    return TorchEmbedder(model_name)
+
+
+def export_onnx(model_name, output_dir=None, quantize=False):
+    """
+    MiniLM ko ONNX mein export karo (optimum + torch chahiye, sirf export time pe).
+    quantize=True: dynamic int8 (weights) - onnxruntime.quantization
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+
+    output_dir = output_dir or ONNX_MODEL_DIR
+    hub_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+    start = time.perf_counter()
+    model = ORTModelForFeatureExtraction.from_pretrained(hub_name, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(hub_name).save_pretrained(output_dir)
+    print(f"✅ Exported {hub_name} -> {output_dir} ({time.perf_counter() - start:.1f}s)")
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(
+            os.path.join(output_dir, ONNX_FILE),
+            os.path.join(output_dir, ONNX_QUANTIZED_FILE),
+            weight_type=QuantType.QInt8
+        )
+        print(f"✅ Dynamic int8 model: {os.path.join(output_dir, ONNX_QUANTIZED_FILE)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Embedding backend utilities")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Export the embedding model to ONNX")
+    export.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"))
+    export.add_argument("--output", default=None)
+    export.add_argument("--quantize", action="store_true", help="Also write a dynamic int8 model")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_onnx(args.model, args.output, args.quantize)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Bhai, ye embedding cache hai.
+Same text ka embedding baar baar model se mat banao - disk pe rakh lo.
+Key = hash(model name + normalized text), value = float32 vector (SQLite blob).
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE", "1") != "0"
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "50000"))
+
+
+def normalize_text(text):
+    """Whitespace normalize karo taaki same text ka same key bane"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache with LRU eviction"""
+
+    def __init__(self, db_path, model_name, max_entries=EMBEDDING_CACHE_SIZE):
+        self.db_path = db_path
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                dim INTEGER,
+                vector BLOB,
+                last_used REAL
+            )
+        ''')
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)"
+        )
+        self.conn.commit()
+        self._size = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def make_key(self, text):
+        """Model name + normalized text ka sha256"""
+        payload = f"{self.model_name}\x00{normalize_text(text)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_many(self, texts):
+        """
+        Texts ke cached vectors lao.
+        Returns: list, har text ke liye np.float32 array ya None (miss)
+        """
+        keys = [self.make_key(text) for text in texts]
+        found = {}
+
+        with self._lock:
+            unique_keys = list(set(keys))
+            # SQLite variable limit ke andar raho
+            for begin in range(0, len(unique_keys), 500):
+                chunk = unique_keys[begin:begin + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self.conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hits = sum(1 for r in results if r is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+
+        return results
+
+    def get(self, text):
+        """Single text ka cached vector (ya None)"""
+        return self.get_many([text])[0]
+
+    def put_many(self, texts, vectors):
+        """Naye vectors cache mein daalo, phir LRU eviction"""
+        if not texts:
+            return
+
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            rows.append((self.make_key(text), vector.shape[0], vector.tobytes(), now))
+
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, dim, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._size += self.conn.total_changes - before
+            self._evict()
+            self.conn.commit()
+
+    def put(self, text, vector):
+        """Single vector cache karo"""
+        self.put_many([text], [vector])
+
+    def _evict(self):
+        """Sabse purane (least recently used) entries hatao"""
+        overflow = self._size - self.max_entries
+        if overflow <= 0:
+            return
+
+        self.conn.execute('''
+            DELETE FROM embeddings WHERE key IN (
+                SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?
+            )
+        ''', (overflow,))
+        self._size -= overflow
+        self.evictions += overflow
+
+    def clear(self):
+        """Poora cache khaali karo"""
+        with self._lock:
+            self.conn.execute("DELETE FROM embeddings")
+            self.conn.commit()
+            self._size = 0
+
+    def stats(self):
+        """Hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            'entries': self._size,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total > 0 else 0.0
+        }
+
+    def close(self):
+        """Connection close karo"""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,258 @@
+"""
+Bhai, ye bade corpus (JEE notes, past papers - markdown/txt/PDF directories)
+ki streaming ingestion hai. Generator pipeline:
+    walk -> read -> chunk -> embed in batches -> upsert in batches
+Memory mein ek time pe sirf ek batch rehta hai. Har file ke baad checkpoint,
+crash ke baad wahi se resume. Chunker / embedder config badle to checkpoint
+stale - saari files dobara chunk + embed.
+
+Corpus chunks ka metadata source "corpus:<corpus>/<relpath>" hai, taaki KB sync
+(source = knowledge_base file name) ke source-based get/delete inhe na chhuein.
+
+Run: python -m rag.ingest path/to/corpus [--batch-size 256] [--reset]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from .chunker import chunk_markdown
+from .kb_sync import make_chunk_ids, KnowledgeBaseManifest, chunking_signature, vector_signature
+from .topics import classify_topic
+
+try:
+    from pypdf import PdfReader
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+TEXT_EXTENSIONS = ('.md', '.markdown', '.txt')
+PDF_EXTENSIONS = ('.pdf',)
+CORPUS_SOURCE_PREFIX = "corpus:"
+
+
+def corpus_source(corpus_name, relpath):
+    """Metadata source - KB files ke naam se kabhi collide nahi karta"""
+    return f"{CORPUS_SOURCE_PREFIX}{corpus_name}/{relpath}"
+
+
+def walk_corpus(root):
+    """Corpus directory ki supported files, sorted order mein (resume ke liye stable)"""
+    extensions = TEXT_EXTENSIONS + (PDF_EXTENSIONS if PDF_AVAILABLE else ())
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for file_name in sorted(filenames):
+            if file_name.lower().endswith(extensions):
+                yield os.path.join(dirpath, file_name)
+            elif file_name.lower().endswith(PDF_EXTENSIONS):
+                print(f"⚠️ Skipping {file_name}: pypdf not installed. Install: pip install pypdf")
+
+
+def read_document(path):
+    """
+    File ke text parts yield karo: (text, extra_metadata).
+    PDF page-by-page padhte hain - poori PDF memory mein nahi aati.
+    """
+    if path.lower().endswith(PDF_EXTENSIONS):
+        reader = PdfReader(path)
+        for page_number, page in enumerate(reader.pages, start=1):
+            text = page.extract_text() or ""
+            if text.strip():
+                yield text, {"page": page_number}
+    else:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            yield f.read(), {}
+
+
+def iter_chunks(path, source, corpus_name):
+    """Ek file ke chunks: (id, text, metadata)"""
+    for text, extra in read_document(path):
+        chunks = chunk_markdown(text)
+        # Page number ID mein - alag pages pe same text ho to bhi ID alag
+        id_source = f"{source}#p{extra['page']}" if 'page' in extra else source
+        ids, _ = make_chunk_ids(id_source, chunks)
+        for position, (chunk_id, chunk) in enumerate(zip(ids, chunks)):
+            yield chunk_id, chunk['text'], {
+                "source": source,
+                "corpus": corpus_name,
+                "section": position,
+                "type": "corpus",
+                "heading_path": chunk['heading_path'],
+                "heading": chunk['heading'],
+                "level": chunk['level'],
+                "topic": classify_topic(chunk['text'], chunk['heading_path']),
+                **extra
+            }
+
+
+class IngestCheckpoint:
+    """
+    Completed files (mtime/size + chunker/embedder signature ke saath) - resume pe skip.
+    Signature har file ki entry mein - config badalne ke baad beech mein crash ho
+    to bhi baaki purani files stale hi rehti hain. Stale entries delete nahi hoti,
+    taaki unke purane chunks hataaye ja sakein.
+    """
+
+    def __init__(self, path, signature=None):
+        self.path = path
+        self.signature = signature
+        self.files = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f).get('files', {})
+
+    @property
+    def stale(self):
+        """Koi file purane config se ingest hui hai"""
+        return any(entry.get('signature') != self.signature for entry in self.files.values())
+
+    def is_done(self, relpath, stat):
+        entry = self.files.get(relpath)
+        return (bool(entry) and entry.get('signature') == self.signature
+                and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size)
+
+    def ingested_source(self, relpath):
+        """Pichli baar ka metadata source (purane checkpoints mein relpath hi tha), ya None"""
+        entry = self.files.get(relpath)
+        if entry is None:
+            return None
+        return entry.get('source', relpath)
+
+    def mark_done(self, relpath, source, stat, chunks):
+        self.files[relpath] = {'source': source, 'signature': self.signature,
+                               'mtime': stat.st_mtime, 'size': stat.st_size, 'chunks': chunks}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.files}, f)
+        os.replace(tmp_path, self.path)
+
+
+def ingest_corpus(root, vector_store=None, batch_size=None, checkpoint_path=None,
+                  reset=False, num_workers=None):
+    """
+    Streaming ingestion. Returns: throughput stats dict
+    """
+    if vector_store is None:
+        from .vector_store import get_vector_store
+        vector_store = get_vector_store()
+
+    batch_size = batch_size or INGEST_BATCH_SIZE
+    root = os.path.abspath(root)
+    corpus_name = os.path.basename(root.rstrip(os.sep)) or "corpus"
+    base_dir = root if os.path.isdir(root) else os.path.dirname(root)
+    checkpoint_path = checkpoint_path or os.path.join(
+        vector_store.persist_directory, f"ingest_checkpoint_{corpus_name}.json"
+    )
+    if reset and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    signature = f"{chunking_signature()}|{vector_signature(vector_store)}"
+    checkpoint = IngestCheckpoint(checkpoint_path, signature)
+    if checkpoint.stale:
+        print("🔄 Chunker/embedding config changed, re-ingesting corpus")
+
+    stats = {'files': 0, 'skipped': 0, 'chunks': 0, 'bytes': 0}
+    start = time.perf_counter()
+
+    # Process pool poori ingestion ke liye ek hi baar
+    pool = None
+    if num_workers:
+        pool = vector_store.embedding_model.start_multi_process_pool(
+            target_devices=["cpu"] * num_workers
+        )
+
+    def flush(batch):
+        ids, docs, metas = zip(*batch)
+        vector_store.add_documents(list(docs), list(metas), list(ids),
+                                   upsert=True, num_workers=0, pool=pool)
+        batch.clear()
+
+    try:
+        _ingest_files(root, base_dir, corpus_name, vector_store, checkpoint,
+                      batch_size, flush, stats)
+    finally:
+        if pool is not None:
+            vector_store.embedding_model.stop_multi_process_pool(pool)
+
+    # KB version badhao - query cache / BM25 index invalidate ho jaayein
+    if stats['chunks']:
+        manifest = KnowledgeBaseManifest(vector_store.persist_directory)
+        manifest.bump_version()
+        manifest.save()
+        vector_store.kb_version = manifest.version
+        vector_store.save()
+
+    stats['seconds'] = time.perf_counter() - start
+    seconds = stats['seconds'] or 1e-9
+    stats['chunks_per_sec'] = stats['chunks'] / seconds
+    stats['mb_per_sec'] = stats['bytes'] / (1024 * 1024) / seconds
+    print(f"✅ Ingested {stats['files']} files ({stats['skipped']} already done), "
+          f"{stats['chunks']} chunks in {stats['seconds']:.1f}s - "
+          f"{stats['chunks_per_sec']:.1f} chunks/sec, {stats['mb_per_sec']:.2f} MB/sec")
+    return stats
+
+
+def _ingest_files(root, base_dir, corpus_name, vector_store, checkpoint, batch_size, flush, stats):
+    """walk -> read -> chunk -> batch -> flush, file-by-file checkpoint ke saath"""
+    for path in walk_corpus(root):
+        relpath = os.path.relpath(path, base_dir)
+        source = corpus_source(corpus_name, relpath)
+        stat = os.stat(path)
+        if checkpoint.is_done(relpath, stat):
+            stats['skipped'] += 1
+            continue
+
+        # File ya config badli hai - purane chunks hatao (IDs content-hash hain, stale reh jaate).
+        # type filter: purane relpath sources KB file ke naam jaise ho sakte hain
+        old_source = checkpoint.ingested_source(relpath)
+        if old_source is not None:
+            vector_store.collection.delete(
+                where={"$and": [{"source": old_source}, {"type": "corpus"}]})
+
+        file_start = time.perf_counter()
+        file_chunks = 0
+        batch = []
+        for record in iter_chunks(path, source, corpus_name):
+            batch.append(record)
+            file_chunks += 1
+            if len(batch) >= batch_size:
+                flush(batch)
+        if batch:
+            flush(batch)
+
+        # File poori hui tabhi checkpoint - beech mein crash ho to file dobara (upsert safe hai)
+        checkpoint.mark_done(relpath, source, stat, file_chunks)
+        stats['files'] += 1
+        stats['chunks'] += file_chunks
+        stats['bytes'] += stat.st_size
+
+        elapsed = time.perf_counter() - file_start
+        print(f"📄 {source}: {file_chunks} chunks in {elapsed:.2f}s "
+              f"({file_chunks / elapsed if elapsed > 0 else 0:.1f} chunks/sec)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a markdown/txt/PDF corpus into the vector store")
+    parser.add_argument("path", help="Corpus directory ya single file")
+    parser.add_argument("--batch-size", type=int, default=None, help="Chunks per embed/upsert batch")
+    parser.add_argument("--workers", type=int, default=None, help="Embedding process pool size")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file path")
+    parser.add_argument("--reset", action="store_true", help="Checkpoint ignore karke sab dobara")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        print(f"❌ Path not found: {args.path}")
+        return 1
+
+    ingest_corpus(args.path, batch_size=args.batch_size, checkpoint_path=args.checkpoint,
+                  reset=args.reset, num_workers=args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
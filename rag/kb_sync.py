@@ -0,0 +1,293 @@
+"""
+Bhai, ye knowledge base ka incremental sync hai.
+Har file ka mtime/size/hash aur har chunk ka hash manifest mein rakhte hain,
+taaki sirf badle hue sections dobara embed hon aur purane chunk IDs delete hon.
+"""
+
+import os
+import json
+import time
+import hashlib
+from .chunker import chunk_markdown, chunker_signature
+from .math_normalizer import normalizer_signature
+from .embedders import embedder_id
+from .topics import classify_topic, topic_signature
+
+KNOWLEDGE_BASE_DIR = os.getenv("KNOWLEDGE_BASE_DIR", "rag/knowledge_base")
+MANIFEST_FILE = "kb_manifest.json"
+
+
+def content_hash(text):
+    """Text ka sha256"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def make_chunk_ids(source, chunks):
+    """
+    Content-hash based stable IDs - section upar neeche hone se ID nahi badalta.
+    Same file mein duplicate chunk ho to counter lagao.
+    chunks: chunker dicts ('text' key) ya plain strings
+    """
+    ids = []
+    hashes = []
+    seen = {}
+    for chunk in chunks:
+        chunk_hash = content_hash(chunk['text'] if isinstance(chunk, dict) else chunk)
+        count = seen.get(chunk_hash, 0)
+        seen[chunk_hash] = count + 1
+        suffix = f"_{count}" if count else ""
+        ids.append(f"{source}_{chunk_hash[:16]}{suffix}")
+        hashes.append(chunk_hash)
+    return ids, hashes
+
+
+class KnowledgeBaseManifest:
+    """Disk pe JSON manifest: files -> mtime/size/hash/chunks, plus version"""
+
+    def __init__(self, persist_directory):
+        self.path = os.path.join(persist_directory, MANIFEST_FILE)
+        self.data = {'version': 0, 'files': {}}
+        self.exists = False
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
+                self.exists = True
+            except Exception as e:
+                print(f"⚠️ Manifest read error, full re-sync hoga: {e}")
+
+    @property
+    def version(self):
+        return self.data.get('version', 0)
+
+    @property
+    def files(self):
+        return self.data.setdefault('files', {})
+
+    @property
+    def chunk_count(self):
+        """Manifest ke hisaab se collection mein kitne chunks hone chahiye"""
+        return sum(len(entry.get('chunks', {})) for entry in self.files.values())
+
+    def reset(self):
+        """File entries bhool jao (version rakho) - agla sync full hoga"""
+        self.data['files'] = {}
+
+    @property
+    def chunker(self):
+        return self.data.get('chunker')
+
+    @chunker.setter
+    def chunker(self, signature):
+        self.data['chunker'] = signature
+
+    @property
+    def embedding(self):
+        return self.data.get('embedding')
+
+    @embedding.setter
+    def embedding(self, signature):
+        self.data['embedding'] = signature
+
+    def save(self):
+        """Atomic write - temp file phir rename"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self.exists = True
+
+    def bump_version(self):
+        self.data['version'] = self.version + 1
+
+
+def chunking_signature():
+    """Chunker + topic tagger config - badle to chunks dobara banao"""
+    return f"{chunker_signature()}|topics:{topic_signature()}"
+
+
+def vector_signature(vector_store):
+    """Embedder + math normalizer config - badle to chunks dobara embed karo"""
+    return (f"{embedder_id(vector_store.model_name, vector_store.embedding_backend)}"
+            f"|{normalizer_signature()}")
+
+
+def _existing_ids_for_source(vector_store, source):
+    """
+    Manifest na ho (purana chroma_db) to source ke IDs collection se lo.
+    include=[] - sirf IDs, documents/embeddings nahi.
+    """
+    try:
+        results = vector_store.collection.get(where={"source": source}, include=[])
+        return set(results.get('ids', []))
+    except Exception:
+        return set()
+
+
+def _sync_source(vector_store, manifest, source, chunks, file_info, stats):
+    """
+    Ek source (file) ke chunks ko collection ke saath match karo.
+    chunks: chunker.chunk_markdown() ke dicts
+    """
+    entry = manifest.files.get(source)
+    # Embedding model/normalizer badla - purane IDs bhi dobara embed karo
+    reembed = bool(entry and entry.get('reembed'))
+    if entry is not None:
+        old_chunks = entry.get('chunks', {})
+    else:
+        old_chunks = {chunk_id: None for chunk_id in _existing_ids_for_source(vector_store, source)}
+
+    ids, hashes = make_chunk_ids(source, chunks)
+
+    new_docs, new_metas, new_ids = [], [], []
+    moved_ids, moved_metas = [], []
+    topics = []
+    for position, (chunk, chunk_id) in enumerate(zip(chunks, ids)):
+        metadata = {
+            "source": source,
+            "section": position,
+            "type": file_info['type'],
+            "heading_path": chunk.get('heading_path', ""),
+            "heading": chunk.get('heading', ""),
+            "level": chunk.get('level', 0),
+            "topic": classify_topic(chunk['text'], chunk.get('heading_path', ""))
+        }
+        topics.append(metadata['topic'])
+        old = old_chunks.get(chunk_id)
+        if chunk_id not in old_chunks or reembed:
+            new_docs.append(chunk['text'])
+            new_metas.append(metadata)
+            new_ids.append(chunk_id)
+        elif old is None or old.get('section') != position or old.get('topic') != metadata['topic']:
+            # Content same hai, sirf position/topic badla - re-embed ki zaroorat nahi
+            moved_ids.append(chunk_id)
+            moved_metas.append(metadata)
+
+    current_ids = set(ids)
+    stale_ids = [chunk_id for chunk_id in old_chunks if chunk_id not in current_ids]
+
+    if new_docs:
+        vector_store.add_documents(new_docs, new_metas, new_ids, upsert=True)
+    if moved_ids:
+        vector_store.collection.update(ids=moved_ids, metadatas=moved_metas)
+    if stale_ids:
+        vector_store.delete_documents(stale_ids)
+
+    stats['embedded'] += len(new_docs)
+    stats['updated'] += len(moved_ids)
+    stats['deleted'] += len(stale_ids)
+
+    manifest.files[source] = {
+        **file_info,
+        'chunks': {
+            chunk_id: {'hash': chunk_hash, 'section': position, 'topic': topic}
+            for position, (chunk_id, chunk_hash, topic) in enumerate(zip(ids, hashes, topics))
+        }
+    }
+
+
+def sync_knowledge_base(vector_store, knowledge_dir=KNOWLEDGE_BASE_DIR, default_docs=None):
+    """
+    Incremental sync: sirf badli hui files padho, sirf naye chunks embed karo,
+    stale chunk IDs delete karo. Kuch nahi badla to sirf os.stat calls.
+    Returns: stats dict
+    """
+    start = time.perf_counter()
+    manifest = KnowledgeBaseManifest(vector_store.persist_directory)
+    stats = {'files_checked': 0, 'files_changed': 0, 'embedded': 0,
+             'updated': 0, 'deleted': 0}
+
+    # Cheap consistency check - collection.count() vs manifest, koi get() nahi.
+    # Collection mein KB se kam chunks (e.g. delete_all ke baad) to full re-sync.
+    # Zyada ho sakte hain - rag.ingest wale corpus chunks manifest mein nahi hote
+    if manifest.exists and vector_store.count() < manifest.chunk_count:
+        print("⚠️ Manifest aur collection match nahi karte, full re-sync")
+        manifest.reset()
+
+    seen_sources = set()
+    dirty = not manifest.exists
+
+    # Chunking config badla to saari files dobara chunk karo
+    # (stale IDs manifest se hi delete ho jaate hain)
+    signature = chunking_signature()
+    if manifest.chunker != signature:
+        for entry in manifest.files.values():
+            entry['mtime'] = entry['hash'] = None
+        manifest.chunker = signature
+        dirty = True
+
+    # Embedder ya math normalizer badla - IDs same rahenge, vectors nahi
+    embedding_signature = vector_signature(vector_store)
+    if manifest.embedding != embedding_signature:
+        if manifest.embedding is not None:
+            print("🔄 Embedding config changed, re-embedding knowledge base")
+        for entry in manifest.files.values():
+            entry['mtime'] = entry['hash'] = None
+            entry['reembed'] = True
+        manifest.embedding = embedding_signature
+        dirty = True
+    if os.path.exists(knowledge_dir):
+        for file_name in sorted(os.listdir(knowledge_dir)):
+            if not file_name.endswith('.md'):
+                continue
+            file_path = os.path.join(knowledge_dir, file_name)
+            seen_sources.add(file_name)
+            stats['files_checked'] += 1
+
+            stat = os.stat(file_path)
+            entry = manifest.files.get(file_name)
+            if entry and entry.get('mtime') == stat.st_mtime and entry.get('size') == stat.st_size:
+                continue
+
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            file_hash = content_hash(content)
+
+            file_info = {'mtime': stat.st_mtime, 'size': stat.st_size,
+                         'hash': file_hash, 'type': 'math_knowledge'}
+            if entry and entry.get('hash') == file_hash:
+                # Sirf touch hua hai, content same
+                entry.update(mtime=stat.st_mtime, size=stat.st_size)
+                dirty = True
+                continue
+
+            stats['files_changed'] += 1
+            _sync_source(vector_store, manifest, file_name, chunk_markdown(content), file_info, stats)
+
+    # Knowledge files nahi mili to default formulas
+    if not seen_sources and default_docs:
+        seen_sources.add("default")
+        default_hash = content_hash("\n".join(default_docs))
+        entry = manifest.files.get("default")
+        if not entry or entry.get('hash') != default_hash:
+            print("📝 No knowledge files found, adding default knowledge...")
+            stats['files_changed'] += 1
+            file_info = {'mtime': None, 'size': len(default_docs),
+                         'hash': default_hash, 'type': 'math_formula'}
+            chunks = [{'text': doc, 'heading_path': "", 'heading': "", 'level': 0}
+                      for doc in default_docs]
+            _sync_source(vector_store, manifest, "default", chunks, file_info, stats)
+
+    # Jo files hat gayi unke chunks bhi hatao
+    for source in list(manifest.files):
+        if source not in seen_sources:
+            stale_ids = list(manifest.files[source].get('chunks', {}))
+            if stale_ids:
+                vector_store.delete_documents(stale_ids)
+            stats['deleted'] += len(stale_ids)
+            stats['files_changed'] += 1
+            del manifest.files[source]
+
+    changed = stats['embedded'] or stats['updated'] or stats['deleted']
+    if changed:
+        manifest.bump_version()
+    if changed or dirty or stats['files_changed']:
+        manifest.save()
+
+    stats['version'] = manifest.version
+    stats['seconds'] = time.perf_counter() - start
+    print(f"✅ KB sync: {stats['files_changed']} changed files, {stats['embedded']} embedded, "
+          f"{stats['deleted']} deleted ({stats['seconds'] * 1000:.1f} ms, v{stats['version']})")
+    return stats
@@ -0,0 +1,175 @@
+"""
+Bhai, ye math-aware query/chunk canonicalization hai.
+Purana enhance_query `[^\\w\\s.?]` hata deta tha - "x^2" aur "x 2" same ho jaate
+the aur ^, =, √, ∫ sab gayab. Ab unicode math aur LaTeX dono ek canonical
+ASCII form mein aate hain:
+    "x²", "x^{2}", "x ** 2", "x ^ 2"     -> "x^2"
+    "√(b²-4ac)", "\\sqrt{b^2-4ac}"      -> "sqrt(b^2-4ac)"
+    "∫", "\\int"                         -> "integral"
+    "\\frac{1}{x}"                       -> "1/x"
+    "\\binom{n}{k}"                      -> "c(n,k)"
+Same function queries aur KB chunks (embedding text) dono pe lagta hai, to
+dono ek hi "language" mein hote hain. Idempotent hai - do baar lagao, same result.
+"""
+
+import os
+import re
+
+MATH_CANONICALIZE = os.getenv("MATH_CANONICALIZE", "1") == "1"
+NORMALIZER_VERSION = "v1"
+
+# Unicode math -> canonical tokens
+UNICODE_MATH = {
+    '²': '^2', '³': '^3', '⁴': '^4', 'ⁿ': '^n', '⁻¹': '^-1',
+    '₀': '0', '₁': '1', '₂': '2', '₃': '3', 'ₙ': 'n',
+    '√': ' sqrt ', '∛': ' cbrt ', '∫': ' integral ', 'Σ': ' sum ', '∑': ' sum ', '∏': ' product ',
+    'π': ' pi ', 'θ': ' theta ', 'α': ' alpha ', 'β': ' beta ', 'γ': ' gamma ',
+    'δ': ' delta ', 'Δ': ' delta ', '∆': ' delta ', 'λ': ' lambda ', 'μ': ' mu ',
+    'σ': ' sigma ', 'φ': ' phi ', 'ω': ' omega ', '∂': ' partial ',
+    '∞': ' infinity ', '±': ' pm ', '∓': ' mp ', '≠': ' neq ',
+    '≤': ' leq ', '≥': ' geq ', '→': ' to ', '⇒': ' implies ', '∈': ' in ',
+    '∩': ' intersection ', '∪': ' union ', '×': ' cross ', '·': ' dot ',
+    '½': ' 1/2 ', '°': ' degree ', '−': '-', '÷': '/',
+}
+
+# LaTeX commands -> canonical tokens (baaki \name sirf "name" ban jaata hai)
+LATEX_COMMANDS = {
+    'int': 'integral', 'iint': 'integral', 'oint': 'integral',
+    'sum': 'sum', 'prod': 'product', 'lim': 'lim', 'infty': 'infinity',
+    'to': 'to', 'rightarrow': 'to', 'implies': 'implies', 'Rightarrow': 'implies',
+    'cdot': 'dot', 'times': 'cross', 'div': '/', 'pm': 'pm', 'mp': 'mp',
+    'leq': 'leq', 'le': 'leq', 'geq': 'geq', 'ge': 'geq', 'neq': 'neq', 'ne': 'neq',
+    'cap': 'intersection', 'cup': 'union', 'in': 'in', 'mid': '|',
+    'Delta': 'delta', 'partial': 'partial', 'circ': 'degree',
+}
+
+# Spoken forms -> notation
+PHRASES = [
+    (re.compile(r'\bsquare root of\b'), ' sqrt '),
+    (re.compile(r'\bcube root of\b'), ' cbrt '),
+    (re.compile(r'\s*\bto the power of\b\s*'), '^'),
+    (re.compile(r'\s+squared\b'), '^2'),
+    (re.compile(r'\s+cubed\b'), '^3'),
+    (re.compile(r'\bsine\b'), 'sin'),
+    (re.compile(r'\bcosine\b'), 'cos'),
+]
+
+# Query expansion: concept term -> trigger words/notation
+CONCEPT_SYNONYMS = {
+    'derivative': ['differentiate', 'derivative', 'rate of change', 'd/dx', 'dy/dx'],
+    'integral': ['integral', 'integration', 'integrate', 'antiderivative'],
+    'limit': ['lim', 'limit', 'tends to', 'approaches'],
+    'probability': ['probability', 'chance', 'likelihood'],
+    'algebra': ['solve', 'equation', 'polynomial'],
+    'matrix': ['matrix', 'determinant', 'eigenvalue'],
+}
+
+_FRAC = re.compile(r'\\[dt]?frac\s*\{([^{}]*)\}\s*\{([^{}]*)\}')
+_BINOM = re.compile(r'\\binom\s*\{([^{}]*)\}\s*\{([^{}]*)\}')
+_SQRT_N = re.compile(r'\\sqrt\s*\[([^\]]*)\]\s*\{([^{}]*)\}')
+_SQRT = re.compile(r'\\sqrt\s*\{([^{}]*)\}')
+_TEXT = re.compile(r'\\(?:text|mathrm|mathbf|mathit|operatorname)\s*\{([^{}]*)\}')
+_SUPERSCRIPT = re.compile(r'\^\s*\{([^{}]*)\}')
+_SUBSCRIPT = re.compile(r'_\s*\{([^{}]*)\}')
+_COMMAND = re.compile(r'\\([a-zA-Z]+)')
+_LATEX_NOISE = re.compile(r'\\left|\\right|\\[,;:! ]|\$')
+_POWER = re.compile(r'\*\*')
+_CARET_SPACES = re.compile(r'\s*\^\s*')
+_UNDERSCORE_SPACES = re.compile(r'\s*_\s*')
+_PAREN_SPACES = re.compile(r'\(\s+|\s+\)')
+_SIMPLE_SCRIPT = re.compile(r'([_^])\((-?\w+)\)')
+_EQUALS = re.compile(r'\s*=\s*')
+_SPACES = re.compile(r'\s+')
+
+
+def _group(content):
+    """Single token ho to as-is, warna parentheses mein"""
+    content = content.strip()
+    return content if re.fullmatch(r'-?\w+', content) else f"({content})"
+
+
+def _latex_to_text(text):
+    """LaTeX constructs ko plain canonical notation mein badlo"""
+    text = _LATEX_NOISE.sub(' ', text)
+    # Nested braces andar se bahar - jab tak kuch badle
+    previous = None
+    while previous != text:
+        previous = text
+        text = _TEXT.sub(r'\1', text)
+        text = _FRAC.sub(lambda m: f"{_group(m.group(1))}/{_group(m.group(2))}", text)
+        text = _BINOM.sub(lambda m: f"c({m.group(1).strip()},{m.group(2).strip()})", text)
+        text = _SQRT_N.sub(lambda m: f"root{m.group(1).strip()}({m.group(2).strip()})", text)
+        text = _SQRT.sub(lambda m: f"sqrt({m.group(1).strip()})", text)
+        text = _scripts(text)
+    return _COMMAND.sub(lambda m: f" {LATEX_COMMANDS.get(m.group(1), m.group(1))} ", text)
+
+
+def _scripts(text):
+    """x^{n-1} -> x^(n-1), a_{n} -> a_n (KB mein bina backslash ke bhi aata hai)"""
+    previous = None
+    while previous != text:
+        previous = text
+        text = _SUPERSCRIPT.sub(lambda m: '^' + _group(m.group(1)), text)
+        text = _SUBSCRIPT.sub(lambda m: '_' + _group(m.group(1)), text)
+    return text
+
+
+def canonicalize(text):
+    """
+    Unicode math + LaTeX + spoken forms -> canonical lowercase notation.
+    Symbols (^ = / ( ) |) bache rehte hain.
+    """
+    if not text:
+        return ""
+    if '\\' in text or '$' in text:
+        text = _latex_to_text(text)
+    if '{' in text:
+        text = _scripts(text)
+    for symbol, replacement in UNICODE_MATH.items():
+        if symbol in text:
+            text = text.replace(symbol, replacement)
+    text = text.lower()
+    for pattern, replacement in PHRASES:
+        text = pattern.sub(replacement, text)
+
+    text = _POWER.sub('^', text)
+    text = _CARET_SPACES.sub('^', text)
+    text = _UNDERSCORE_SPACES.sub('_', text)
+    text = _PAREN_SPACES.sub(lambda m: m.group(0).strip(), text)
+    text = _SIMPLE_SCRIPT.sub(r'\1\2', text)  # s_(infinity) -> s_infinity
+    # √ ke baad space: "sqrt (x)" -> "sqrt(x)"
+    text = re.sub(r'\b(sqrt|cbrt)\s+\(', r'\1(', text)
+    text = _EQUALS.sub(' = ', text)
+    return _SPACES.sub(' ', text).strip()
+
+
+def expand_concepts(text):
+    """Trigger words mile to concept term append karo (purane enhance_query jaisa)"""
+    for term, synonyms in CONCEPT_SYNONYMS.items():
+        if _has_word(text, term):
+            continue
+        # Word ki shuruaat pe match - "lim" -> "limit" haan, "eliminate" nahi
+        if any(_has_word(text, syn) for syn in synonyms):
+            text = f"{text} {term}"
+    return text
+
+
+def _has_word(text, word):
+    return re.search(rf'(?<!\w){re.escape(word)}', text) is not None
+
+
+def normalize_query(query):
+    """Retrieval query: canonical form + concept expansion"""
+    if not MATH_CANONICALIZE:
+        return query.lower().strip()
+    return expand_concepts(canonicalize(query))
+
+
+def embedding_text(text):
+    """KB chunk/query ka jo text embed hota hai (display wala original rehta hai)"""
+    return canonicalize(text) if MATH_CANONICALIZE else text
+
+
+def normalizer_signature():
+    """Badle to KB dobara embed hona chahiye"""
+    return f"{NORMALIZER_VERSION}:{int(MATH_CANONICALIZE)}"
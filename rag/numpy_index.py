@@ -0,0 +1,389 @@
+"""
+Bhai, ye NumPy brute-force vector index hai - chhote KB (kuch hazaar chunks)
+ke liye Chroma ka alternative. Normalized float32 embeddings ek contiguous
+matrix mein, search = ek matrix-vector product + argpartition.
+
+Chroma collection ka jo subset VectorStore use karta hai (add/upsert/update/
+delete/get/query/count) wahi API deta hai, taaki backend drop-in ho.
+NOTE: distances = 1 - cosine similarity (Chroma default l2 se scale alag hai).
+
+Quantized mode (float16 / int8 + per-vector scale): scan RAM mein rakhe
+quantized matrix pe hota hai, phir top candidates full-precision float32
+(disk pe memory-mapped) se rescore hote hain.
+"""
+
+import os
+import json
+import threading
+import numpy as np
+
+VECTORS_FILE = "vectors.npy"
+RECORDS_FILE = "records.json"
+QUANTIZED_FILE = "vectors_{mode}.npy"
+SCALES_FILE = "scales_int8.npy"
+
+NUMPY_INDEX_QUANTIZATION = os.getenv("NUMPY_INDEX_QUANTIZATION", "none")  # none / float16 / int8
+NUMPY_INDEX_RESCORE = int(os.getenv("NUMPY_INDEX_RESCORE", "4"))  # top_k * ye candidates rescore
+SCAN_BLOCK_ROWS = 65536  # quantized scan blocks - float32 copy poore matrix ki nahi banti
+
+
+def _normalize(matrix):
+    """Rows ko unit length karo (cosine = dot product)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize(matrix, mode):
+    """
+    float32 rows -> (quantized, scales).
+    int8: symmetric per-vector scale = max|x| / 127. float16: scales None.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if mode == "float16":
+        return matrix.astype(np.float16), None
+    if mode == "int8":
+        scales = np.abs(matrix).max(axis=1, initial=0.0) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+    raise ValueError(f"Unknown quantization mode: {mode}")
+
+
+def _matches(metadata, where):
+    """Chroma-style where filter ka chhota subset: eq, $eq, $ne, $in, $nin, $and, $or"""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(_matches(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, operand in condition.items():
+                if op == "$eq" and value != operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class NumpyIndex:
+    """In-memory (optionally memory-mapped) brute-force cosine index"""
+
+    def __init__(self, directory, mmap=True, quantization=None, rescore_factor=None):
+        self.directory = directory
+        self.mmap = mmap
+        self.quantization = quantization or NUMPY_INDEX_QUANTIZATION
+        self.rescore_factor = rescore_factor or NUMPY_INDEX_RESCORE
+        self._quantized = None
+        self._scales = None
+        self._quantized_stale = True
+        self._lock = threading.RLock()
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+        self._row_of = {}
+        self._vectors = None  # (N, d) float32
+        self._pending = []    # naye batches, query pe consolidate hote hain
+        self._dirty = False
+        self._load()
+
+    # ------------------------------------------------------------------ storage
+    def _load(self):
+        vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        records_path = os.path.join(self.directory, RECORDS_FILE)
+        if not (os.path.exists(vectors_path) and os.path.exists(records_path)):
+            return
+        with open(records_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        self.ids = records['ids']
+        self.documents = records['documents']
+        self.metadatas = records['metadatas']
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        self._vectors = np.load(vectors_path, mmap_mode='r' if self.mmap else None)
+
+        # Saved quantized matrix ho to RAM mein wahi lo, float32 sirf mmap
+        if self.quantization != "none":
+            quantized_path = os.path.join(self.directory, QUANTIZED_FILE.format(mode=self.quantization))
+            scales_path = os.path.join(self.directory, SCALES_FILE)
+            if os.path.exists(quantized_path):
+                quantized = np.load(quantized_path)
+                scales = np.load(scales_path) if self.quantization == "int8" else None
+                if quantized.shape[0] == len(self.ids):
+                    self._quantized, self._scales = quantized, scales
+                    self._quantized_stale = False
+        print(f"✅ NumPy index loaded: {len(self.ids)} vectors ({self.quantization})")
+
+    def persist(self):
+        """Matrix + records disk pe likho (sirf agar kuch badla ho)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            matrix = self._matrix()
+            vectors_path = os.path.join(self.directory, VECTORS_FILE)
+            records_path = os.path.join(self.directory, RECORDS_FILE)
+
+            # Temp file phir rename - mmap wala purana file safe rahe
+            np.save(f"{vectors_path}.tmp.npy", np.ascontiguousarray(matrix))
+            os.replace(f"{vectors_path}.tmp.npy", vectors_path)
+            with open(f"{records_path}.tmp", 'w', encoding='utf-8') as f:
+                json.dump({'ids': self.ids, 'documents': self.documents,
+                           'metadatas': self.metadatas}, f)
+            os.replace(f"{records_path}.tmp", records_path)
+
+            if self.quantization != "none":
+                quantized, scales = self._quantized_matrix()
+                quantized_path = os.path.join(self.directory, QUANTIZED_FILE.format(mode=self.quantization))
+                np.save(f"{quantized_path}.tmp.npy", quantized)
+                os.replace(f"{quantized_path}.tmp.npy", quantized_path)
+                if scales is not None:
+                    scales_path = os.path.join(self.directory, SCALES_FILE)
+                    np.save(f"{scales_path}.tmp.npy", scales)
+                    os.replace(f"{scales_path}.tmp.npy", scales_path)
+
+            if self.mmap:
+                self._vectors = np.load(vectors_path, mmap_mode='r')
+            self._dirty = False
+
+    def _matrix(self):
+        """Pending batches ko main matrix mein merge karo"""
+        if self._pending:
+            parts = ([] if self._vectors is None else [np.asarray(self._vectors)]) + self._pending
+            self._vectors = np.concatenate(parts, axis=0)
+            self._pending = []
+        if self._vectors is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._vectors
+
+    def _quantized_matrix(self):
+        """Quantized copy - writes ke baad lazily rebuild"""
+        if self._quantized_stale:
+            self._quantized, self._scales = quantize(self._matrix(), self.quantization)
+            self._quantized_stale = False
+        return self._quantized, self._scales
+
+    def _writable_matrix(self):
+        """In-place update ke liye mmap se copy lo"""
+        matrix = self._matrix()
+        if isinstance(matrix, np.memmap) or not matrix.flags.writeable:
+            matrix = np.array(matrix)
+            self._vectors = matrix
+        return matrix
+
+    # ------------------------------------------------------------------ writes
+    def add(self, ids, embeddings, documents=None, metadatas=None):
+        with self._lock:
+            duplicates = [doc_id for doc_id in ids if doc_id in self._row_of]
+            if duplicates:
+                raise ValueError(f"IDs already exist: {duplicates[:5]}")
+            self.upsert(ids, embeddings, documents, metadatas)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [{} for _ in ids]
+        vectors = _normalize(embeddings)
+
+        with self._lock:
+            new_rows = []
+            update_rows, update_vectors = [], []
+            for i, doc_id in enumerate(ids):
+                row = self._row_of.get(doc_id)
+                if row is None:
+                    self._row_of[doc_id] = len(self.ids)
+                    self.ids.append(doc_id)
+                    self.documents.append(documents[i])
+                    self.metadatas.append(metadatas[i] or {})
+                    new_rows.append(i)
+                else:
+                    self.documents[row] = documents[i]
+                    self.metadatas[row] = metadatas[i] or {}
+                    update_rows.append(row)
+                    update_vectors.append(i)
+
+            if new_rows:
+                self._pending.append(vectors[new_rows])
+            if update_rows:
+                matrix = self._writable_matrix()
+                matrix[update_rows] = vectors[update_vectors]
+            self._dirty = True
+            self._quantized_stale = True
+
+    def update(self, ids, metadatas=None, documents=None, embeddings=None):
+        with self._lock:
+            # (row, input position) - unknown ids skip (Chroma jaisa), inputs position se
+            pairs = [(self._row_of[doc_id], i) for i, doc_id in enumerate(ids) if doc_id in self._row_of]
+            if not pairs:
+                return
+            rows = [row for row, _ in pairs]
+            if embeddings is not None:
+                matrix = self._writable_matrix()
+                matrix[rows] = _normalize(embeddings)[[i for _, i in pairs]]
+            for row, i in pairs:
+                if metadatas is not None:
+                    self.metadatas[row] = metadatas[i]
+                if documents is not None:
+                    self.documents[row] = documents[i]
+            self._dirty = True
+            self._quantized_stale = True
+
+    def delete(self, ids=None, where=None):
+        with self._lock:
+            doomed = set(ids or [])
+            if where:
+                doomed.update(doc_id for doc_id, meta in zip(self.ids, self.metadatas)
+                              if _matches(meta, where))
+            if not doomed:
+                return
+            keep = [row for row, doc_id in enumerate(self.ids) if doc_id not in doomed]
+            matrix = self._matrix()
+            self._vectors = np.array(matrix[keep]) if len(keep) else None
+            self.ids = [self.ids[row] for row in keep]
+            self.documents = [self.documents[row] for row in keep]
+            self.metadatas = [self.metadatas[row] for row in keep]
+            self._row_of = {doc_id: row for row, doc_id in enumerate(self.ids)}
+            self._dirty = True
+            self._quantized_stale = True
+
+    def reset(self):
+        """Sab kuch hatao"""
+        with self._lock:
+            self.ids, self.documents, self.metadatas = [], [], []
+            self._row_of = {}
+            self._vectors = None
+            self._pending = []
+            self._dirty = True
+            self._quantized_stale = True
+
+    # ------------------------------------------------------------------ reads
+    def count(self):
+        return len(self.ids)
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=None):
+        """Chroma collection.get() jaisa result (embeddings include nahi karte)"""
+        include = ['documents', 'metadatas'] if include is None else include
+        with self._lock:
+            if ids is not None:
+                rows = [self._row_of[doc_id] for doc_id in ids if doc_id in self._row_of]
+            else:
+                rows = range(len(self.ids))
+            if where:
+                rows = [row for row in rows if _matches(self.metadatas[row], where)]
+            rows = list(rows)[offset or 0:]
+            if limit is not None:
+                rows = rows[:limit]
+
+            result = {'ids': [self.ids[row] for row in rows]}
+            if 'documents' in include:
+                result['documents'] = [self.documents[row] for row in rows]
+            if 'metadatas' in include:
+                result['metadatas'] = [self.metadatas[row] for row in rows]
+            return result
+
+    def memory_footprint(self):
+        """
+        Bytes: scan matrix (RAM mein rehna chahiye) vs float32 full precision
+        """
+        float32_bytes = len(self.ids) * (self._matrix().shape[1] if len(self.ids) else 0) * 4
+        report = {'vectors': len(self.ids), 'quantization': self.quantization,
+                  'float32_bytes': float32_bytes}
+        if self.quantization == "none":
+            report['scan_bytes'] = float32_bytes
+        else:
+            quantized, scales = self._quantized_matrix()
+            report['scan_bytes'] = quantized.nbytes + (scales.nbytes if scales is not None else 0)
+        report['compression'] = float32_bytes / report['scan_bytes'] if report['scan_bytes'] else 1.0
+        return report
+
+    def _scan_scores(self, queries, candidate_rows=None):
+        """
+        Saare (ya filtered) rows ke scores. Quantized mode mein approximate,
+        blocks mein dequantize karke taaki poori float32 copy na bane.
+        """
+        if self.quantization == "none":
+            matrix = self._matrix()
+            if candidate_rows is not None:
+                matrix = matrix[candidate_rows]
+            return queries @ matrix.T
+
+        quantized, scales = self._quantized_matrix()
+        if candidate_rows is not None:
+            quantized = quantized[candidate_rows]
+            scales = scales[candidate_rows] if scales is not None else None
+
+        scores = np.empty((len(queries), quantized.shape[0]), dtype=np.float32)
+        for begin in range(0, quantized.shape[0], SCAN_BLOCK_ROWS):
+            end = begin + SCAN_BLOCK_ROWS
+            block = quantized[begin:end].astype(np.float32)
+            scores[:, begin:end] = queries @ block.T
+            if scales is not None:
+                scores[:, begin:end] *= scales[begin:end]
+        return scores
+
+    @staticmethod
+    def _top_k(scores, k):
+        """Ek query ke scores se top-k positions (sorted)"""
+        if k == 0:
+            return np.array([], dtype=np.int64)
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+            return top[np.argsort(-scores[top])]
+        return np.argsort(-scores)
+
+    def query(self, query_embeddings, n_results=5, where=None):
+        """
+        Batched brute-force search: (Q, d) @ (d, N) -> har query ke top-k.
+        Quantized mode: top_k * rescore_factor candidates float32 se rescore.
+        Returns: Chroma query() jaisa dict (lists of lists)
+        """
+        queries = _normalize(query_embeddings)
+        with self._lock:
+            matrix = self._matrix()
+            result = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+            if matrix.shape[0] == 0:
+                for _ in range(len(queries)):
+                    for key in result:
+                        result[key].append([])
+                return result
+
+            candidate_rows = None
+            if where:
+                candidate_rows = np.array([row for row, meta in enumerate(self.metadatas)
+                                           if _matches(meta, where)], dtype=np.int64)
+
+            scores = self._scan_scores(queries, candidate_rows)
+            k = min(n_results, scores.shape[1])
+            for query, query_scores in zip(queries, scores):
+                if self.quantization == "none":
+                    top = self._top_k(query_scores, k)
+                    rows = candidate_rows[top] if candidate_rows is not None else top
+                    top_scores = query_scores[top]
+                else:
+                    # Approximate scan -> candidates -> exact float32 rescore
+                    shortlist = self._top_k(query_scores, min(k * self.rescore_factor, len(query_scores)))
+                    shortlist_rows = candidate_rows[shortlist] if candidate_rows is not None else shortlist
+                    # Sorted rows - memmap se sequential-ish reads
+                    shortlist_rows = np.sort(shortlist_rows)
+                    exact = np.asarray(matrix[shortlist_rows], dtype=np.float32) @ query
+                    order = self._top_k(exact, k)
+                    rows = shortlist_rows[order]
+                    top_scores = exact[order]
+
+                result['ids'].append([self.ids[row] for row in rows])
+                result['documents'].append([self.documents[row] for row in rows])
+                result['metadatas'].append([self.metadatas[row] for row in rows])
+                result['distances'].append((1.0 - top_scores).tolist())
+            return result
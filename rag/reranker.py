@@ -0,0 +1,146 @@
+"""
+Bhai, ye optional cross-encoder reranker hai.
+MiniLM bi-encoder ka top-k aksar galat order mein hota hai, aur solver sirf
+context[:2] use karta hai. Cross-encoder (query, chunk) pair ko saath padhta
+hai - order kaafi better, par mehenga. Isliye:
+  - sirf top-N candidates rerank hote hain
+  - millisecond budget: pairs chhote batches mein score hote hain (original
+    rank order mein), agla batch budget mein fit na ho to wahi ruk jaate hain -
+    sirf scored prefix reorder hota hai, baaki original order mein
+  - (query, chunk) scores LRU cache mein - same sawaal dobara free
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "0") == "1"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "10"))   # top-N jo rerank honge
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "150"))  # 0 = no limit
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "4"))
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "4096"))
+
+
+class CrossEncoderReranker:
+    """Lazy CrossEncoder + (query, chunk) score cache + latency budget"""
+
+    def __init__(self, model_name=None, budget_ms=None, batch_size=None, cache_size=None):
+        self.model_name = model_name or RERANK_MODEL
+        self.budget_ms = RERANK_BUDGET_MS if budget_ms is None else budget_ms
+        self.batch_size = batch_size or RERANK_BATCH_SIZE
+        self.cache_size = RERANK_CACHE_SIZE if cache_size is None else cache_size
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._ms_per_pair = None  # EMA - agla batch budget mein aayega ya nahi
+        self.stats_counters = {'calls': 0, 'full': 0, 'partial': 0, 'skipped': 0,
+                               'pairs_scored': 0, 'cache_hits': 0, 'model_load_s': None}
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    from sentence_transformers import CrossEncoder
+                    self._model = CrossEncoder(self.model_name)
+                    self.stats_counters['model_load_s'] = time.perf_counter() - start
+                    print(f"✅ Reranker loaded ({self.stats_counters['model_load_s']:.2f}s)")
+        return self._model
+
+    @staticmethod
+    def _key(query, result):
+        chunk = result.get('id') or result['content']
+        return hashlib.sha256(f"{query}\0{chunk}".encode('utf-8')).hexdigest()
+
+    def _cache_get(self, key):
+        with self._cache_lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+            return score
+
+    def _cache_put(self, key, score):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = score
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def rerank(self, query, results, top_k=None, budget_ms=None):
+        """
+        results: search results (rank order). Returns: (reranked list, applied)
+        applied=False: budget ki wajah se poora rerank nahi hua
+        """
+        budget_ms = self.budget_ms if budget_ms is None else budget_ms
+        self.stats_counters['calls'] += 1
+        if len(results) < 2:
+            return results[:top_k] if top_k else results, True
+
+        model = self.model  # load time budget mein count nahi (ek baar ka)
+        start = time.perf_counter()
+
+        keys = [self._key(query, result) for result in results]
+        scores = [self._cache_get(key) for key in keys]
+        self.stats_counters['cache_hits'] += sum(score is not None for score in scores)
+        pending = [i for i, score in enumerate(scores) if score is None]
+
+        for begin in range(0, len(pending), self.batch_size):
+            batch = pending[begin:begin + self.batch_size]
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if budget_ms > 0 and self._ms_per_pair is not None:
+                if elapsed_ms + self._ms_per_pair * len(batch) > budget_ms:
+                    if begin == 0:
+                        # Estimate dheere ghatao - warna ek slow call ke baad kabhi retry nahi
+                        self._ms_per_pair *= 0.9
+                    break
+            batch_start = time.perf_counter()
+            batch_scores = model.predict([(query, results[i]['content']) for i in batch])
+            per_pair = (time.perf_counter() - batch_start) * 1000 / len(batch)
+            self._ms_per_pair = per_pair if self._ms_per_pair is None else \
+                0.8 * self._ms_per_pair + 0.2 * per_pair
+            for i, score in zip(batch, batch_scores):
+                scores[i] = float(score)
+                self._cache_put(keys[i], scores[i])
+            self.stats_counters['pairs_scored'] += len(batch)
+
+        # Rerank window = pehle unscored result tak ka prefix. Window ke baad wale
+        # (deep rank ke cache hits bhi) original order mein - warna unscored
+        # higher-ranked candidate ke aage kood jaate
+        window = next((i for i, score in enumerate(scores) if score is None), len(scores))
+        if window < 2:
+            self.stats_counters['skipped'] += 1
+            return (results[:top_k] if top_k else results), False
+
+        order = sorted(range(window), key=lambda i: scores[i], reverse=True)
+        reranked = [dict(results[i], rerank_score=scores[i]) for i in order]
+        reranked += [dict(result) for result in results[window:]]
+
+        applied = window == len(results)
+        self.stats_counters['full' if applied else 'partial'] += 1
+        return (reranked[:top_k] if top_k else reranked), applied
+
+    def stats(self):
+        return {
+            **self.stats_counters,
+            'model': self.model_name,
+            'budget_ms': self.budget_ms,
+            'ms_per_pair': self._ms_per_pair,
+            'cache_entries': len(self._cache)
+        }
+
+
+# Global instance - pehli rerank call pe model load
+reranker = None
+
+def get_reranker():
+    global reranker
+    if reranker is None:
+        reranker = CrossEncoderReranker()
+    return reranker
@@ -4,63 +4,251 @@ Iska kaam hai RAG pipeline mein relevant context retrieve karna.
 """
 
 from .vector_store import get_vector_store, initialize_knowledge_base
-import re
+from .bm25_index import BM25Index, reciprocal_rank_fusion
+from .query_cache import QueryResultCache
+from .client import RagClient, RAG_SERVER_URL
+from .math_normalizer import normalize_query
+from .topics import classify_topic, topic_filter
+from .reranker import get_reranker, RERANK_ENABLED, RERANK_CANDIDATES
+import os
+import time
+import threading
+
+# Retrieval mode: "dense" (sirf MiniLM) ya "hybrid" (BM25 + dense, RRF fusion)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "dense")
+HYBRID_DENSE_WEIGHT = float(os.getenv("HYBRID_DENSE_WEIGHT", "1.0"))
+HYBRID_BM25_WEIGHT = float(os.getenv("HYBRID_BM25_WEIGHT", "1.0"))
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))  # har retriever se kitne candidates
+KB_SYNC_INTERVAL = float(os.getenv("KB_SYNC_INTERVAL", "0"))  # seconds, 0 = sirf startup pe sync
+# Parsed problem ke topic se metadata prefilter; results weak hon to unfiltered fallback
+TOPIC_FILTER = os.getenv("TOPIC_FILTER", "1") == "1"
+TOPIC_FILTER_MIN_SCORE = float(os.getenv("TOPIC_FILTER_MIN_SCORE", "0.6"))  # top dense cosine isse kam = weak
 
 class Retriever:
-    def __init__(self):
-        # Initialize knowledge base if not already
-        initialize_knowledge_base()
+    def __init__(self, lazy=True, mode=None, dense_weight=None, bm25_weight=None, server_url=None,
+                 rerank=None):
+        """
+        lazy=True: KB sync aur model loading pehli query tak defer hoti hai,
+        taaki import/app startup fast rahe
+        mode: "dense" ya "hybrid" (default RETRIEVAL_MODE env se)
+        server_url: RAG server ka URL (default RAG_SERVER_URL env) - set ho to
+        client mode, sab kaam server karta hai. "" = hamesha local.
+        rerank: cross-encoder reranking (default RERANK_ENABLED env se)
+        """
+        self.mode = mode or RETRIEVAL_MODE
+        self.dense_weight = HYBRID_DENSE_WEIGHT if dense_weight is None else dense_weight
+        self.bm25_weight = HYBRID_BM25_WEIGHT if bm25_weight is None else bm25_weight
+        self._bm25 = None
+        self._bm25_version = None
+        self._bm25_lock = threading.Lock()
+        self._ready = False
+        self._ready_lock = threading.Lock()
+        self._last_sync = 0.0
+        self.startup_timings = {}
+        self.query_cache = QueryResultCache()
+        self.topic_stats = {'filtered': 0, 'fallbacks': 0}
+        self.reranker = get_reranker() if (RERANK_ENABLED if rerank is None else rerank) else None
+        server_url = RAG_SERVER_URL if server_url is None else server_url
+        self.remote = RagClient(server_url) if server_url else None
         
-        # Query enhancement patterns
-        self.math_patterns = {
-            'derivative': ['differentiate', 'derivative', 'rate of change'],
-            'integral': ['integral', 'integration', 'antiderivative'],
-            'probability': ['probability', 'chance', 'likelihood'],
-            'algebra': ['solve', 'equation', 'polynomial'],
-            'matrix': ['matrix', 'determinant', 'eigenvalue']
-        }
+        if not lazy and self.remote is None:
+            self._ensure_ready()
+    
+    def _ensure_ready(self):
+        """
+        Initialize knowledge base if not already - sirf ek baar
+        """
+        if self._ready:
+            if KB_SYNC_INTERVAL > 0 and time.time() - self._last_sync > KB_SYNC_INTERVAL:
+                self.refresh()
+            return
+        with self._ready_lock:
+            if self._ready:
+                return
+            start = time.perf_counter()
+            initialize_knowledge_base()
+            self._last_sync = time.time()
+            self.startup_timings['initialize'] = time.perf_counter() - start
+            self._ready = True
+            print(f"✅ Retriever ready ({self.startup_timings['initialize'] * 1000:.1f} ms)")
+    
+    def refresh(self):
+        """
+        KB ko dobara sync karo (hot update). Version badla to query cache
+        aur BM25 index apne aap invalidate ho jaate hain.
+        """
+        if self.remote is not None:
+            return self.remote.refresh()['stats']
+        with self._ready_lock:
+            self._last_sync = time.time()
+            return initialize_knowledge_base()
+    
+    def startup_report(self):
+        """
+        Startup timings: chroma init, KB sync, model load (agar hua), first query
+        """
+        if self.remote is not None:
+            return {'remote': self.remote.url, **self.remote.stats()}
+        report = dict(self.startup_timings)
+        if self._ready:
+            vector_store = get_vector_store()
+            report.update(vector_store.timings)
+            report['model_loaded'] = vector_store.model_loaded
+            report['document_count'] = vector_store.count()
+        report['ready'] = self._ready
+        return report
     
     def enhance_query(self, query):
         """
-        Query ko enhance karo better retrieval ke liye
+        Query ko enhance karo better retrieval ke liye - math notation
+        canonical form mein (x² = x^2 = x^{2}), symbols bache rehte hain,
+        phir concept terms add. Cache key bhi isi se banti hai.
         """
-        enhanced = query.lower()
-        
-        # Add relevant math terms
-        for term, synonyms in self.math_patterns.items():
-            if any(syn in enhanced for syn in synonyms):
-                if term not in enhanced:
-                    enhanced = f"{enhanced} {term}"
-        
-        # Clean query
-        enhanced = re.sub(r'[^\w\s\.\?]', ' ', enhanced)
-        enhanced = re.sub(r'\s+', ' ', enhanced).strip()
-        
-        return enhanced
+        return normalize_query(query)
     
-    def retrieve(self, query, top_k=5):
+    def _get_bm25_index(self, vector_store):
+        """
+        BM25 index collection se banao - KB version badle to rebuild
+        """
+        if self._bm25 is not None and self._bm25_version == vector_store.kb_version:
+            return self._bm25
+        with self._bm25_lock:
+            if self._bm25 is None or self._bm25_version != vector_store.kb_version:
+                start = time.perf_counter()
+                ids, documents, metadatas = [], [], []
+                for page_ids, page_docs, page_metas in vector_store.iter_documents():
+                    ids.extend(page_ids)
+                    documents.extend(page_docs)
+                    metadatas.extend(page_metas)
+                self._bm25 = BM25Index().build(ids, documents, metadatas)
+                self._bm25_version = vector_store.kb_version
+                print(f"✅ BM25 index built: {len(ids)} chunks "
+                      f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+        return self._bm25
+    
+    def _hybrid_search(self, vector_store, enhanced_query, top_k, where=None):
+        """
+        BM25 aur dense dono se candidates (enhanced query canonical hai, symbols
+        bache rehte hain), phir weighted reciprocal-rank fusion
+        """
+        candidates = max(top_k, HYBRID_CANDIDATES)
+        dense_results = vector_store.search(enhanced_query, top_k=candidates, where=where)
+        bm25_results = self._get_bm25_index(vector_store).search(
+            enhanced_query, top_k=candidates, where=where
+        )
+        return self._fuse(dense_results, bm25_results, top_k)
+    
+    def _search(self, vector_store, mode, enhanced_query, top_k, where=None):
+        if mode == "hybrid":
+            return self._hybrid_search(vector_store, enhanced_query, top_k, where)
+        return vector_store.search(enhanced_query, top_k=top_k, where=where)
+    
+    @staticmethod
+    def _topic_where(query, topic):
+        """
+        Parser ka topic + query ka apna topic (parser bahut baar default
+        'algebra' deta hai) -> where filter. None = filter nahi.
+        """
+        if not TOPIC_FILTER or not topic:
+            return None
+        return topic_filter([topic, classify_topic(query)])
+    
+    @staticmethod
+    def _is_weak(results, top_k):
+        """Filtered results kam hain ya best dense match kamzor hai"""
+        if len(results) < top_k:
+            return True
+        best = results[0].get('dense_score', results[0]['score'])
+        return best is not None and best < TOPIC_FILTER_MIN_SCORE
+    
+    def _fuse(self, dense_results, bm25_results, top_k):
+        """Weighted RRF, per-source scores ke saath"""
+        fused = reciprocal_rank_fusion(
+            [dense_results, bm25_results],
+            weights=[self.dense_weight, self.bm25_weight],
+            k=HYBRID_RRF_K,
+            top_k=top_k
+        )
+        for result in fused:
+            result['dense_score'], result['bm25_score'] = result.pop('source_scores')
+        return fused
+    
+    @staticmethod
+    def _format_context(results):
+        """Search results ko app/solver ke context format mein badlo"""
+        formatted_context = []
+        for result in results:
+            item = {
+                'id': result.get('id'),
+                'content': result['content'],
+                'score': result['score'],
+                'source': result['metadata'].get('source', 'unknown'),
+                'metadata': result['metadata']
+            }
+            if 'rerank_score' in result:
+                item['rerank_score'] = result['rerank_score']
+            formatted_context.append(item)
+        return formatted_context
+    
+    def retrieve(self, query, top_k=5, mode=None, topic=None):
         """
         Main retrieval function
+        query: text, ya ParserAgent.parse() ka parsed problem dict
+        (problem_text + topic - topic se metadata prefilter lagta hai)
+        mode: "dense" / "hybrid" - None ho to self.mode
         """
         try:
+            if isinstance(query, dict):
+                topic = topic or query.get('topic')
+                query = query.get('problem_text', '')
+            
+            if self.remote is not None:
+                return self.remote.retrieve(query, top_k=top_k, mode=mode, topic=topic)
+            
+            self._ensure_ready()
+            query_start = time.perf_counter()
+            
             # Enhance query
             enhanced_query = self.enhance_query(query)
             
             # Get vector store
             vector_store = get_vector_store()
+            mode = mode or self.mode
             
-            # Search in vector store
-            results = vector_store.search(enhanced_query, top_k=top_k)
+            where = self._topic_where(query, topic)
+            
+            # Cache check - key: mode + top_k + canonical query ("x²" / "x^2" ek hi entry) + topics
+            cache_key = (mode, top_k, enhanced_query,
+                         tuple(where['topic']['$in']) if where else None)
+            cached = self.query_cache.get(cache_key, vector_store.kb_version)
+            if cached is not None:
+                return cached
+            
+            # Reranker ho to zyada candidates lao, rerank ke baad top_k
+            candidates = max(top_k, RERANK_CANDIDATES) if self.reranker is not None else top_k
+            
+            # Search in vector store - pehle topic filter ke saath
+            results = self._search(vector_store, mode, enhanced_query, candidates, where)
+            if where is not None:
+                self.topic_stats['filtered'] += 1
+                if self._is_weak(results, top_k):
+                    self.topic_stats['fallbacks'] += 1
+                    results = self._search(vector_store, mode, enhanced_query, candidates)
+            
+            reranked = True
+            if self.reranker is not None:
+                # Cross-encoder original query padhta hai (canonical nahi)
+                results, reranked = self.reranker.rerank(query, results, top_k=top_k)
             
             # Format results
-            formatted_context = []
-            for result in results:
-                formatted_context.append({
-                    'content': result['content'],
-                    'score': result['score'],
-                    'source': result['metadata'].get('source', 'unknown'),
-                    'metadata': result['metadata']
-                })
+            formatted_context = self._format_context(results)
+            # Budget ki wajah se rerank adhoora raha to cache mat karo - agli baar poora ho
+            if formatted_context and reranked:
+                self.query_cache.put(cache_key, vector_store.kb_version, formatted_context)
+            
+            if 'first_query' not in self.startup_timings:
+                self.startup_timings['first_query'] = time.perf_counter() - query_start
             
             return formatted_context
             
@@ -69,6 +257,53 @@ class Retriever:
             # Return empty context instead of crashing
             return []
     
+    def retrieve_many(self, queries, top_k=5, mode=None):
+        """
+        Batch retrieval (offline eval / batch solving ke liye).
+        Dense search ek hi encode + vectorized query mein hota hai.
+        """
+        try:
+            if self.remote is not None:
+                return self.remote.retrieve_many(queries, top_k=top_k, mode=mode)
+            
+            self._ensure_ready()
+            enhanced_queries = [self.enhance_query(query) for query in queries]
+            vector_store = get_vector_store()
+            
+            if (mode or self.mode) == "hybrid":
+                candidates = max(top_k, HYBRID_CANDIDATES)
+                dense_lists = vector_store.search_many(enhanced_queries, top_k=candidates)
+                bm25_index = self._get_bm25_index(vector_store)
+                results_per_query = []
+                for enhanced, dense_results in zip(enhanced_queries, dense_lists):
+                    bm25_results = bm25_index.search(enhanced, top_k=candidates)
+                    results_per_query.append(self._fuse(dense_results, bm25_results, top_k))
+            else:
+                results_per_query = vector_store.search_many(enhanced_queries, top_k=top_k)
+            
+            return [self._format_context(results) for results in results_per_query]
+        
+        except Exception as e:
+            print(f"⚠️ Batch retrieval error: {e}")
+            return [[] for _ in queries]
+    
+    def cache_stats(self):
+        """
+        Query result cache + embedding cache stats (production hit rate ke liye)
+        """
+        if self.remote is not None:
+            stats = self.remote.stats()
+            return {'query_cache': stats['query_cache'], 'embedding_cache': stats['embedding_cache'],
+                    'embedding_scheduler': stats['scheduler'], 'topic_filter': stats['topic_filter']}
+        self._ensure_ready()
+        return {
+            'query_cache': self.query_cache.stats(),
+            'embedding_cache': get_vector_store().cache_stats(),
+            'embedding_scheduler': get_vector_store().scheduler_stats(),
+            'topic_filter': dict(self.topic_stats),
+            'reranker': self.reranker.stats() if self.reranker is not None else {'enabled': False}
+        }
+    
     def get_relevant_formulas(self, query):
         """
         Specific formulas retrieve karo query ke liye
@@ -84,9 +319,12 @@ class Retriever:
         
         return formulas
 
-# Global instance
+# Global instance - lazy, import pe kuch load nahi hota
 retriever = Retriever()
 
 def retrieve_context(query):
-    """Simple function for main app"""
+    """
+    Simple function for main app.
+    query: text ya parsed problem dict (topic filter ke liye)
+    """
     return retriever.retrieve(query)
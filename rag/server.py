@@ -0,0 +1,136 @@
+"""
+Bhai, ye shared RAG server hai - ek process jo embedding model, index aur
+Retriever own karta hai. Saare Streamlit workers RAG_SERVER_URL set karke
+thin client ban jaate hain (rag/client.py), har worker mein model load nahi hota.
+
+Concurrent requests ke single-query embeddings EmbeddingScheduler se micro-batch
+hote hain: RAG_SERVER_BATCH_WAIT_MS tak ya RAG_SERVER_MAX_BATCH items tak collect,
+phir ek encode.
+
+Run: python -m rag.server [--host 127.0.0.1] [--port 8765]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from . import vector_store as vector_store_module
+from .vector_store import VectorStore
+from .retriever import Retriever
+from .embed_scheduler import EmbeddingScheduler
+
+RAG_SERVER_HOST = os.getenv("RAG_SERVER_HOST", "127.0.0.1")
+RAG_SERVER_PORT = int(os.getenv("RAG_SERVER_PORT", "8765"))
+SERVER_BATCH_WAIT_MS = float(os.getenv("RAG_SERVER_BATCH_WAIT_MS", "5"))
+SERVER_MAX_BATCH = int(os.getenv("RAG_SERVER_MAX_BATCH", "64"))
+
+
+class RagRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints - server attribute pe vector_store, retriever, scheduler"""
+
+    def _send(self, status, payload):
+        # numpy scalars (scores) bhi serialize ho jaayein
+        body = json.dumps(
+            payload, default=lambda o: o.item() if hasattr(o, 'item') else str(o)
+        ).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {'status': 'ok'})
+        elif self.path == "/stats":
+            self._send(200, self.server.stats())
+        else:
+            self._send(404, {'error': f"unknown path {self.path}"})
+
+    def do_POST(self):
+        routes = {
+            "/embed": lambda body: {'embeddings': self.server.scheduler.embed(body['texts'])},
+            "/search": lambda body: {'results': self.server.vector_store.search(
+                body['query'], top_k=body.get('top_k', 5), where=body.get('where'))},
+            "/search_many": lambda body: {'results': self.server.vector_store.search_many(
+                body['queries'], top_k=body.get('top_k', 5), where=body.get('where'))},
+            "/retrieve": lambda body: {'results': self.server.retriever.retrieve(
+                body['query'], top_k=body.get('top_k', 5), mode=body.get('mode'),
+                topic=body.get('topic'))},
+            "/retrieve_many": lambda body: {'results': self.server.retriever.retrieve_many(
+                body['queries'], top_k=body.get('top_k', 5), mode=body.get('mode'))},
+            "/refresh": lambda body: {'stats': self.server.retriever.refresh()},
+        }
+        route = routes.get(self.path)
+        if route is None:
+            self._send(404, {'error': f"unknown path {self.path}"})
+            return
+        try:
+            self._send(200, route(self._read_json()))
+        except (KeyError, ValueError) as e:
+            self._send(400, {'error': f"bad request: {e}"})
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        # Har request print mat karo
+        pass
+
+
+class RagServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, persist_directory="./chroma_db"):
+        super().__init__(address, RagRequestHandler)
+        # Is process ka apna local store - get_vector_store() bhi yahi de
+        self.vector_store = VectorStore(persist_directory)
+        vector_store_module.vector_store = self.vector_store
+        if self.vector_store.scheduler is None:
+            self.vector_store.scheduler = EmbeddingScheduler(
+                self.vector_store.embed_texts, SERVER_BATCH_WAIT_MS, SERVER_MAX_BATCH
+            )
+        self.scheduler = self.vector_store.scheduler
+        self.retriever = Retriever(lazy=False, server_url="")
+        self.started_at = time.time()
+
+    def stats(self):
+        return {
+            'kb_version': self.vector_store.kb_version,
+            'model_loaded': self.vector_store.model_loaded,
+            'document_count': self.vector_store.count(),
+            'uptime_s': time.time() - self.started_at,
+            'scheduler': self.scheduler.stats(),
+            'query_cache': self.retriever.query_cache.stats(),
+            'topic_filter': dict(self.retriever.topic_stats),
+            'embedding_cache': self.vector_store.cache_stats()
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared embedding/retrieval server")
+    parser.add_argument("--host", default=RAG_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=RAG_SERVER_PORT)
+    parser.add_argument("--persist-directory", default="./chroma_db")
+    args = parser.parse_args(argv)
+
+    server = RagServer((args.host, args.port), args.persist_directory)
+    server.vector_store.embedding_model  # warm up - pehli request slow na ho
+    print(f"🚀 RAG server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Shutting down")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Bhai, ye chunks ko topic tag karta hai (ingest time pe metadata mein).
+Topic names ParserAgent wale hi hain, taaki parsed_problem['topic'] seedha
+Chroma `where` filter ban sake. Heading path zyada weight - "Calculus Formulas
+> Limits" wala chunk calculus hai chahe text mein "sin" aaye.
+"""
+
+import re
+
+TOPIC_VERSION = "v2"  # v2: short keywords full-word match
+GENERAL_TOPIC = "general"  # mistakes, templates jaisa mixed content - har filter mein shaamil
+
+TOPIC_KEYWORDS = {
+    'algebra': ['algebra', 'quadratic', 'equation', 'polynomial', 'progression', 'ap', 'gp',
+                'binomial', 'discriminant', 'roots', 'logarithm', 'log'],
+    'calculus': ['calculus', 'derivative', 'differentiat', 'integra', 'limit', 'lim', 'd/dx',
+                 '∫', 'maxima', 'minima', "l'hopital", 'chain rule', 'continuity'],
+    'probability': ['probability', 'bayes', 'random variable', 'variance', 'p(a', 'events',
+                    'independent', 'mutually exclusive', 'expectation'],
+    'linear_algebra': ['linear algebra', 'matrix', 'matrices', 'determinant', 'vector',
+                       'eigenvalue', 'dot product', 'cross product'],
+    'trigonometry': ['trigonometr', 'sin', 'cos', 'tan', 'θ', 'angle', 'identities'],
+    'coordinate_geometry': ['coordinate', 'distance', 'section formula', 'midpoint', 'slope',
+                            'straight line', 'circle', 'parabola', 'ellipse', 'hyperbola',
+                            'conic'],
+}
+
+HEADING_WEIGHT = 3
+SHORT_KEYWORD_LENGTH = 3  # isse chhote alphabetic keywords (ap, log, sin) pura word hi match
+
+
+def _keyword_pattern(keyword):
+    """
+    Lambe keywords prefix match ('integra' -> integral / integration).
+    Chhote words prefix pe galat match karte ('log' -> logic, 'sin' -> since),
+    to unke baad letter nahi hona chahiye - 'sin2x', 'sin(x)' phir bhi match.
+    """
+    pattern = rf'(?<!\w){re.escape(keyword)}'
+    if keyword.isalpha() and len(keyword) <= SHORT_KEYWORD_LENGTH:
+        pattern += r'(?![a-z])'
+    return re.compile(pattern)
+
+
+TOPIC_PATTERNS = {topic: [_keyword_pattern(keyword) for keyword in keywords]
+                  for topic, keywords in TOPIC_KEYWORDS.items()}
+
+
+def _score(text, patterns):
+    return sum(1 for pattern in patterns if pattern.search(text))
+
+
+def classify_topic(text, heading_path=""):
+    """Chunk ka topic - koi keyword na mile ya tie ho to 'general'"""
+    text = text.lower()
+    heading_path = heading_path.lower()
+    scores = {
+        topic: HEADING_WEIGHT * _score(heading_path, patterns) + _score(text, patterns)
+        for topic, patterns in TOPIC_PATTERNS.items()
+    }
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best, best_score = ranked[0]
+    if best_score == 0 or best_score == ranked[1][1]:
+        return GENERAL_TOPIC
+    return best
+
+
+def topic_filter(topics):
+    """Chroma/NumpyIndex where clause: in topics ke chunks + general chunks"""
+    topics = sorted({topic for topic in topics if topic and topic != GENERAL_TOPIC})
+    if not topics:
+        return None
+    return {"topic": {"$in": topics + [GENERAL_TOPIC]}}
+
+
+def topic_signature():
+    return TOPIC_VERSION
@@ -4,19 +4,86 @@ Hum ChromaDB use karenge - NEW API wala version.
 """
 
 import os
+import time
+import threading
 import chromadb
-from sentence_transformers import SentenceTransformer
 import json
+import numpy as np
+from .embedding_cache import EmbeddingCache, EMBEDDING_CACHE_ENABLED
+from .kb_sync import sync_knowledge_base, KNOWLEDGE_BASE_DIR
+from .numpy_index import NumpyIndex
+from .client import RemoteVectorStore, RAG_SERVER_URL
+from .embed_scheduler import EmbeddingScheduler, EMBED_SCHEDULER, PRIORITY_BULK
+from .math_normalizer import embedding_text
+from .embedders import load_embedder, embedder_id, EMBEDDING_BACKEND
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# Index backend: "chroma" (PersistentClient) ya "numpy" (brute-force, chhote KB ke liye)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+NUMPY_INDEX_MMAP = os.getenv("NUMPY_INDEX_MMAP", "1") != "0"
+
+# Batching config - .env se override kar sakte ho
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+UPSERT_BATCH_SIZE = int(os.getenv("CHROMA_UPSERT_BATCH_SIZE", "1000"))
+EMBED_NUM_WORKERS = int(os.getenv("EMBED_NUM_WORKERS", "0"))  # 0 = no process pool
+
+
+def cosine_from_distance(distance, space):
+    """
+    Index distance -> cosine similarity (embeddings L2-normalized hain).
+    Chroma default "l2" squared distance deta hai = 2 - 2cos, "cosine" aur
+    NumpyIndex 1 - cos. Score har backend pe same scale - thresholds ek jaise.
+    """
+    if space == "l2":
+        return 1 - distance / 2
+    return 1 - distance  # "cosine" / "ip"
+
 
 class VectorStore:
-    def __init__(self, persist_directory="./chroma_db"):
+    def __init__(self, persist_directory="./chroma_db", backend=None):
         """
         Vector store initialize karo - NEW Chroma API
+        backend: "chroma" ya "numpy" (default VECTOR_BACKEND env se)
         """
-        # Embedding model (free, local)
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("✅ Embedding model loaded")
+        # Embedding model (free, local) - pehli encode call pe load hoga
+        # Backend: "torch" (SentenceTransformer) ya "onnx" (onnxruntime, torch-free)
+        self.model_name = EMBEDDING_MODEL
+        self.embedding_backend = EMBEDDING_BACKEND
+        self._embedding_model = None
+        self._model_lock = threading.Lock()
+        self.timings = {}
+        self.kb_version = None  # KB manifest version, sync ke baad set hota hai
+        self.backend = backend or VECTOR_BACKEND
+        self.distance_space = "cosine"  # NumpyIndex 1 - cos; Chroma apni collection se
+        # Micro-batching scheduler (EMBED_SCHEDULER=1 ya RAG server mode mein)
+        self.scheduler = EmbeddingScheduler(self.embed_texts) if EMBED_SCHEDULER else None
+
+        start = time.perf_counter()
+        if self.backend == "numpy":
+            # Collection jaisa API, par sab kuch ek NumPy matrix mein
+            self.client = None
+            self.collection = NumpyIndex(
+                os.path.join(persist_directory, "numpy_index"),
+                mmap=NUMPY_INDEX_MMAP
+            )
+            print("✅ NumPy index backend ready")
+        else:
+            self._init_chroma(persist_directory)
+        self.timings['index_init'] = time.perf_counter() - start
+
+        self.persist_directory = persist_directory
         
+        # Embedding cache - same text dobara encode nahi hoga
+        self.embedding_cache = None
+        if EMBEDDING_CACHE_ENABLED:
+            self.embedding_cache = EmbeddingCache(
+                os.path.join(persist_directory, "embedding_cache.sqlite"),
+                embedder_id(self.model_name, self.embedding_backend)
+            )
+    
+    def _init_chroma(self, persist_directory):
+        """Chroma client + collection"""
         # Chroma client setup - NEW PERSISTENT CLIENT
         self.client = chromadb.PersistentClient(path=persist_directory)
         
@@ -30,23 +97,119 @@ class VectorStore:
                 metadata={"description": "JEE Math Knowledge Base"}
             )
             print("✅ New collection created")
-        
-        self.persist_directory = persist_directory
+        self.distance_space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+    
+    @property
+    def embedding_model(self):
+        """
+        Lazy model loading - torch/onnxruntime import aur model load sirf
+        tab jab sach mein kuch embed karna ho
+        """
+        if self._embedding_model is None:
+            with self._model_lock:
+                if self._embedding_model is None:
+                    start = time.perf_counter()
+                    self._embedding_model = load_embedder(self.model_name, self.embedding_backend)
+                    self.timings['model_load'] = time.perf_counter() - start
+                    print(f"✅ Embedding model loaded [{self.embedding_backend}] "
+                          f"({self.timings['model_load']:.2f}s)")
+        return self._embedding_model
+    
+    @property
+    def model_loaded(self):
+        return self._embedding_model is not None
     
     def embed_text(self, text):
         """
         Text ko embeddings mein convert karo
         """
+        if self.embedding_cache is not None:
+            cached = self.embedding_cache.get(text)
+            if cached is not None:
+                return cached.tolist()
+        
+        # Scheduler: concurrent single queries ek batch mein jaati hain
+        # (scheduler embed_texts call karta hai, cache wahi bharta hai)
+        if self.scheduler is not None:
+            return list(self.scheduler.embed_one(text))
+        
         # SentenceTransformer se embedding generate karo
         embedding = self.embedding_model.encode(text)
+        
+        if self.embedding_cache is not None:
+            self.embedding_cache.put(text, embedding)
         return embedding.tolist()
     
-    def add_documents(self, documents, metadatas=None, ids=None):
+    def embed_texts(self, texts, batch_size=None, pool=None):
+        """
+        Bahut saare texts ek saath embed karo - ek encode call, batched.
+        pool: sentence-transformers multi-process pool (optional)
+        """
+        if not texts:
+            return []
+        
+        batch_size = batch_size or EMBED_BATCH_SIZE
+        
+        # Cache se jo mil jaaye wo lo, baaki hi model ko bhejo
+        if self.embedding_cache is not None:
+            vectors = self.embedding_cache.get_many(texts)
+        else:
+            vectors = [None] * len(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            if pool is not None:
+                embeddings = self.embedding_model.encode_multi_process(
+                    missing_texts, pool, batch_size=batch_size
+                )
+            else:
+                embeddings = self.embedding_model.encode(
+                    missing_texts,
+                    batch_size=batch_size,
+                    show_progress_bar=False,
+                    convert_to_numpy=True
+                )
+            
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(missing_texts, embeddings)
+            for i, embedding in zip(missing, embeddings):
+                vectors[i] = embedding
+        
+        return np.asarray(vectors, dtype=np.float32).tolist()
+    
+    def scheduler_stats(self):
+        """Micro-batching scheduler: batch size distribution, queue wait"""
+        if self.scheduler is None:
+            return {'enabled': False}
+        return self.scheduler.stats()
+    
+    def cache_stats(self):
+        """Embedding cache ke hit/miss counters"""
+        if self.embedding_cache is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.embedding_cache.stats()}
+    
+    def _max_write_batch(self):
+        """Chroma ek call mein kitne records accept karta hai"""
+        try:
+            return min(UPSERT_BATCH_SIZE, self.client.get_max_batch_size())
+        except Exception:
+            # Purane chroma versions mein ye method nahi hai
+            return UPSERT_BATCH_SIZE
+    
+    def add_documents(self, documents, metadatas=None, ids=None,
+                      batch_size=None, num_workers=None, upsert=False, pool=None):
         """
-        Documents ko vector store mein add karo
+        Documents ko vector store mein add karo - batched ingestion.
+        Chunks `batch_size` ke batches mein encode hote hain aur Chroma mein
+        bulk writes jaate hain. num_workers > 0 ho to process pool use hota hai.
+        upsert=True: existing IDs overwrite ho jaate hain (KB sync ke liye).
+        pool: caller ka already-started process pool (bahut saari calls mein reuse).
+        Returns: {'added', 'seconds', 'docs_per_sec'}
         """
         if not documents:
-            return
+            return {'added': 0, 'seconds': 0.0, 'docs_per_sec': 0.0}
         
         # Auto-generate ids if not provided
         if ids is None:
@@ -56,55 +219,151 @@ class VectorStore:
         if metadatas is None:
             metadatas = [{"type": "math_knowledge"} for _ in documents]
         
-        # Generate embeddings
-        embeddings = []
-        for doc in documents:
-            embedding = self.embed_text(doc)
-            embeddings.append(embedding)
+        num_workers = EMBED_NUM_WORKERS if num_workers is None else num_workers
+        write_batch = self._max_write_batch()
         
-        # Add to collection - NEW API
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            embeddings=embeddings,
-            ids=ids
-        )
+        own_pool = pool is None and num_workers > 0
+        if own_pool:
+            pool = self.embedding_model.start_multi_process_pool(
+                target_devices=["cpu"] * num_workers
+            )
+        
+        start = time.perf_counter()
+        try:
+            for begin in range(0, len(documents), write_batch):
+                end = begin + write_batch
+                batch_docs = documents[begin:end]
+                # Canonical math form embed hota hai, original text store
+                batch_texts = [embedding_text(doc) for doc in batch_docs]
+                
+                # Generate embeddings - poora batch ek saath. Scheduler ho to
+                # bulk priority pe - saath chal rahi queries pehle nikalti hain
+                if self.scheduler is not None and pool is None:
+                    embeddings = self.scheduler.embed(batch_texts, priority=PRIORITY_BULK)
+                else:
+                    embeddings = self.embed_texts(batch_texts, batch_size=batch_size, pool=pool)
+                
+                # Add to collection - bulk write
+                write = self.collection.upsert if upsert else self.collection.add
+                write(
+                    documents=batch_docs,
+                    metadatas=metadatas[begin:end],
+                    embeddings=embeddings,
+                    ids=ids[begin:end]
+                )
+        finally:
+            if own_pool:
+                self.embedding_model.stop_multi_process_pool(pool)
         
-        print(f"✅ Added {len(documents)} documents to vector store")
+        elapsed = time.perf_counter() - start
+        rate = len(documents) / elapsed if elapsed > 0 else 0.0
+        print(f"✅ Added {len(documents)} documents to vector store "
+              f"({elapsed:.2f}s, {rate:.1f} docs/sec)")
+        
+        return {'added': len(documents), 'seconds': elapsed, 'docs_per_sec': rate}
+    
+    def _format_query_results(self, results, query_index=0):
+        """
+        Chroma query() ke lists-of-lists se ek query ke results nikalo.
+        score = cosine similarity (backend ka distance space jo bhi ho)
+        """
+        formatted_results = []
+        documents = results['documents'][query_index] if results['documents'] else []
+        metadatas = results['metadatas'][query_index] if results.get('metadatas') else None
+        distances = results['distances'][query_index] if results.get('distances') else None
+        for i in range(len(documents)):
+            formatted_results.append({
+                'content': documents[i],
+                'metadata': metadatas[i] if metadatas else {},
+                'score': cosine_from_distance(distances[i], self.distance_space) if distances else 0.9,
+                'id': results['ids'][query_index][i]
+            })
+        return formatted_results
     
-    def search(self, query, top_k=5):
+    def search(self, query, top_k=5, where=None):
         """
         Query ke similar documents dhundho
+        where: metadata filter (e.g. topic) - sirf matching chunks mein search
         """
         try:
-            # Query ka embedding banao
-            query_embedding = self.embed_text(query)
+            # Query ka embedding banao (chunks jaisa canonical form)
+            query_embedding = self.embed_text(embedding_text(query))
             
             # Search in vector store - NEW API
             results = self.collection.query(
                 query_embeddings=[query_embedding],
-                n_results=top_k
+                n_results=top_k,
+                where=where
             )
             
             # Format results
-            formatted_results = []
-            if results['documents'] and len(results['documents'][0]) > 0:
-                for i in range(len(results['documents'][0])):
-                    formatted_results.append({
-                        'content': results['documents'][0][i],
-                        'metadata': results['metadatas'][0][i] if results['metadatas'] and results['metadatas'][0] else {},
-                        'score': 1 - results['distances'][0][i] if results.get('distances') and results['distances'][0] else 0.9,
-                        'id': results['ids'][0][i]
-                    })
-            
-            return formatted_results
+            return self._format_query_results(results)
         except Exception as e:
             print(f"⚠️ Search error: {e}")
             return []
     
+    def search_many(self, queries, top_k=5, batch_size=None, where=None):
+        """
+        Bahut saari queries ek saath - saare embeddings ek encode call mein,
+        phir har batch ke liye ek vectorized collection.query.
+        Returns: har query ke liye search() jaisi list (same order)
+        """
+        if not queries:
+            return []
+        
+        try:
+            query_embeddings = self.embed_texts([embedding_text(query) for query in queries],
+                                                batch_size=batch_size)
+            
+            all_results = []
+            query_batch = self._max_write_batch()
+            for begin in range(0, len(query_embeddings), query_batch):
+                batch = query_embeddings[begin:begin + query_batch]
+                results = self.collection.query(
+                    query_embeddings=batch,
+                    n_results=top_k,
+                    where=where
+                )
+                for i in range(len(batch)):
+                    all_results.append(self._format_query_results(results, i))
+            return all_results
+        except Exception as e:
+            print(f"⚠️ Batch search error: {e}")
+            return [[] for _ in queries]
+    
+    def count(self):
+        """
+        Collection mein kitne documents hain - cheap, kuch materialize nahi hota
+        """
+        try:
+            return self.collection.count()
+        except Exception:
+            return 0
+    
+    def iter_documents(self, page_size=1000):
+        """
+        Documents pages mein lao (ids, documents, metadatas) - embeddings nahi.
+        Poora KB ek saath memory mein nahi aata.
+        """
+        offset = 0
+        while True:
+            page = self.collection.get(
+                include=['documents', 'metadatas'],
+                limit=page_size,
+                offset=offset
+            )
+            ids = page.get('ids', [])
+            if not ids:
+                break
+            yield ids, page['documents'], page['metadatas']
+            offset += len(ids)
+            if len(ids) < page_size:
+                break
+    
     def get_all_documents(self):
         """
-        Saare documents get karo
+        Saare documents get karo.
+        NOTE: poora KB memory mein aata hai - sirf count chahiye to count() use karo
         """
         try:
             results = self.collection.get()
@@ -112,13 +371,29 @@ class VectorStore:
         except:
             return {'documents': []}
     
+    def delete_documents(self, ids):
+        """
+        Given IDs ke documents delete karo (batched)
+        """
+        if not ids:
+            return
+        write_batch = self._max_write_batch()
+        for begin in range(0, len(ids), write_batch):
+            self.collection.delete(ids=ids[begin:begin + write_batch])
+        print(f"🗑️ Deleted {len(ids)} stale documents")
+    
     def delete_all(self):
         """
         Saara data delete karo (testing ke liye)
         """
         try:
-            self.client.delete_collection("math_knowledge")
-            self.collection = self.client.create_collection("math_knowledge")
+            if self.backend == "numpy":
+                self.collection.reset()
+                self.collection.persist()
+            else:
+                self.client.delete_collection("math_knowledge")
+                self.collection = self.client.create_collection("math_knowledge")
+                self.distance_space = (self.collection.metadata or {}).get("hnsw:space", "l2")
             print("✅ All documents deleted")
         except:
             print("⚠️ Could not delete collection")
@@ -127,100 +402,67 @@ class VectorStore:
         """
         Persist karo disk par
         """
-        # Chroma PersistentClient automatically saves
+        # Chroma PersistentClient automatically saves, NumPy index ko likhna padta hai
+        if self.backend == "numpy":
+            self.collection.persist()
         print(f"✅ Vector store persisted to {self.persist_directory}")
 
 # Global instance - DON'T CREATE HERE, create in function
 vector_store = None
 
 def get_vector_store():
-    """Lazy initialization of vector store"""
+    """
+    Lazy initialization of vector store.
+    RAG_SERVER_URL set ho to remote (thin) store - model/index server pe
+    """
     global vector_store
     if vector_store is None:
-        vector_store = VectorStore()
+        vector_store = RemoteVectorStore() if RAG_SERVER_URL else VectorStore()
     return vector_store
 
-def initialize_knowledge_base():
+DEFAULT_DOCS = [
+    "Quadratic formula: x = [-b ± √(b² - 4ac)] / 2a",
+    "Derivative of x^n is nx^(n-1)",
+    "Probability P(A) = n(A) / n(S)",
+    "sin²θ + cos²θ = 1",
+    "Chain rule: d/dx(f(g(x))) = f'(g(x)) * g'(x)",
+    "Integration: ∫x^n dx = x^(n+1)/(n+1) + C",
+    "Limit: lim_{x→0} sin x / x = 1",
+    "Binomial coefficient: C(n,k) = n! / (k!(n-k)!)",
+    "Matrix determinant 2x2: ad - bc",
+    "Distance formula: √[(x2-x1)² + (y2-y1)²]",
+    "Arithmetic progression nth term: a + (n-1)d",
+    "Geometric progression sum: a(1 - r^n)/(1 - r)",
+    "Conditional probability: P(A|B) = P(A∩B)/P(B)",
+    "Bayes theorem: P(A|B) = [P(B|A)P(A)]/P(B)",
+    "Product rule: d/dx(uv) = u'v + uv'",
+    "Quotient rule: d/dx(u/v) = (u'v - uv')/v²",
+    "Pythagorean theorem: a² + b² = c²",
+    "Logarithm property: log(ab) = log(a) + log(b)",
+    "Exponential property: e^(a+b) = e^a * e^b",
+    "Sum of angles: sin(A+B) = sinA cosB + cosA sinB"
+]
+
+def initialize_knowledge_base(knowledge_dir=KNOWLEDGE_BASE_DIR):
     """
-    Knowledge base ko initialize karo with default documents
+    Knowledge base ko knowledge_dir ke saath incremental sync karo.
+    Sirf badle hue sections re-embed hote hain, stale chunks delete.
+    Kuch nahi badla to milliseconds mein khatam.
     """
+    start = time.perf_counter()
     vector_store = get_vector_store()
+    vector_store.timings['vector_store_init'] = time.perf_counter() - start
     
-    # Check if already populated
-    existing = vector_store.get_all_documents()
-    if len(existing.get('documents', [])) > 0:
-        print(f"✅ Knowledge base already has {len(existing['documents'])} documents")
-        return
+    if os.path.exists(knowledge_dir):
+        print(f"📁 Syncing knowledge from {knowledge_dir}")
     
-    # Create default knowledge documents
-    documents = []
-    metadatas = []
-    ids = []
+    stats = sync_knowledge_base(vector_store, knowledge_dir, default_docs=DEFAULT_DOCS)
+    vector_store.timings['kb_sync'] = stats['seconds']
+    vector_store.kb_version = stats['version']
+    if stats['embedded'] or stats['updated'] or stats['deleted']:
+        vector_store.save()
     
-    # Load from knowledge_base directory if exists
-    knowledge_dir = "rag/knowledge_base"
-    if os.path.exists(knowledge_dir):
-        print(f"📁 Loading knowledge from {knowledge_dir}")
-        for file_name in os.listdir(knowledge_dir):
-            if file_name.endswith('.md'):
-                file_path = os.path.join(knowledge_dir, file_name)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                    # Split into chunks (by sections)
-                    sections = content.split('\n## ')
-                    for i, section in enumerate(sections):
-                        if section.strip():
-                            # Add section title back
-                            if i == 0:
-                                chunk = section
-                            else:
-                                chunk = f"## {section}"
-                            
-                            documents.append(chunk)
-                            metadatas.append({
-                                "source": file_name,
-                                "section": i,
-                                "type": "math_knowledge"
-                            })
-                            ids.append(f"{file_name}_{i}")
-    
-    # Add some hardcoded knowledge too
-    if not documents:
-        print("📝 No knowledge files found, adding default knowledge...")
-        default_docs = [
-            "Quadratic formula: x = [-b ± √(b² - 4ac)] / 2a",
-            "Derivative of x^n is nx^(n-1)",
-            "Probability P(A) = n(A) / n(S)",
-            "sin²θ + cos²θ = 1",
-            "Chain rule: d/dx(f(g(x))) = f'(g(x)) * g'(x)",
-            "Integration: ∫x^n dx = x^(n+1)/(n+1) + C",
-            "Limit: lim_{x→0} sin x / x = 1",
-            "Binomial coefficient: C(n,k) = n! / (k!(n-k)!)",
-            "Matrix determinant 2x2: ad - bc",
-            "Distance formula: √[(x2-x1)² + (y2-y1)²]",
-            "Arithmetic progression nth term: a + (n-1)d",
-            "Geometric progression sum: a(1 - r^n)/(1 - r)",
-            "Conditional probability: P(A|B) = P(A∩B)/P(B)",
-            "Bayes theorem: P(A|B) = [P(B|A)P(A)]/P(B)",
-            "Product rule: d/dx(uv) = u'v + uv'",
-            "Quotient rule: d/dx(u/v) = (u'v - uv')/v²",
-            "Pythagorean theorem: a² + b² = c²",
-            "Logarithm property: log(ab) = log(a) + log(b)",
-            "Exponential property: e^(a+b) = e^a * e^b",
-            "Sum of angles: sin(A+B) = sinA cosB + cosA sinB"
-        ]
-        
-        for i, doc in enumerate(default_docs):
-            documents.append(doc)
-            metadatas.append({"type": "math_formula", "source": "default"})
-            ids.append(f"default_{i}")
-    
-    # Add to vector store
-    vector_store.add_documents(documents, metadatas, ids)
-    vector_store.save()
-    
-    print(f"✅ Initialized knowledge base with {len(documents)} chunks")
+    return stats
 
 if __name__ == "__main__":
     # Initialize and test
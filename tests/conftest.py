@@ -0,0 +1,10 @@
+"""
+Tests repo root se import karte hain (package install nahi hota) - `python -m pytest`
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
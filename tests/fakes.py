@@ -0,0 +1,45 @@
+"""Test helpers - model download / network ke bina deterministic fakes"""
+
+import types
+import zlib
+
+import numpy as np
+
+DIM = 64
+
+
+def fake_embed(texts):
+    """Deterministic bag-of-tokens embedding"""
+    vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for token in text.lower().split():
+            vectors[row, zlib.crc32(token.encode()) % DIM] += 1.0
+    return vectors
+
+
+def _chunk(text):
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=text))])
+
+
+class FakeCompletions:
+    """
+    AsyncGroq chat.completions jaisa - network nahi.
+    pieces: response ke text deltas, ya callable(kwargs) -> pieces
+    """
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.calls = []
+
+    async def create(self, stream=False, **kwargs):
+        self.calls.append(stream)
+        pieces = self.pieces(kwargs) if callable(self.pieces) else self.pieces
+        if not stream:
+            message = types.SimpleNamespace(content="".join(pieces))
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=None)
+
+        async def chunks():
+            yield _chunk(None)  # role chunk
+            for piece in pieces:
+                yield _chunk(piece)
+        return chunks()
@@ -0,0 +1,92 @@
+import pytest
+
+import memory.answer_cache as answer_cache_module
+from memory.answer_cache import (AnswerCache, math_skeleton, problem_key,
+                                 STATUS_CONFIRMED, STATUS_REJECTED)
+
+from tests.fakes import fake_embed
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(answer_cache_module, 'embedding_signature', lambda: 'fake|v1')
+    return AnswerCache(db_path=str(tmp_path / 'answers.db'), embed_fn=fake_embed, similarity=0.7)
+
+
+SOLUTION = {'final_answer': 'x = 4'}
+VERIFIED = {'is_correct': True, 'confidence': 0.95}
+EXPLANATION = {'explanation': 'subtract 5, divide by 2'}
+
+
+def store(cache, text, verification=VERIFIED, solution=SOLUTION):
+    return cache.store(text, {'problem_text': text, 'topic': 'algebra'},
+                       solution, verification, EXPLANATION)
+
+
+def test_skeleton_ignores_phrasing_but_not_numbers():
+    assert math_skeleton("Solve for x: 2x+5=13") == math_skeleton("Find x if 2x + 5 = 13")
+    assert math_skeleton("Solve for x: 2x+5=13") != math_skeleton("Solve for x: 2x+7=13")
+
+
+def test_skeleton_keeps_content_words():
+    red = "A bag has 3 red and 5 blue balls. Find probability of drawing a red ball"
+    assert math_skeleton(red) != math_skeleton(red.replace("a red ball", "a blue ball"))
+    assert math_skeleton("Probability of at least 2 heads in 4 tosses") != \
+        math_skeleton("Probability of at most 2 heads in 4 tosses")
+
+
+def test_problem_key_canonical_spacing():
+    assert problem_key("Solve 2x + 5 = 13.") == problem_key("solve 2x+5=13")
+
+
+def test_exact_hit_and_unverified_not_served(cache):
+    store(cache, "Solve 2x + 5 = 13")
+    hit = cache.lookup("solve 2x+5=13")
+    assert hit['match'] == 'exact' and hit['solution'] == SOLUTION
+
+    store(cache, "Solve 3x = 9", verification={'is_correct': False, 'confidence': 0.3})
+    assert cache.lookup("Solve 3x = 9") is None
+
+
+def test_similar_hit_requires_same_skeleton(cache):
+    store(cache, "Solve for x: 2x+5=13")
+    hit = cache.lookup("Find x: 2x+5=13")
+    assert hit is not None and hit['match'] == 'similar'
+    assert cache.lookup("Solve for x: 2x+7=13") is None
+
+
+def test_word_problems_differing_in_wording_do_not_share_answer(cache):
+    red = "A bag has 3 red and 5 blue balls. Find probability of drawing a red ball"
+    blue = red.replace("a red ball", "a blue ball")
+    store(cache, red, solution={'final_answer': '3/8'})
+    assert cache._get_index().search(fake_embed([blue])[0], limit=1)[0][1] >= cache.similarity
+    assert cache.lookup(blue) is None
+    assert cache.lookup("A bag has 3 red and 5 blue balls. What is the probability of drawing a red ball")['match'] == 'similar'
+
+
+def test_restore_keeps_hits_and_embedding(cache):
+    entry_id = store(cache, "Solve 2x + 5 = 13")
+    cache.lookup("Solve 2x + 5 = 13")
+    before = cache.conn.execute("SELECT hits, model, embedding FROM answers WHERE id = ?",
+                                (entry_id,)).fetchone()
+    assert before[0] == 1 and before[1] == 'fake|v1' and before[2] is not None
+
+    assert store(cache, "Solve 2x + 5 = 13", solution={'final_answer': '4'}) == entry_id
+    after = cache.conn.execute("SELECT hits, model, embedding, solution FROM answers WHERE id = ?",
+                               (entry_id,)).fetchone()
+    assert after[:3] == before
+    assert '"4"' in after[3]
+
+
+def test_feedback_overrides_verifier(cache):
+    entry_id = store(cache, "Solve 2x + 5 = 13")
+    cache.record_feedback(entry_id, False)
+    assert cache.lookup("Solve 2x + 5 = 13") is None
+    # fresh verifier result user ke "galat" ko override nahi karta
+    store(cache, "Solve 2x + 5 = 13")
+    status = cache.conn.execute("SELECT status FROM answers WHERE id = ?", (entry_id,)).fetchone()[0]
+    assert status == STATUS_REJECTED
+
+    other = store(cache, "Solve 3x = 9", verification={'is_correct': False, 'confidence': 0.2})
+    cache.record_feedback(other, True)
+    assert cache.lookup("Solve 3x = 9")['status'] == STATUS_CONFIRMED
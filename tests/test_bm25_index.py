@@ -0,0 +1,43 @@
+from rag.bm25_index import BM25Index, tokenize_math, reciprocal_rank_fusion
+
+DOCS = {
+    'binom': "Binomial coefficient: C(n,k) = n! / (k!(n-k)!)",
+    'pyth': "sin²θ + cos²θ = 1",
+    'quad': "Quadratic formula: x = [-b ± √(b² - 4ac)] / 2a",
+    'ap': "Arithmetic progression nth term: a + (n-1)d",
+}
+
+
+def build():
+    ids = list(DOCS)
+    metadatas = [{'topic': 'trigonometry' if doc_id == 'pyth' else 'algebra'} for doc_id in ids]
+    return BM25Index().build(ids, [DOCS[doc_id] for doc_id in ids], metadatas)
+
+
+def test_tokenize_math_keeps_composite_and_base_tokens():
+    assert tokenize_math("sin²θ") == ['sin^2', 'sin', 'theta']
+    assert tokenize_math("C(n,k)") == ['c(', 'c', 'n', 'k']
+    assert 'the' not in tokenize_math("what is the derivative")
+
+
+def test_formula_query_ranks_matching_chunk_first():
+    index = build()
+    assert index.search("sin^2 theta identity", top_k=1)[0]['id'] == 'pyth'
+    assert index.search("\\binom{n}{k}", top_k=1)[0]['id'] == 'binom'
+
+
+def test_where_filter_and_empty_index():
+    index = build()
+    results = index.search("sin^2 theta", where={'topic': 'algebra'})
+    assert all(result['id'] != 'pyth' for result in results)
+    assert BM25Index().search("anything") == []
+
+
+def test_reciprocal_rank_fusion_normalizes_and_keeps_source_scores():
+    dense = [{'id': 'a', 'score': 0.9}, {'id': 'b', 'score': 0.8}]
+    lexical = [{'id': 'a', 'score': 7.0}, {'id': 'c', 'score': 3.0}]
+    fused = reciprocal_rank_fusion([dense, lexical], k=60, top_k=3)
+    assert [result['id'] for result in fused][0] == 'a'
+    assert fused[0]['score'] == 1.0
+    assert fused[0]['source_scores'] == [0.9, 7.0]
+    assert {result['id']: result['source_scores'] for result in fused}['c'] == [None, 3.0]
@@ -0,0 +1,40 @@
+from rag.chunker import chunk_markdown, count_tokens
+
+DOC = """# Calculus
+## Limits
+- lim x->0 sin x / x = 1
+- lim x->0 (1 + x)^(1/x) = e
+  nested line stays with its bullet
+
+### L'Hopital
+Differentiate numerator and denominator.
+"""
+
+
+def test_heading_path_and_levels():
+    chunks = chunk_markdown(DOC, granularity="section", max_tokens=200)
+    assert [c['heading_path'] for c in chunks] == ["Calculus > Limits", "Calculus > Limits > L'Hopital"]
+    assert [c['level'] for c in chunks] == [2, 3]
+    assert chunks[1]['heading'] == "L'Hopital"
+    assert chunks[0]['text'].startswith("Calculus > Limits\n")
+
+
+def test_formula_granularity_splits_bullets_with_nested_lines():
+    chunks = chunk_markdown(DOC, granularity="formula")
+    limits = [c['text'] for c in chunks if c['heading'] == "Limits"]
+    assert len(limits) == 2
+    assert limits[1].endswith("nested line stays with its bullet")
+
+
+def test_large_section_windows_respect_budget_and_overlap():
+    bullets = "\n".join(f"- formula number {i} with a few words" for i in range(20))
+    chunks = chunk_markdown(f"## Big\n{bullets}\n", granularity="section", max_tokens=40, overlap=1)
+    assert len(chunks) > 1
+    assert all(count_tokens(c['text']) <= 40 for c in chunks)
+    # Ek bullet agli window mein repeat hota hai
+    first_last = chunks[0]['text'].splitlines()[-1]
+    assert chunks[1]['text'].splitlines()[1] == first_last
+
+
+def test_headings_without_body_are_dropped():
+    assert chunk_markdown("# Empty\n\n## Also empty\n") == []
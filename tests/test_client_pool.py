@@ -0,0 +1,39 @@
+import asyncio
+import types
+
+from llm.client_pool import GroqClientRegistry
+from llm.rate_limiter import RateLimiter
+from llm.response_cache import LLMResponseCache
+from tests.fakes import FakeCompletions
+
+KWARGS = {'model': 'test-model', 'messages': [{'role': 'user', 'content': 'd/dx x^2'}],
+          'temperature': 0.3, 'max_tokens': 50}
+
+
+def make_registry(tmp_path, pieces, mode='readwrite'):
+    registry = GroqClientRegistry(
+        api_key='test-key',
+        response_cache=LLMResponseCache(db_path=str(tmp_path / 'llm.db'), mode=mode),
+        rate_limiter=RateLimiter(rpm=1000, tpm=10 ** 6))
+    completions = FakeCompletions(pieces)
+    registry._async_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+    return registry, completions
+
+
+def test_acomplete_streams_tokens_in_order(tmp_path):
+    registry, completions = make_registry(tmp_path, ["**Final Answer:** ", "2x"])
+    tokens = []
+    text, ttft_ms = asyncio.run(registry.acomplete(KWARGS, on_token=tokens.append))
+    assert tokens == ["**Final Answer:** ", "2x"]
+    assert text == "**Final Answer:** 2x"
+    assert ttft_ms is not None and completions.calls == [True]
+    assert registry.limiter.stats()['active'] == 0
+
+
+def test_acomplete_cache_hit_is_single_delta(tmp_path):
+    registry, completions = make_registry(tmp_path, ["a", "b"])
+    asyncio.run(registry.acomplete(KWARGS))
+    tokens = []
+    text, _ = asyncio.run(registry.acomplete(KWARGS, on_token=tokens.append))
+    assert text == "ab" and tokens == ["ab"]
+    assert completions.calls == [False]  # doosri baar network nahi
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from rag.embed_scheduler import EmbeddingScheduler, PRIORITY_BULK
+
+
+class RecordingEmbedder:
+    """Har encode call ka batch yaad rakho; gate set hone tak pehla call roko"""
+
+    def __init__(self):
+        self.batches = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.started = threading.Event()
+
+    def __call__(self, texts):
+        self.started.set()
+        self.gate.wait(5)
+        self.batches.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.fixture
+def embedder():
+    return RecordingEmbedder()
+
+
+def test_concurrent_requests_share_one_batch(embedder):
+    scheduler = EmbeddingScheduler(embedder, max_wait_ms=200, max_batch=8)
+    try:
+        futures = [scheduler.submit([f"q{i}" * (i + 1)]) for i in range(4)]
+        vectors = [future.result(5) for future in futures]
+    finally:
+        scheduler.shutdown()
+    assert vectors == [[[2.0 * (i + 1)]] for i in range(4)]
+    assert len(embedder.batches) == 1
+    assert scheduler.stats()['mean_batch_size'] == 4
+
+
+def test_large_request_split_and_reassembled_in_order(embedder):
+    scheduler = EmbeddingScheduler(embedder, max_wait_ms=0, max_batch=3)
+    try:
+        texts = ["x" * n for n in range(1, 8)]
+        vectors = scheduler.embed(texts, priority=PRIORITY_BULK, timeout=5)
+    finally:
+        scheduler.shutdown()
+    assert vectors == [[float(n)] for n in range(1, 8)]
+    assert all(len(batch) <= 3 for batch in embedder.batches)
+
+
+def test_interactive_requests_jump_queued_bulk(embedder):
+    scheduler = EmbeddingScheduler(embedder, max_wait_ms=0, max_batch=2)
+    try:
+        embedder.gate.clear()
+        blocker = scheduler.submit(["blocker"])
+        assert embedder.started.wait(5)
+        bulk = scheduler.submit(["b1", "b2", "b3", "b4"], priority=PRIORITY_BULK)
+        query = scheduler.submit(["query"])
+        embedder.gate.set()
+        blocker.result(5), bulk.result(5), query.result(5)
+    finally:
+        scheduler.shutdown()
+    assert embedder.batches[1] == ["query"]
+
+
+def test_embed_error_propagates(embedder):
+    def failing(texts):
+        raise RuntimeError("model down")
+
+    scheduler = EmbeddingScheduler(failing, max_wait_ms=0, max_batch=4)
+    try:
+        with pytest.raises(RuntimeError, match="model down"):
+            scheduler.embed_one("q", timeout=5)
+    finally:
+        scheduler.shutdown()
+    assert scheduler.stats()['errors'] == 1
@@ -0,0 +1,87 @@
+import os
+import json
+
+import pytest
+
+from rag import ingest
+from rag.numpy_index import NumpyIndex
+from tests.fakes import fake_embed
+
+
+class FakeVectorStore:
+    """VectorStore ka ingest wala hissa - NumpyIndex + fake embeddings"""
+
+    def __init__(self, directory, model_name="fake-model"):
+        self.persist_directory = str(directory)
+        os.makedirs(self.persist_directory, exist_ok=True)
+        self.collection = NumpyIndex(os.path.join(self.persist_directory, "numpy_index"))
+        self.model_name = model_name
+        self.embedding_backend = "torch"
+        self.kb_version = None
+        self.embedded = 0
+
+    def add_documents(self, documents, metadatas, ids, upsert=False, num_workers=None, pool=None):
+        self.embedded += len(documents)
+        write = self.collection.upsert if upsert else self.collection.add
+        write(ids=ids, embeddings=fake_embed(documents), documents=documents, metadatas=metadatas)
+
+    def save(self):
+        self.collection.persist()
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / "notes"
+    root.mkdir()
+    (root / "limits.md").write_text("# Limits\n\nlim x->0 sin x / x = 1\n", encoding="utf-8")
+    (root / "ap.md").write_text("# AP\n\nnth term a + (n-1)d\n", encoding="utf-8")
+    return root
+
+
+def test_corpus_sources_are_namespaced(tmp_path, corpus):
+    store = FakeVectorStore(tmp_path / "db")
+    # KB file with the same name as a corpus file
+    store.collection.add(["kb_1"], fake_embed(["kb limits"]), documents=["kb limits"],
+                         metadatas=[{"source": "limits.md", "type": "math_knowledge"}])
+    ingest.ingest_corpus(str(corpus), vector_store=store)
+
+    sources = {meta["source"] for meta in store.collection.get(where={"type": "corpus"})["metadatas"]}
+    assert sources == {"corpus:notes/ap.md", "corpus:notes/limits.md"}
+    # KB sync style delete by file name leaves corpus chunks alone
+    store.collection.delete(where={"source": "limits.md"})
+    assert len(store.collection.get(where={"type": "corpus"})["ids"]) == 2
+
+
+def test_unchanged_files_are_skipped(tmp_path, corpus):
+    store = FakeVectorStore(tmp_path / "db")
+    ingest.ingest_corpus(str(corpus), vector_store=store)
+    stats = ingest.ingest_corpus(str(corpus), vector_store=store)
+    assert stats['skipped'] == 2 and stats['chunks'] == 0
+
+
+def test_embedding_change_reembeds_and_replaces_chunks(tmp_path, corpus):
+    store = FakeVectorStore(tmp_path / "db")
+    ingest.ingest_corpus(str(corpus), vector_store=store)
+    count = store.collection.count()
+
+    store.model_name = "other-model"
+    stats = ingest.ingest_corpus(str(corpus), vector_store=store)
+    assert stats['files'] == 2 and stats['skipped'] == 0
+    assert store.collection.count() == count
+
+
+def test_legacy_relpath_chunks_are_deleted_on_reingest(tmp_path, corpus):
+    store = FakeVectorStore(tmp_path / "db")
+    stat = os.stat(corpus / "ap.md")
+    # Purana checkpoint: relpath source, koi signature nahi
+    with open(os.path.join(store.persist_directory, "ingest_checkpoint_notes.json"), 'w') as f:
+        json.dump({'files': {"ap.md": {'mtime': stat.st_mtime, 'size': stat.st_size, 'chunks': 1}}}, f)
+    store.collection.add(["old_ap"], fake_embed(["old ap"]), documents=["old ap"],
+                         metadatas=[{"source": "ap.md", "type": "corpus"}])
+    store.collection.add(["kb_ap"], fake_embed(["kb ap"]), documents=["kb ap"],
+                         metadatas=[{"source": "ap.md", "type": "math_knowledge"}])
+
+    ingest.ingest_corpus(str(corpus), vector_store=store)
+    ids = set(store.collection.get()["ids"])
+    assert "old_ap" not in ids
+    assert "kb_ap" in ids
@@ -0,0 +1,33 @@
+import pytest
+
+from rag import math_normalizer
+from rag.math_normalizer import canonicalize, normalize_query, embedding_text
+
+
+@pytest.mark.parametrize("text, expected", [
+    (r"\frac{a}{b}", "a/b"),
+    (r"\binom{n}{k}", "c(n,k)"),
+    (r"\sqrt{x+1}", "sqrt(x+1)"),
+    ("x^{n-1}", "x^(n-1)"),
+    ("a_{n}", "a_n"),
+    ("sin²θ", "sin^2 theta"),
+    ("x ** 2", "x^2"),
+    ("C(n,k)", "c(n,k)"),
+])
+def test_canonicalize(text, expected):
+    assert canonicalize(text) == expected
+
+
+def test_unicode_and_latex_forms_match():
+    assert canonicalize(r"$\sin^2\theta$") == canonicalize("sin²θ")
+
+
+def test_normalize_query_expands_concepts():
+    assert normalize_query("lim of sin x over x").endswith(" limit")
+    assert "limit" not in normalize_query("eliminate x from the equations")
+
+
+def test_canonicalize_off(monkeypatch):
+    monkeypatch.setattr(math_normalizer, 'MATH_CANONICALIZE', False)
+    assert embedding_text("sin²θ") == "sin²θ"
+    assert normalize_query("  Sin X ") == "sin x"
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from rag.numpy_index import NumpyIndex, quantize
+
+
+def unit(rng, n, dim=16):
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def index(tmp_path):
+    rng = np.random.default_rng(0)
+    index = NumpyIndex(str(tmp_path / 'index'))
+    index.add([f"doc{i}" for i in range(20)], unit(rng, 20),
+              documents=[f"text {i}" for i in range(20)],
+              metadatas=[{'topic': 'algebra' if i % 2 else 'calculus', 'n': i} for i in range(20)])
+    return index
+
+
+def test_query_returns_nearest_with_cosine_distance(index):
+    vector = index._matrix()[3]
+    result = index.query([vector], n_results=3)
+    assert result['ids'][0][0] == 'doc3'
+    assert result['distances'][0][0] == pytest.approx(0.0, abs=1e-5)
+
+
+def test_where_filter(index):
+    result = index.query([index._matrix()[3]], n_results=5, where={'topic': 'calculus'})
+    assert all(meta['topic'] == 'calculus' for meta in result['metadatas'][0])
+    assert index.get(where={'n': {'$in': [1, 2]}})['ids'] == ['doc1', 'doc2']
+
+
+def test_update_skips_unknown_ids_and_keeps_positions(index):
+    rng = np.random.default_rng(1)
+    new_vectors = unit(rng, 3)
+    index.update(['doc1', 'missing', 'doc5'],
+                 metadatas=[{'tag': 'a'}, {'tag': 'x'}, {'tag': 'c'}],
+                 documents=['one', 'nope', 'five'],
+                 embeddings=new_vectors)
+    got = index.get(ids=['doc1', 'doc5'])
+    assert got['metadatas'] == [{'tag': 'a'}, {'tag': 'c'}]
+    assert got['documents'] == ['one', 'five']
+    assert index.query([new_vectors[2]], n_results=1)['ids'][0] == ['doc5']
+    assert 'missing' not in index.get()['ids']
+
+
+def test_upsert_delete_and_persist_roundtrip(tmp_path, index):
+    rng = np.random.default_rng(2)
+    index.upsert(['doc0', 'doc99'], unit(rng, 2), documents=['zero', 'new'])
+    index.delete(where={'topic': 'algebra'})
+    index.persist()
+    reloaded = NumpyIndex(str(tmp_path / 'index'))
+    assert reloaded.count() == index.count() == 11
+    assert reloaded.get(ids=['doc99'])['documents'] == ['new']
+
+
+@pytest.mark.parametrize('mode', ['float16', 'int8'])
+def test_quantized_search_matches_exact(tmp_path, mode):
+    rng = np.random.default_rng(3)
+    vectors = unit(rng, 500, dim=32)
+    index = NumpyIndex(str(tmp_path / mode), quantization=mode)
+    index.add([str(i) for i in range(500)], vectors)
+    assert index.query([vectors[42]], n_results=1)['ids'][0] == ['42']
+    quantized, scales = quantize(vectors, mode)
+    assert quantized.shape == vectors.shape
+    assert (scales is None) == (mode == 'float16')
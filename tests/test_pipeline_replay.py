@@ -0,0 +1,88 @@
+"""
+Poori SolvePipeline offline: pehle fake Groq client se llm_cache.db record,
+phir LLM_CACHE_MODE=replay mein bina key / network wahi run.
+"""
+
+import types
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("sympy")
+
+from agents.pipeline import SolvePipeline
+from agents.parser_agent import ParserAgent
+from agents.solver_agent import SolverAgent
+from agents.verifier_agent import VerifierAgent
+from agents.explainer_agent import ExplainerAgent
+from llm.client_pool import GroqClientRegistry
+from llm.rate_limiter import RateLimiter
+from llm.response_cache import LLMResponseCache
+from tests.fakes import FakeCompletions
+
+QUESTION = "Find the derivative of x^2"
+CONTEXT = [{'content': "Derivative of x^n is nx^(n-1)", 'metadata': {'topic': 'calculus'},
+            'score': 0.9, 'id': 'default_1'}]
+SOLUTION = "1. Power rule: d/dx x^n = n x^(n-1)\n2. n = 2\nFinal Answer: 2x"
+EXPLANATION = "Power rule: exponent aage aata hai aur power ek kam ho jaati hai."
+
+
+def respond(kwargs):
+    """Solver prompt (max_tokens 1200) ya explainer prompt"""
+    text = SOLUTION if kwargs['max_tokens'] == 1200 else EXPLANATION
+    return [text[:10], text[10:]]
+
+
+def make_pipeline(registry):
+    return SolvePipeline(parser=ParserAgent(),
+                         solver=SolverAgent(client_registry=registry),
+                         verifier=VerifierAgent(),
+                         explainer=ExplainerAgent(client_registry=registry),
+                         retrieve_fn=lambda parsed_problem: CONTEXT)
+
+
+@pytest.fixture
+def recorded_db(tmp_path):
+    """Fake Groq client ke saath record mode run -> llm_cache.db fixture"""
+    db_path = str(tmp_path / 'llm_cache.db')
+    registry = GroqClientRegistry(api_key='test-key',
+                                  response_cache=LLMResponseCache(db_path=db_path, mode='record'),
+                                  rate_limiter=RateLimiter(rpm=1000, tpm=10 ** 6))
+    registry._client = object()  # agents sync client maangte hain - groq import nahi
+    registry._async_client = types.SimpleNamespace(
+        chat=types.SimpleNamespace(completions=FakeCompletions(respond)))
+    result = make_pipeline(registry).run(QUESTION)
+    assert result['solution']['final_answer'] == SOLUTION
+    assert registry.cache.stats()['stores'] == 2
+    return db_path
+
+
+def replay_registry(db_path):
+    registry = GroqClientRegistry(response_cache=LLMResponseCache(db_path=db_path, mode='replay'),
+                                  rate_limiter=RateLimiter(rpm=1000, tpm=10 ** 6))
+    registry.api_key = None  # .env wali key bhi nahi - sab cache se
+    return registry
+
+
+def test_replay_run_matches_recording_without_network(recorded_db):
+    registry = replay_registry(recorded_db)
+    tokens = []
+    result = make_pipeline(registry).run(QUESTION, on_token=lambda stage, delta: tokens.append(stage))
+
+    assert result['solution']['final_answer'] == SOLUTION
+    assert result['solution']['parsed_answer'] == "2x"
+    assert result['solution']['method'].startswith("Groq LLM")
+    assert result['explanation']['explanation'] == EXPLANATION
+    assert result['verification'] is not None
+    assert sorted(tokens) == ['explain', 'solve']  # cache hit = ek delta per stage
+    assert registry.cache.stats()['hits'] == 2 and registry.cache.stats()['misses'] == 0
+    assert registry._async_client is None and registry._client is None
+
+
+def test_replay_miss_never_calls_groq(recorded_db):
+    registry = replay_registry(recorded_db)
+    result = make_pipeline(registry).run("Find the derivative of x^3")
+
+    assert not result['solution']['method'].startswith("Groq LLM")  # rules fallback
+    assert registry.cache.stats()['misses'] >= 1
+    assert registry._async_client is None
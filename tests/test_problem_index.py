@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+import memory.database as database_module
+from memory.database import MemoryDatabase
+from memory.problem_index import ProblemIndex
+
+from tests.fakes import fake_embed
+
+
+def unit(rng, n, dim=32):
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_exact_search_topic_filter_and_remove():
+    rng = np.random.default_rng(0)
+    vectors = unit(rng, 100)
+    index = ProblemIndex(embed_fn=fake_embed)
+    index.add(list(range(100)), vectors, ['algebra' if i % 2 else 'calculus' for i in range(100)])
+
+    assert index.search(vectors[7], limit=1)[0][0] == 7
+    assert all(problem_id % 2 == 1 for problem_id, _ in index.search(vectors[7], 5, topic='algebra'))
+    assert index.search(vectors[7], 5, topic='geometry') == []
+
+    index.remove([7])
+    assert 7 not in index and len(index) == 99
+    assert all(problem_id != 7 for problem_id, _ in index.search(vectors[7], 5))
+
+
+def test_ivf_recall_and_incremental_tail():
+    rng = np.random.default_rng(1)
+    vectors = unit(rng, 4000)
+    index = ProblemIndex(embed_fn=fake_embed, ivf_min=1000, nprobe=8)
+    index.add(list(range(4000)), vectors)
+    queries = vectors[:50] + 0.05 * unit(rng, 50)
+    hits = sum(index.search(query, 1)[0][0] == i for i, query in enumerate(queries))
+    assert index.stats()['mode'] == 'ivf'
+    assert hits >= 45
+
+    # naye rows (tail) bhi turant searchable
+    extra = unit(rng, 10)
+    index.add(list(range(4000, 4010)), extra)
+    assert index.search(extra[3], 1)[0][0] == 4003
+
+
+@pytest.fixture
+def memory_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_module, 'embedding_signature', lambda: 'fake|v1')
+    db = MemoryDatabase(db_path=str(tmp_path / 'memory.db'), embed_fn=fake_embed)
+    yield db
+    db.close()
+
+
+def test_store_problem_does_not_build_index(memory_db):
+    problem_id = memory_db.store_problem("2x+5=13", {'problem_text': "solve 2x + 5 = 13",
+                                                     'topic': 'algebra'})
+    assert memory_db.problem_index is None
+
+    # Pehli similarity query backfill karti hai
+    similar = memory_db.find_similar("solve 2x + 5 = 13", limit=1)
+    assert similar[0]['id'] == problem_id
+    assert problem_id in memory_db.problem_index
+
+    # Index ban chuka - ab store incremental add karta hai
+    second = memory_db.store_problem("3x=9", {'problem_text': "solve 3x = 9", 'topic': 'algebra'})
+    assert second in memory_db.problem_index
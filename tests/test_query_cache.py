@@ -0,0 +1,48 @@
+from rag import query_cache as query_cache_module
+from rag.query_cache import QueryResultCache
+
+RESULTS = [{'content': 'sin²θ + cos²θ = 1', 'score': 0.8}]
+
+
+def test_hit_returns_copy():
+    cache = QueryResultCache(max_entries=4, ttl_seconds=0)
+    cache.put('q', 1, RESULTS)
+    hit = cache.get('q', 1)
+    assert hit == RESULTS
+    hit[0]['score'] = 0.0
+    assert cache.get('q', 1)[0]['score'] == 0.8
+    assert cache.stats()['hits'] == 2
+
+
+def test_kb_version_change_invalidates():
+    cache = QueryResultCache(max_entries=4, ttl_seconds=0)
+    cache.put('q', 1, RESULTS)
+    assert cache.get('q', 2) is None
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_lru_eviction():
+    cache = QueryResultCache(max_entries=2, ttl_seconds=0)
+    cache.put('a', 1, RESULTS)
+    cache.put('b', 1, RESULTS)
+    cache.get('a', 1)
+    cache.put('c', 1, RESULTS)
+    assert cache.get('b', 1) is None
+    assert cache.get('a', 1) is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache_module.time, 'time', lambda: now[0])
+    cache = QueryResultCache(max_entries=4, ttl_seconds=10)
+    cache.put('q', 1, RESULTS)
+    now[0] += 11
+    assert cache.get('q', 1) is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_disabled_cache():
+    cache = QueryResultCache(max_entries=0)
+    cache.put('q', 1, RESULTS)
+    assert cache.get('q', 1) is None
@@ -0,0 +1,39 @@
+from rag import client as client_module
+from rag.client import RemoteVectorStore
+
+
+class FakeRagClient:
+    def __init__(self):
+        self.stats_calls = 0
+        self.version = 1
+
+    def stats(self):
+        self.stats_calls += 1
+        return {'kb_version': self.version, 'model_loaded': True, 'document_count': 7}
+
+
+def make_store(ttl):
+    store = RemoteVectorStore(url="http://rag.invalid", stats_ttl=ttl)
+    store.client = FakeRagClient()
+    return store
+
+
+def test_stats_reads_share_one_request_within_ttl():
+    store = make_store(ttl=60)
+    assert store.kb_version == 1
+    assert store.model_loaded is True
+    assert store.count() == 7
+    assert store.client.stats_calls == 1
+
+
+def test_stats_refresh_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(client_module.time, 'monotonic', lambda: now[0])
+    store = make_store(ttl=2)
+    assert store.kb_version == 1
+    store.client.version = 2
+    now[0] += 1
+    assert store.kb_version == 1
+    now[0] += 1.5
+    assert store.kb_version == 2
+    assert store.client.stats_calls == 2
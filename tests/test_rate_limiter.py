@@ -0,0 +1,116 @@
+import time
+import types
+import threading
+
+import pytest
+
+from llm.rate_limiter import (RateLimiter, TokenBucket, PRIORITY_SOLVE, PRIORITY_EXPLAIN,
+                              backoff_seconds, estimate_tokens, is_retryable)
+
+KWARGS = {'messages': [{'role': 'user', 'content': 'x' * 40}], 'max_tokens': 10}
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        headers = {'retry-after': str(retry_after)} if retry_after is not None else {}
+        self.response = types.SimpleNamespace(headers=headers)
+
+
+def test_429_pause_holds_back_queued_request():
+    limiter = RateLimiter(rpm=1000, tpm=10 ** 6, max_concurrency=1, retries=0)
+    started = time.monotonic()
+    fired = []
+
+    def queued():
+        limiter.acquire(1)
+        fired.append(time.monotonic() - started)
+        limiter.release(1)
+
+    waiter = threading.Thread(target=queued)
+
+    def rate_limited():
+        waiter.start()
+        time.sleep(0.05)  # waiter slot ke liye queue mein
+        raise FakeAPIError(429, retry_after=0.5)
+
+    with pytest.raises(FakeAPIError):
+        limiter.call(rate_limited, KWARGS)
+    waiter.join(5)
+    # queued request 429 ke turant baad nahi, cool down ke baad chali
+    assert fired and fired[0] >= 0.5
+    assert limiter.stats()['rate_limited'] == 1
+
+
+def test_retry_honors_retry_after():
+    limiter = RateLimiter(rpm=1000, tpm=10 ** 6, retries=2)
+    attempts = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise FakeAPIError(429, retry_after=0.2)
+        return 'ok'
+
+    result, tokens = limiter.call(flaky, KWARGS)
+    limiter.release(tokens)
+    assert result == 'ok'
+    assert attempts[1] - attempts[0] >= 0.2
+    assert limiter.stats()['active'] == 0
+
+
+def test_non_retryable_error_raises_and_frees_slot():
+    limiter = RateLimiter(rpm=1000, tpm=10 ** 6, retries=3)
+
+    def bad_request():
+        raise FakeAPIError(400)
+
+    with pytest.raises(FakeAPIError):
+        limiter.call(bad_request, KWARGS)
+    stats = limiter.stats()
+    assert stats['active'] == 0 and stats['retries'] == 0
+
+
+def test_solve_priority_served_before_explain():
+    limiter = RateLimiter(rpm=1000, tpm=10 ** 6, max_concurrency=1)
+    order = []
+
+    def worker(name, priority):
+        limiter.acquire(1, priority)
+        order.append(name)
+        limiter.release(1)
+
+    limiter.acquire(1)
+    threads = []
+    for name, priority in (('explain', PRIORITY_EXPLAIN), ('solve', PRIORITY_SOLVE)):
+        thread = threading.Thread(target=worker, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)
+    limiter.release(1)
+    for thread in threads:
+        thread.join(5)
+    assert order == ['solve', 'explain']
+
+
+def test_queue_timeout():
+    limiter = RateLimiter(rpm=1000, tpm=10 ** 6, max_concurrency=1, queue_timeout=0.05)
+    limiter.acquire(1)
+    with pytest.raises(TimeoutError):
+        limiter.acquire(1)
+    assert limiter.stats()['timeouts'] == 1
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(60)  # 1 per second
+    now = bucket.updated
+    bucket.take(60)
+    assert bucket.wait_time(2, now) == pytest.approx(2.0)
+    assert bucket.wait_time(2, now + 2) == pytest.approx(0.0)
+
+
+def test_helpers():
+    assert estimate_tokens(KWARGS) > 10
+    assert is_retryable(FakeAPIError(503)) and not is_retryable(FakeAPIError(404))
+    assert backoff_seconds(0, retry_after=3) >= 3
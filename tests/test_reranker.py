@@ -0,0 +1,67 @@
+import pytest
+
+from rag import reranker as reranker_module
+from rag.reranker import CrossEncoderReranker
+
+MS_PER_PAIR = 10
+
+
+class FakeCrossEncoder:
+    """Score = content mein likha number; har pair fake clock pe 10 ms"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.pairs = []
+
+    def predict(self, pairs):
+        self.pairs.extend(content for _, content in pairs)
+        self.clock[0] += MS_PER_PAIR * len(pairs) / 1000
+        return [float(content.split()[-1]) for _, content in pairs]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(reranker_module.time, 'perf_counter', lambda: clock[0])
+    return clock
+
+
+def make_reranker(clock, **options):
+    reranker = CrossEncoderReranker(batch_size=2, **options)
+    reranker._model = FakeCrossEncoder(clock)
+    return reranker
+
+
+def results(*scores):
+    return [{'id': f"doc{rank}", 'content': f"chunk {score}"} for rank, score in enumerate(scores)]
+
+
+def test_full_rerank_orders_by_cross_encoder(clock):
+    reranker = make_reranker(clock, budget_ms=0)
+    reranked, applied = reranker.rerank("q", results(0.1, 0.9, 0.5))
+    assert applied
+    assert [r['id'] for r in reranked] == ['doc1', 'doc2', 'doc0']
+    assert reranked[0]['rerank_score'] == 0.9
+
+
+def test_partial_rerank_keeps_deep_cache_hits_behind_unscored(clock):
+    reranker = make_reranker(clock, budget_ms=30)
+    candidates = results(0.1, 0.2, 0.3, 0.4, 0.99)
+    # Deep rank (doc4) ka score pichli query se cache mein
+    reranker._cache_put(reranker._key("q", candidates[4]), 0.99)
+    reranker._ms_per_pair = MS_PER_PAIR
+
+    reranked, applied = reranker.rerank("q", candidates)
+    assert not applied
+    assert reranker._model.pairs == ["chunk 0.1", "chunk 0.2"]  # budget mein sirf pehla batch
+    assert [r['id'] for r in reranked] == ['doc1', 'doc0', 'doc2', 'doc3', 'doc4']
+    assert 'rerank_score' not in reranked[-1]
+
+
+def test_cached_scores_make_repeat_query_free(clock):
+    reranker = make_reranker(clock, budget_ms=0)
+    reranker.rerank("q", results(0.1, 0.9))
+    reranker._model.pairs.clear()
+    reranked, applied = reranker.rerank("q", results(0.1, 0.9))
+    assert applied and reranker._model.pairs == []
+    assert reranker.stats()['cache_hits'] == 2
@@ -0,0 +1,74 @@
+import pytest
+
+from llm import response_cache as response_cache_module
+from llm.response_cache import LLMResponseCache, request_key
+
+KWARGS = {'model': 'test-model', 'messages': [{'role': 'user', 'content': 'd/dx x^2'}],
+          'temperature': 0.3, 'max_tokens': 50}
+
+
+def make_cache(tmp_path, **options):
+    return LLMResponseCache(db_path=str(tmp_path / 'llm.db'), **options)
+
+
+def test_key_ignores_stream_flag_but_not_temperature():
+    assert request_key({**KWARGS, 'stream': True}) == request_key(KWARGS)
+    assert request_key({**KWARGS, 'temperature': 0.9}) != request_key(KWARGS)
+
+
+def test_readwrite_roundtrip_persists(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get(KWARGS) is None
+    cache.put(KWARGS, "2x")
+    assert make_cache(tmp_path).get(KWARGS) == "2x"
+    assert cache.stats()['stores'] == 1
+
+
+def test_replay_serves_fixtures_and_raises_on_miss(tmp_path):
+    make_cache(tmp_path, mode='record').put(KWARGS, "2x")
+    replay = make_cache(tmp_path, mode='replay', ttl_seconds=0)
+    assert replay.get(KWARGS) == "2x"  # replay mein TTL nahi
+    replay.put({**KWARGS, 'max_tokens': 1}, "ignored")
+    with pytest.raises(LookupError):
+        replay.get({**KWARGS, 'max_tokens': 1})
+
+
+def test_record_and_off_modes_skip_lookup(tmp_path):
+    make_cache(tmp_path).put(KWARGS, "2x")
+    assert make_cache(tmp_path, mode='record').get(KWARGS) is None
+    off = make_cache(tmp_path, mode='off')
+    off.put(KWARGS, "new")
+    assert off.get(KWARGS) is None
+    assert make_cache(tmp_path).get(KWARGS) == "2x"
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, 'time', lambda: now[0])
+    cache = make_cache(tmp_path, ttl_seconds=10)
+    cache.put(KWARGS, "2x")
+    now[0] += 11
+    assert cache.get(KWARGS) is None
+    assert cache.stats()['expired'] == 1 and cache.stats()['entries'] == 0
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, 'time', lambda: now[0])
+    cache = make_cache(tmp_path, max_entries=10)
+    requests = [{**KWARGS, 'max_tokens': n} for n in range(10)]
+    for kwargs in requests:
+        now[0] += 1
+        cache.put(kwargs, "x")
+    now[0] += 1
+    cache.get(requests[0])
+    now[0] += 1
+    cache.put({**KWARGS, 'max_tokens': 99}, "x")
+    assert cache.stats()['entries'] == 9
+    assert cache.get(requests[0]) == "x"
+    assert cache.get(requests[1]) is None
+
+
+def test_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        make_cache(tmp_path, mode='sometimes')
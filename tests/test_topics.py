@@ -0,0 +1,24 @@
+import pytest
+
+from rag.topics import classify_topic, topic_filter, GENERAL_TOPIC
+
+
+@pytest.mark.parametrize('text, topic', [
+    ("Use logic to find the integral of x^2", 'calculus'),
+    ("This approach applies since the derivative is single valued", 'calculus'),
+    ("Find sin2x + cos(x) when θ = 30", 'trigonometry'),
+    ("Solve the quadratic equation using log rules", 'algebra'),
+    ("Sum of an AP with common difference 3", 'algebra'),
+    ("Common mistakes students make", GENERAL_TOPIC),
+])
+def test_classify_topic(text, topic):
+    assert classify_topic(text) == topic
+
+
+def test_heading_outweighs_text():
+    assert classify_topic("uses sin and cos", heading_path="Calculus Formulas > Limits") == 'calculus'
+
+
+def test_topic_filter_includes_general():
+    assert topic_filter(['calculus']) == {'topic': {'$in': ['calculus', GENERAL_TOPIC]}}
+    assert topic_filter([GENERAL_TOPIC, None]) is None
@@ -0,0 +1,13 @@
+import pytest
+
+pytest.importorskip("chromadb")
+
+from rag.vector_store import cosine_from_distance
+
+
+@pytest.mark.parametrize("cos", [1.0, 0.6, 0.0, -0.5])
+def test_cosine_from_distance_same_scale_for_backends(cos):
+    l2_squared = 2 - 2 * cos          # Chroma default space (unit vectors)
+    cosine_distance = 1 - cos         # Chroma "cosine" space / NumpyIndex
+    assert cosine_from_distance(l2_squared, "l2") == pytest.approx(cos)
+    assert cosine_from_distance(cosine_distance, "cosine") == pytest.approx(cos)